@@ -0,0 +1,126 @@
+"""
+Measures DBAPI cursors fetch speed over prefetched rows.
+
+No server is required: query results are generated in memory.
+
+    python benchmarks/cursor_fetch.py [rows] [fetchmany size]
+"""
+import asyncio
+import sys
+import time
+
+from clickhouse_sqlalchemy.drivers.asynch.connector import (
+    AsyncAdapt_asynch_cursor
+)
+from clickhouse_sqlalchemy.drivers.http import connector as http_connector
+from clickhouse_sqlalchemy.drivers.native import connector as native_connector
+
+
+class FakeHttpTransport(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        yield ['number']
+        yield ['UInt64']
+        yield from self.rows
+
+
+class FakeNativeTransport(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None, with_column_types=False, **kwargs):
+        return list(self.rows), [('number', 'UInt64')]
+
+
+class FakeAsynchCursor(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, query, args=None, context=None):
+        return len(self.rows)
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakeAsynchConnection(object):
+    _execute_mutex = asyncio.Lock()
+
+
+def http_cursor(rows):
+    connection = http_connector.Connection.__new__(http_connector.Connection)
+    connection._prefetch = True
+    connection.transport = FakeHttpTransport(rows)
+    cursor = connection.cursor()
+    cursor.execute('SELECT number FROM system.numbers')
+    return cursor
+
+
+def native_cursor(rows):
+    connection = native_connector.Connection.__new__(
+        native_connector.Connection
+    )
+    connection.transport = FakeNativeTransport(rows)
+    cursor = connection.cursor()
+    cursor.execute('SELECT number FROM system.numbers')
+    return cursor
+
+
+def asynch_cursor(rows):
+    cursor = AsyncAdapt_asynch_cursor.__new__(AsyncAdapt_asynch_cursor)
+    cursor._adapt_connection = FakeAsynchConnection()
+    cursor._cursor = FakeAsynchCursor(rows)
+    asyncio.run(cursor._execute_async('SELECT 1', None, None))
+    return cursor
+
+
+def fetchmany_loop(cursor, size):
+    count = 0
+    while True:
+        block = cursor.fetchmany(size)
+        if not block:
+            return count
+        count += len(block)
+
+
+def fetchone_loop(cursor):
+    count = 0
+    while cursor.fetchone() is not None:
+        count += 1
+    return count
+
+
+def measure(name, make_cursor, rows, fetch):
+    cursor = make_cursor(rows)
+    start = time.perf_counter()
+    count = fetch(cursor)
+    elapsed = time.perf_counter() - start
+    sys.stdout.write('{:<28} {:>8} rows: {:.3f} sec\n'.format(
+        name, count, elapsed
+    ))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    rows = [(i, ) for i in range(count)]
+    # Keep fetchone() loop reasonable for list.pop(0) based buffers.
+    few_rows = rows[:count // 10]
+
+    for name, make_cursor in [
+        ('http', http_cursor),
+        ('native', native_cursor),
+        ('asynch', asynch_cursor)
+    ]:
+        measure(
+            name + ' fetchmany({})'.format(size), make_cursor, rows,
+            lambda cursor: fetchmany_loop(cursor, size)
+        )
+        measure(name + ' fetchone()', make_cursor, few_rows, fetchone_loop)
+
+
+if __name__ == '__main__':
+    main()
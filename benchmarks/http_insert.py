@@ -0,0 +1,107 @@
+"""
+Measures HTTP INSERT speed and peak memory for VALUES, TabSeparated and
+RowBinary encodings.
+
+No server is required: request body is consumed in memory.
+
+    python benchmarks/http_insert.py [rows]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import Column, create_engine
+
+from clickhouse_sqlalchemy import engines, get_declarative_base, types
+
+
+class FakeResponse(object):
+    status_code = 200
+    headers = {}
+    text = 'UTC\n'
+
+    def iter_content(self, chunk_size=None):
+        return iter([b'x\nString\ndefault\n'])
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+    def __init__(self):
+        self.sent = 0
+
+    def post(self, *args, **kwargs):
+        data = kwargs['data']
+        if isinstance(data, bytes):
+            self.sent += len(data)
+        else:
+            for chunk in data:
+                self.sent += len(chunk)
+        return FakeResponse()
+
+
+Base = get_declarative_base()
+
+
+class Table(Base):
+    __tablename__ = 'test'
+    __table_args__ = (engines.Memory(), )
+
+    id = Column(types.UInt64, primary_key=True)
+    name = Column(types.String)
+    value = Column(types.Nullable(types.Float64))
+    created = Column(types.DateTime)
+
+
+def insert(insert_format, rows, trace_memory=False):
+    url = 'clickhouse+http://localhost/default?server_version=23.8'
+    if insert_format:
+        url += '&insert_format=' + insert_format
+
+    session = FakeSession()
+    engine = create_engine(url, connect_args={'http_session': session})
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    data = [
+        {'id': i, 'name': 'name\t%d' % i, 'value': i / 3, 'created': now}
+        for i in range(rows)
+    ]
+
+    with engine.connect() as conn:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        conn.execute(Table.__table__.insert(), data)
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak, session.sent
+
+    return elapsed
+
+
+def run(insert_format, rows):
+    elapsed = insert(insert_format, rows)
+    # Memory tracing slows down execution, so it is measured separately.
+    peak, sent = insert(insert_format, rows, trace_memory=True)
+
+    sys.stdout.write(
+        '{:>12}: {:.2f} sec, {:.0f} rows/sec, '
+        'peak {:.1f} MiB, body {:.1f} MiB\n'.format(
+            insert_format or 'VALUES', elapsed, rows / elapsed,
+            peak / 2 ** 20, sent / 2 ** 20
+        )
+    )
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    for insert_format in (None, 'TabSeparated', 'RowBinary'):
+        run(insert_format, rows)
+
+
+if __name__ == '__main__':
+    main()
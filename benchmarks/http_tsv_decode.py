@@ -0,0 +1,80 @@
+"""
+Measures HTTP transport TSV decoding speed, rows/sec.
+
+No server is required: response body is generated in memory.
+
+    python benchmarks/http_tsv_decode.py [rows] [columns]
+"""
+import sys
+import time
+
+from clickhouse_sqlalchemy.drivers.http.transport import RequestsTransport
+
+
+class FakeResponse(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def iter_content(self, chunk_size=None):
+        return iter([b'\n'.join(self.lines) + b'\n'])
+
+
+class FakeSession(object):
+    def __init__(self, lines):
+        self.lines = lines
+
+    def post(self, *args, **kwargs):
+        return FakeResponse(self.lines)
+
+
+def make_body(rows, columns):
+    types = [
+        'Nullable(Int64)', 'Nullable(Float64)', 'Nullable(String)',
+        'Nullable(Date)', 'Nullable(DateTime)', 'Nullable(Decimal(18, 4))',
+        'String', 'UInt32'
+    ]
+    values = [
+        b'1234567', b'3.1415', b'some text', b'2024-01-01',
+        b'2024-01-01 12:34:56', b'12.5000', b'plain', b'42'
+    ]
+    column_types = [types[i % len(types)] for i in range(columns)]
+    row = []
+    for i in range(columns):
+        # Every third Nullable value is NULL.
+        is_null = i % 3 == 0 and column_types[i].startswith('Nullable')
+        row.append(b'\\N' if is_null else values[i % len(values)])
+
+    lines = [
+        '\t'.join('c%d' % i for i in range(columns)).encode(),
+        '\t'.join(column_types).encode()
+    ]
+    lines.extend([b'\t'.join(row)] * rows)
+    return lines
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    transport = RequestsTransport(
+        'http://localhost:8123/', 'default', 'default', '',
+        http_session=FakeSession(make_body(rows, columns))
+    )
+
+    start = time.perf_counter()
+    count = sum(1 for _ in transport.execute('SELECT 1')) - 2
+    elapsed = time.perf_counter() - start
+
+    sys.stdout.write('{} rows x {} columns: {:.0f} rows/sec\n'.format(
+        count, columns, count / elapsed
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures per-query latency of small queries over native driver.
+
+Requires running server. Previous behaviour, when every cursor close
+dropped the connection, is measured as well for comparison.
+
+    python benchmarks/native_query_latency.py [url] [queries]
+"""
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from clickhouse_sqlalchemy.drivers.native import connector
+
+
+def disconnecting_close(cursor):
+    cursor._connection.transport.disconnect()
+
+
+def measure(url, queries):
+    engine = create_engine(url)
+    timings = []
+
+    with engine.connect() as conn:
+        # Warm up connection.
+        conn.execute(text('SELECT 1')).fetchall()
+
+        for _ in range(queries):
+            start = time.perf_counter()
+            conn.execute(text('SELECT 1')).fetchall()
+            timings.append(time.perf_counter() - start)
+
+    engine.dispose()
+    timings.sort()
+    return (
+        statistics.mean(timings),
+        timings[len(timings) // 2],
+        timings[int(len(timings) * 0.99)]
+    )
+
+
+def main():
+    url = sys.argv[1] if len(sys.argv) > 1 else \
+        'clickhouse+native://default:@localhost/default'
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    close = connector.Cursor.close
+    for name, cursor_close in [
+        ('disconnect on cursor close', disconnecting_close),
+        ('keep connection', close)
+    ]:
+        connector.Cursor.close = cursor_close
+        mean, p50, p99 = measure(url, queries)
+        sys.stdout.write(
+            '{:>27}: mean {:.2f} ms, p50 {:.2f} ms, p99 {:.2f} ms\n'.format(
+                name, mean * 1000, p50 * 1000, p99 * 1000
+            )
+        )
+    connector.Cursor.close = close
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..http.base import ClickHouseDialect_http
+from . import connector
+
+# Export connector version
+VERSION = (0, 0, 1, None)
+
+
+class ClickHouseDialect_aiohttp(ClickHouseDialect_http):
+    driver = 'aiohttp'
+
+    is_async = True
+    supports_statement_cache = True
+
+    @classmethod
+    def import_dbapi(cls):
+        return connector
+
+    @classmethod
+    def get_pool_class(cls, url):
+        return AsyncAdaptedQueuePool
+
+    def _get_shared_session(self, options):
+        raise ValueError(
+            'share_session option is not supported by aiohttp driver'
+        )
+
+    def do_terminate(self, dbapi_connection):
+        dbapi_connection.terminate()
+
+
+dialect = ClickHouseDialect_aiohttp
@@ -0,0 +1,31 @@
+from ..http.connector import (  # noqa: F401
+    apilevel, paramstyle, Error, Connection as HttpConnection,
+    Cursor as HttpCursor
+)
+from .transport import AiohttpTransport
+
+# Connections are bound to the event loop they were created in.
+threadsafety = 1
+
+
+def connect(*args, **kwargs):
+    """
+    Make new connection.
+    """
+    return Connection(*args, **kwargs)
+
+
+class Connection(HttpConnection):
+    transport_cls = AiohttpTransport
+
+    def cursor(self):
+        return Cursor(self)
+
+    def terminate(self):
+        self.transport.terminate()
+
+
+class Cursor(HttpCursor):
+    async def _async_soft_close(self):
+        # Rows are read from response only within SQLAlchemy greenlet.
+        pass
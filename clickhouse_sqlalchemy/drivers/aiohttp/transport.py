@@ -0,0 +1,168 @@
+import asyncio
+import ssl
+
+import aiohttp
+from sqlalchemy.util.concurrency import await_only
+
+from ..http.compression import decompress_stream, get_decompressor
+from ..http.transport import DEFAULT_CHUNK_SIZE, RequestsTransport
+
+
+DEFAULT_POOL_MAXSIZE = 10
+
+
+async def iter_async(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class AiohttpResponse(object):
+    """
+    Exposes `requests`-like interface of ``aiohttp`` response used by
+    transport.
+    """
+    def __init__(self, response):
+        self.response = response
+
+    @property
+    def status_code(self):
+        return self.response.status
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def encoding(self):
+        return self.response.charset
+
+    def close(self):
+        self.response.release()
+
+
+class AiohttpTransport(RequestsTransport):
+    """
+    Transport over ``aiohttp``. Must be used from greenlet spawned by
+    SQLAlchemy asyncio extension: every network call is awaited with
+    `await_only`, so the event loop is not blocked.
+
+    Query building, retries and results parsing are inherited from
+    :class:`RequestsTransport`.
+    """
+    default_retry_exceptions = (
+        aiohttp.ClientConnectionError, asyncio.TimeoutError
+    )
+    timeout_exceptions = (asyncio.TimeoutError, )
+
+    def __init__(self, *args, **kwargs):
+        super(AiohttpTransport, self).__init__(*args, **kwargs)
+
+        username, password = self.auth.username, self.auth.password
+        self.auth = aiohttp.BasicAuth(username or '', password or '')
+        self.ssl = self._create_ssl_context(self.verify, self.cert)
+
+        if self.timeout is not None:
+            self.client_timeout = aiohttp.ClientTimeout(
+                sock_connect=self.timeout, sock_read=self.timeout
+            )
+        else:
+            self.client_timeout = aiohttp.ClientTimeout(total=None)
+
+    def _create_session(self, pool_maxsize=DEFAULT_POOL_MAXSIZE, **options):
+        # Compressed responses are decoded by transport itself.
+        connector = aiohttp.TCPConnector(limit=int(pool_maxsize))
+        return aiohttp.ClientSession(
+            connector=connector, auto_decompress=False
+        )
+
+    @staticmethod
+    def _create_ssl_context(verify, cert):
+        if verify is True and not cert:
+            return True
+        if not verify:
+            return False
+
+        if isinstance(verify, str):
+            context = ssl.create_default_context(cafile=verify)
+        else:
+            context = ssl.create_default_context()
+
+        if cert:
+            if isinstance(cert, str):
+                context.load_cert_chain(cert)
+            else:
+                context.load_cert_chain(*cert)
+        return context
+
+    def close(self):
+        if self._own_session:
+            await_only(self.http.close())
+
+    def terminate(self):
+        """
+        Closes pooled connections without waiting. Used when connection is
+        garbage collected outside of event loop greenlet.
+        """
+        if self._own_session and not self.http.closed:
+            connector = self.http.connector
+            self.http.detach()
+            try:
+                connector.close()
+            except RuntimeError:
+                # Event loop is already closed.
+                pass
+
+    def _iter_content(self, r):
+        chunks = self._iter_chunks(r.response)
+
+        decompressor = None
+        if self.compress is not None:
+            encoding = r.headers.get('Content-Encoding')
+            decompressor = get_decompressor(encoding)
+
+        if decompressor is None:
+            return chunks
+        return decompress_stream(decompressor, chunks)
+
+    def _iter_chunks(self, response):
+        try:
+            while True:
+                chunk = await_only(
+                    response.content.read(DEFAULT_CHUNK_SIZE)
+                )
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            response.release()
+
+    def _get_headers(self, r, name):
+        return r.headers.getall(name, [])
+
+    def _read_text(self, r):
+        content = b''.join(self._iter_content(r))
+        return content.decode(r.encoding or 'utf-8', errors='replace')
+
+    def _sleep(self, delay):
+        await_only(asyncio.sleep(delay))
+
+    def _post(self, url, params, data, headers, stream, timeout):
+        # aiohttp rejects non-string query values like UUID query_id.
+        params = {
+            key: str(int(value) if isinstance(value, bool) else value)
+            for key, value in params.items()
+        }
+        if not isinstance(data, bytes):
+            data = iter_async(data)
+
+        client_timeout = self.client_timeout
+        if timeout != self.timeout:
+            client_timeout = aiohttp.ClientTimeout(
+                sock_connect=timeout, sock_read=timeout
+            )
+
+        response = await_only(self.http.post(
+            url, auth=self.auth, params=params, data=data,
+            headers=headers, timeout=client_timeout, ssl=self.ssl
+        ))
+        return AiohttpResponse(response)
@@ -12,7 +12,7 @@ VERSION = (0, 0, 1, None)
 
 class ClickHouseAsynchExecutionContext(ClickHouseExecutionContext):
     def create_server_side_cursor(self):
-        return self.create_default_cursor()
+        return self._dbapi_connection.cursor(server_side=True)
 
 
 class ClickHouseDialect_asynch(ClickHouseDialect_native):
@@ -31,6 +31,31 @@ class ClickHouseDialect_asynch(ClickHouseDialect_native):
     def get_pool_class(cls, url):
         return AsyncAdaptedQueuePool
 
+    def create_connect_args(self, url):
+        rv = super(ClickHouseDialect_asynch, self).create_connect_args(url)
+        if self.pool_warmup:
+            raise ValueError('pool_warmup is not supported by asynch driver')
+        if 'balancer' in rv[1]:
+            raise ValueError('hosts is not supported by asynch driver')
+        return rv
+
+    def do_ping(self, dbapi_connection):
+        # asynch connection has no ping packet support.
+        return super(ClickHouseDialect_native, self).do_ping(dbapi_connection)
+
+    def read_dataframe(self, connection, statement, params=None,
+                       settings=None):
+        # Goes through rows: asynch cursor has no columnar results.
+        return super(ClickHouseDialect_native, self).read_dataframe(
+            connection, statement, params=params, settings=settings
+        )
+
+    def insert_dataframe(self, connection, table, dataframe, settings=None):
+        # Rows are inserted with executemany.
+        return super(ClickHouseDialect_native, self).insert_dataframe(
+            connection, table, dataframe, settings=settings
+        )
+
     def _execute(self, connection, sql, scalar=False, **kwargs):
         if isinstance(sql, str):
             # Makes sure the query will go through the
@@ -1,8 +1,14 @@
 import asyncio
+from uuid import uuid4
 
 from sqlalchemy.engine.interfaces import AdaptedConnection
 from sqlalchemy.util.concurrency import await_only
 
+from ...exceptions import DatabaseException, QueryTimeoutError
+from ..util import RowBuffer
+
+KILL_QUERY = 'KILL QUERY WHERE query_id = %(query_id)s'
+
 
 class AsyncAdapt_asynch_cursor:
     __slots__ = (
@@ -10,7 +16,8 @@ class AsyncAdapt_asynch_cursor:
         '_connection',
         'await_',
         '_cursor',
-        '_rows'
+        '_rows',
+        '_query_id'
     )
 
     def __init__(self, adapt_connection):
@@ -21,7 +28,8 @@ class AsyncAdapt_asynch_cursor:
         cursor = self._connection.cursor()
 
         self._cursor = self.await_(cursor.__aenter__())
-        self._rows = []
+        self._rows = RowBuffer()
+        self._query_id = None
 
     @property
     def _execute_mutex(self):
@@ -51,33 +59,86 @@ class AsyncAdapt_asynch_cursor:
         # note we aren't actually closing the cursor here,
         # we are just letting GC do it.   to allow this to be async
         # we would need the Result to change how it does "Safe close cursor".
-        self._rows[:] = []  # noqa
+        self._rows.clear()
 
     def execute(self, operation, params=None, context=None):
         return self.await_(self._execute_async(operation, params, context))
 
     async def _execute_async(self, operation, params, context):
         async with self._execute_mutex:
-            result = await self._cursor.execute(
-                operation,
-                args=params,
-                context=context
+            return await self._with_timeout(
+                self._execute_fetch(operation, params, context), context
             )
 
-            self._rows = list(await self._cursor.fetchall())
-            return result
+    async def _execute_fetch(self, operation, params, context):
+        result = await self._cursor.execute(
+            operation,
+            args=params,
+            context=context
+        )
+
+        self._rows = RowBuffer(list(await self._cursor.fetchall()))
+        return result
 
     def executemany(self, operation, params=None, context=None):
         return self.await_(self._executemany_async(operation, params, context))
 
     async def _executemany_async(self, operation, params, context):
         async with self._execute_mutex:
-            return await self._cursor.executemany(
-                operation,
-                args=params,
-                context=context
+            return await self._with_timeout(
+                self._cursor.executemany(
+                    operation,
+                    args=params,
+                    context=context
+                ),
+                context
             )
 
+    async def _with_timeout(self, coro, context):
+        execution_options = context.execution_options if context else {}
+        timeout = execution_options.get('timeout')
+
+        # Query id is known in advance, so query can be killed.
+        self._query_id = execution_options.get('query_id') or str(uuid4())
+        self._cursor.set_query_id(self._query_id)
+
+        try:
+            if timeout is None:
+                return await coro
+            return await asyncio.wait_for(coro, float(timeout))
+
+        except asyncio.TimeoutError:
+            await self._abort_query()
+            raise DatabaseException(QueryTimeoutError(
+                'Query {} exceeded timeout of {} sec'.format(
+                    self._query_id, timeout
+                )
+            ))
+
+        except asyncio.CancelledError:
+            # Task is cancelled, e.g. by failed sibling in gather_queries.
+            await self._abort_query()
+            raise
+
+    async def _abort_query(self):
+        # Connection is left in the middle of the query.
+        await self._connection.close()
+        try:
+            await self._adapt_connection._kill_query_async(self._query_id)
+        except Exception:
+            # Server will stop the query on its own once it notices closed
+            # connection.
+            pass
+
+    def cancel(self):
+        """
+        Kills current query on separate connection. Not in PEP 249 standard.
+        """
+        if self._query_id is None:
+            raise RuntimeError("No query yet")
+
+        self.await_(self._adapt_connection._kill_query_async(self._query_id))
+
     def setinputsizes(self, *args):
         pass
 
@@ -85,27 +146,121 @@ class AsyncAdapt_asynch_cursor:
         pass
 
     def __iter__(self):
-        while self._rows:
-            yield self._rows.pop(0)
+        return iter(self._rows)
 
     def fetchone(self):
-        if self._rows:
-            return self._rows.pop(0)
+        return self._rows.fetchone()
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+
+        return self._rows.fetchmany(size)
+
+    def fetchall(self):
+        return self._rows.fetchall()
+
+
+class AsyncAdapt_asynch_ss_cursor(AsyncAdapt_asynch_cursor):
+    """
+    Server side cursor. Result blocks are read from connection as rows are
+    fetched, so one block is kept in memory. Each fetch awaits once, not
+    once per row.
+    """
+    __slots__ = ('_packets', )
+
+    def __init__(self, adapt_connection):
+        super(AsyncAdapt_asynch_ss_cursor, self).__init__(adapt_connection)
+        self._packets = None
+
+    def close(self):
+        if self._packets is not None:
+            self.await_(self._finish_stream())
+        super(AsyncAdapt_asynch_ss_cursor, self).close()
+
+    async def _execute_fetch(self, operation, params, context):
+        execution_options = context.execution_options if context else {}
+        # ``max_block_size`` execution option takes precedence in asynch.
+        self._cursor.set_stream_results(
+            True, execution_options.get('max_row_buffer', 1000)
+        )
+        result = await self._cursor.execute(
+            operation,
+            args=params,
+            context=context
+        )
+
+        # asynch pops streamed rows from the head of the list one by one,
+        # so blocks are read from packets directly.
+        response = self._cursor._rows  # noqa
+        if isinstance(response, list):
+            self._rows = RowBuffer(response)
+            self._packets = None
         else:
-            return None
+            # The first block is already read with column types.
+            self._rows = RowBuffer(response.data)
+            self._packets = response.packet_generator
+        return result
+
+    async def _read_rows(self, size=None):
+        """
+        Reads blocks until there are `size` buffered rows or the end of
+        result.
+        """
+        async with self._execute_mutex:
+            async for packet in self._packets:
+                block = packet.block
+                if not block.num_rows:
+                    continue
+
+                self._rows.extend(block.get_rows())
+                if size is not None and len(self._rows) >= size:
+                    return
+
+            self._packets = None
+
+    async def _finish_stream(self):
+        """
+        Stops partially consumed query, so the connection can be used for
+        the next query.
+        """
+        packets, self._packets = self._packets, None
+        connection = self._connection._connection  # noqa
+        async with self._execute_mutex:
+            try:
+                # Server stops query on cancel packet, remaining packets
+                # are drained.
+                await connection.send_cancel()
+                async for _ in packets:
+                    pass
+            except Exception:
+                # Next query will reconnect.
+                await connection.disconnect()
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def fetchone(self):
+        if not self._rows and self._packets is not None:
+            self.await_(self._read_rows(1))
+        return self._rows.fetchone()
 
     def fetchmany(self, size=None):
         if size is None:
             size = self.arraysize
 
-        retval = self._rows[0:size]
-        self._rows[:] = self._rows[size:]
-        return retval
+        if len(self._rows) < size and self._packets is not None:
+            self.await_(self._read_rows(size))
+        return self._rows.fetchmany(size)
 
     def fetchall(self):
-        retval = self._rows[:]
-        self._rows[:] = []
-        return retval
+        if self._packets is not None:
+            self.await_(self._read_rows())
+        return self._rows.fetchall()
 
 
 class AsyncAdapt_asynch_dbapi:
@@ -146,18 +301,30 @@ class AsyncAdapt_asynch_dbapi:
     def connect(self, *args, **kwargs) -> 'AsyncAdapt_asynch_connection':
         return AsyncAdapt_asynch_connection(
             self,
-            await_only(self.asynch.connect(*args, **kwargs))
+            await_only(self.asynch.connect(*args, **kwargs)),
+            (args, kwargs)
         )
 
 
 class AsyncAdapt_asynch_connection(AdaptedConnection):
     await_ = staticmethod(await_only)
-    __slots__ = ('dbapi', '_execute_mutex')
+    __slots__ = ('dbapi', '_execute_mutex', '_connect_args')
 
-    def __init__(self, dbapi, connection):
+    def __init__(self, dbapi, connection, connect_args=((), {})):
         self.dbapi = dbapi
         self._connection = connection
         self._execute_mutex = asyncio.Lock()
+        # Used to open side connections.
+        self._connect_args = connect_args
+
+    async def _kill_query_async(self, query_id):
+        args, kwargs = self._connect_args
+        connection = await self.dbapi.asynch.connect(*args, **kwargs)
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(KILL_QUERY, {'query_id': query_id})
+        finally:
+            await connection.close()
 
     def ping(self, reconnect):
         return self.await_(self._ping_async())
@@ -173,6 +340,8 @@ class AsyncAdapt_asynch_connection(AdaptedConnection):
         self.await_(self._connection.autocommit(value))
 
     def cursor(self, server_side=False):
+        if server_side:
+            return AsyncAdapt_asynch_ss_cursor(self)
         return AsyncAdapt_asynch_cursor(self)
 
     def rollback(self):
@@ -0,0 +1,173 @@
+import itertools
+import logging
+import threading
+import time
+from operator import attrgetter
+
+
+strategies = ('round_robin', 'least_outstanding', 'replica_lag')
+DEFAULT_STRATEGY = 'round_robin'
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_MAX_REPLICA_DELAY = 300.0
+DEFAULT_REPLICA_DELAY_INTERVAL = 10.0
+
+REPLICA_DELAY_QUERY = 'SELECT max(absolute_delay) FROM system.replicas'
+
+# URL query options consumed by `Balancer`.
+balancer_options = {
+    'balancing': 'strategy',
+    'host_cooldown': 'cooldown',
+    'max_replica_delay': 'max_replica_delay',
+    'replica_delay_interval': 'replica_delay_interval'
+}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_hosts(value, default_port):
+    """
+    Parses comma separated ``host[:port]`` list. IPv6 addresses must be
+    enclosed in square brackets.
+    """
+    rv = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+
+        if item.startswith('['):
+            host, _, port = item[1:].partition(']')
+            port = port.lstrip(':')
+        else:
+            host, _, port = item.partition(':')
+        rv.append((host, int(port) if port else default_port))
+    return rv
+
+
+def pop_balancer_options(query):
+    return {
+        balancer_options[name]: query.pop(name)
+        for name in list(query) if name in balancer_options
+    }
+
+
+class Host(object):
+    """
+    Server the balancer routes to.
+
+    :param name: ``host:port`` used in logs.
+    :param address: driver specific address, e.g. URL.
+    """
+    def __init__(self, name, address):
+        self.name = name
+        self.address = address
+        # Requests or connections currently using the host.
+        self.outstanding = 0
+        # Host is ejected until this `time.monotonic()` value.
+        self.failed_until = 0.0
+        # Replication delay in seconds.
+        self.delay = 0.0
+
+    def __repr__(self):
+        return '<Host {}>'.format(self.name)
+
+
+class Balancer(object):
+    """
+    Spreads load over several servers. Hosts failed with network errors are
+    ejected for `cooldown` seconds. When all hosts are ejected the one
+    ejected first is used.
+
+    Strategies:
+
+    * ``round_robin`` uses hosts in turn;
+    * ``least_outstanding`` uses host with the fewest requests (connections
+      for native driver) in progress;
+    * ``replica_lag`` uses hosts in turn skipping replicas lagging behind
+      more than `max_replica_delay` seconds. Delays are taken from
+      ``system.replicas`` every `replica_delay_interval` seconds.
+
+    Balancer is shared by all connections of the engine.
+    """
+    def __init__(self, hosts, strategy=DEFAULT_STRATEGY,
+                 cooldown=DEFAULT_COOLDOWN,
+                 max_replica_delay=DEFAULT_MAX_REPLICA_DELAY,
+                 replica_delay_interval=DEFAULT_REPLICA_DELAY_INTERVAL):
+        if strategy not in strategies:
+            raise ValueError(
+                "Unknown balancing strategy '{}'. Possible choices: {}".format(
+                    strategy, ', '.join(strategies)
+                )
+            )
+
+        self.hosts = [Host(name, address) for name, address in hosts]
+        self.strategy = strategy
+        self.cooldown = float(cooldown)
+        self.max_replica_delay = float(max_replica_delay)
+        self.replica_delay_interval = float(replica_delay_interval)
+
+        self.lock = threading.Lock()
+        self._counter = itertools.count()
+        self._next_delay_check = 0.0
+
+    def acquire(self, check_delay=None):
+        """
+        Chooses host and counts it as used until `release`.
+
+        :param check_delay: callable returning replication delay of host
+            address. Used by ``replica_lag`` strategy.
+        """
+        if self.strategy == 'replica_lag' and check_delay is not None:
+            self._update_delays(check_delay)
+
+        with self.lock:
+            host = self._choose(time.monotonic())
+            host.outstanding += 1
+        return host
+
+    def release(self, host, failed=False):
+        with self.lock:
+            host.outstanding -= 1
+
+        if failed:
+            self.eject(host)
+
+    def eject(self, host):
+        with self.lock:
+            host.failed_until = time.monotonic() + self.cooldown
+
+        logger.warning('Host %s is ejected for %.0f sec', host, self.cooldown)
+
+    def _choose(self, now):
+        hosts = [host for host in self.hosts if host.failed_until <= now]
+        if not hosts:
+            return min(self.hosts, key=attrgetter('failed_until'))
+
+        if self.strategy == 'least_outstanding':
+            fewest = min(host.outstanding for host in hosts)
+            hosts = [host for host in hosts if host.outstanding == fewest]
+
+        elif self.strategy == 'replica_lag':
+            fresh = [
+                host for host in hosts
+                if host.delay <= self.max_replica_delay
+            ]
+            hosts = fresh or [min(hosts, key=attrgetter('delay'))]
+
+        return hosts[next(self._counter) % len(hosts)]
+
+    def _update_delays(self, check_delay):
+        now = time.monotonic()
+        with self.lock:
+            if now < self._next_delay_check:
+                return
+            self._next_delay_check = now + self.replica_delay_interval
+            hosts = [host for host in self.hosts if host.failed_until <= now]
+
+        # Lock is not held during checks: other callers use previous delays.
+        for host in hosts:
+            try:
+                host.delay = float(check_delay(host.address))
+            except Exception as e:
+                logger.warning('Replica delay check of %s failed: %s', host, e)
+                self.eject(host)
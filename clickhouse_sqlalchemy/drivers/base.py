@@ -1,7 +1,10 @@
 import enum
+from functools import lru_cache
 
-from sqlalchemy import schema, types as sqltypes, util as sa_util, text
-from sqlalchemy.engine import default, reflection
+from sqlalchemy import (
+    bindparam, schema, types as sqltypes, util as sa_util, text
+)
+from sqlalchemy.engine import default, reflection, ObjectKind, ObjectScope
 from sqlalchemy.sql import (
     compiler, elements
 )
@@ -12,13 +15,31 @@ from sqlalchemy.util import (
 from .compilers.ddlcompiler import ClickHouseDDLCompiler
 from .compilers.sqlcompiler import ClickHouseSQLCompiler
 from .compilers.typecompiler import ClickHouseTypeCompiler
+from .dataframe import check_pandas, iter_dataframe_rows, make_dataframe
 from .reflection import ClickHouseInspector
-from .util import get_inner_spec, parse_arguments
+from .typeparser import TypeSpec, parse_type
+from .util import make_columns
 from .. import types
 
 # Column specifications
 colspecs = {}
 
+decimal_precisions = {
+    'Decimal32': 9,
+    'Decimal64': 18,
+    'Decimal128': 38,
+    'Decimal256': 76,
+}
+
+
+@lru_cache(maxsize=1024)
+def make_enum(name, options):
+    """
+    Enum class for reflected column. Classes are reused, so reflection
+    doesn't make a new class for the same column every time.
+    """
+    return enum.Enum('%s_enum' % name, list(options))
+
 
 # Type converters
 ischema_names = {
@@ -103,8 +124,14 @@ class ClickHouseDialect(default.DefaultDialect):
     supports_update = True
     supports_engine_reflection = True
     supports_table_comment_reflection = True
+    supports_columns_position = True
+    supports_table_uuid = True
 
     engine_reflection = True  # Disables engine reflection from URL.
+    dataframe_execution_options = {'columnar': True}
+    reflection_cache = None  # Enabled from URL.
+    # Render typed binds as `{name:Type}` placeholders.
+    server_side_params = False
 
     max_identifier_length = 127
     default_paramstyle = 'pyformat'
@@ -155,6 +182,8 @@ class ClickHouseDialect(default.DefaultDialect):
         self.supports_update = version >= (18, 12, 14)
         self.supports_engine_reflection = version >= (18, 16)
         self.supports_table_comment_reflection = version >= (21, 6)
+        self.supports_columns_position = version >= (21, 11)
+        self.supports_table_uuid = version >= (20, 5)
 
     def _execute(self, connection, sql, scalar=False, **kwargs):
         raise NotImplementedError
@@ -205,6 +234,202 @@ class ClickHouseDialect(default.DefaultDialect):
             ) for r in rows
         ]
 
+    def get_multi_columns(self, connection, schema=None, filter_names=None,
+                          kind=ObjectKind.TABLE, scope=ObjectScope.DEFAULT,
+                          **kw):
+        tables = self._get_cached_rows(
+            connection, 'columns', self._fetch_columns_rows,
+            schema, filter_names, kind, scope, **kw
+        )
+
+        return [
+            ((schema, table), [self._get_column_info(*r) for r in rows])
+            for table, rows in tables.items()
+        ]
+
+    def _fetch_columns_rows(self, connection, schema, filter_names, kind,
+                            scope):
+        query, params = self._get_multi_query(
+            connection, 'system.columns', 'table',
+            ['table', 'name', 'type', 'default_kind', 'default_expression',
+             'comment'],
+            schema, filter_names, kind, scope,
+            # Columns are returned in definition order. Older servers
+            # without `position` column list them in this order anyway,
+            # while sorting by table only is not stable.
+            order_by='table, position' if self.supports_columns_position
+            else None
+        )
+        if query is None:
+            return {}
+
+        rv = {}
+        for r in self._execute(connection, query, **params):
+            rv.setdefault(r.table, []).append([
+                r.name, r.type, r.default_kind, r.default_expression,
+                r.comment
+            ])
+        return rv
+
+    def _get_cached_rows(self, connection, part, fetch, schema, filter_names,
+                         kind, scope, info_cache=None, **kw):
+        """
+        Returns dict of table name to rows made by `fetch`. With reflection
+        cache rows are fetched only for tables modified since they were
+        cached.
+        """
+        cache = self.reflection_cache
+        if cache is None or not self._has_table_stamps(
+                connection, schema, info_cache=info_cache):
+            return fetch(connection, schema, filter_names, kind, scope)
+
+        stamps = self._get_table_stamps(
+            connection, schema=schema,
+            filter_names=tuple(filter_names) if filter_names else None,
+            kind=kind, scope=scope, info_cache=info_cache
+        )
+        url = connection.engine.url
+        key = '{}:{}/{}@{}'.format(
+            url.host, url.port, schema or url.database,
+            '.'.join(str(x) for x in self.server_version_info or ())
+        )
+
+        with cache.lock:
+            entries = cache.load(key)
+            stale = [
+                name for name, stamp in stamps.items()
+                if entries.get(name, {}).get('stamp') != stamp or
+                part not in entries[name]
+            ]
+
+            if stale:
+                if len(stale) == len(stamps):
+                    rows = fetch(connection, schema, filter_names, kind, scope)
+                else:
+                    rows = fetch(
+                        connection, schema, stale, ObjectKind.ANY, scope
+                    )
+
+                for name in stale:
+                    if name not in rows:
+                        # Table is dropped in the meantime.
+                        continue
+                    entry = entries.get(name)
+                    if entry is None or entry.get('stamp') != stamps[name]:
+                        entry = entries[name] = {'stamp': stamps[name]}
+                    entry[part] = rows[name]
+                cache.save(key)
+
+            return {
+                name: entries[name][part] for name in stamps
+                if part in entries.get(name, {})
+            }
+
+    @reflection.cache
+    def _has_table_stamps(self, connection, schema=None, **kw):
+        """
+        Tables of databases like MySQL, PostgreSQL or Lazy ones don't
+        update ``metadata_modification_time`` on schema change, so they
+        are never cached.
+        """
+        query = text(
+            'SELECT engine FROM system.databases WHERE name = :database'
+        )
+        database = schema or connection.engine.url.database
+        rows = self._execute(connection, query, database=database)
+        return any(
+            r.engine in ('Atomic', 'Ordinary', 'Replicated') for r in rows
+        )
+
+    @reflection.cache
+    def _get_table_stamps(self, connection, schema=None, filter_names=None,
+                          kind=ObjectKind.TABLE, scope=ObjectScope.DEFAULT,
+                          **kw):
+        """
+        Returns dict of table name to string that changes with table's
+        schema. Modification time has second resolution, so table UUID and
+        hash of CREATE query are added to it.
+        """
+        columns = [
+            'name', 'metadata_modification_time',
+            'cityHash64(create_table_query) AS query_hash'
+        ]
+        if self.supports_table_uuid:
+            columns.append('toString(uuid) AS table_uuid')
+
+        query, params = self._get_multi_query(
+            connection, 'system.tables', 'name', columns,
+            schema, filter_names, kind, scope
+        )
+        if query is None:
+            return {}
+
+        rows = self._execute(connection, query, **params)
+        return {
+            r.name: '{}|{}|{}'.format(
+                r.metadata_modification_time, r.query_hash,
+                getattr(r, 'table_uuid', '')
+            )
+            for r in rows
+        }
+
+    def _get_multi_query(self, connection, system_table, name_column,
+                         columns, schema, filter_names, kind, scope,
+                         order_by=None):
+        """
+        Builds query over `system_table` rows of tables of one database.
+        Tables are filtered by `filter_names` or by `kind`, like
+        ``get_table_names`` and ``get_view_names`` do.
+        """
+        # ClickHouse temporary tables are not visible in system tables.
+        if ObjectScope.DEFAULT not in scope:
+            return None, None
+
+        database = schema or connection.engine.url.database
+        params = {'database': database}
+        conditions = ['database = :database']
+
+        if system_table != 'system.tables':
+            tables = (
+                "SELECT name FROM system.tables WHERE database = :database"
+            )
+        else:
+            tables = None
+
+        if kind is not ObjectKind.ANY:
+            kinds = []
+            if ObjectKind.TABLE in kind:
+                kinds.append(
+                    "engine NOT LIKE '%View' AND name NOT LIKE '.inner%'"
+                )
+            if ObjectKind.VIEW in kind or \
+                    ObjectKind.MATERIALIZED_VIEW in kind:
+                kinds.append("engine LIKE '%View'")
+            kind_condition = ' OR '.join('({})'.format(k) for k in kinds)
+
+            if tables is None:
+                conditions.append('({})'.format(kind_condition))
+            else:
+                conditions.append('{} IN ({} AND ({}))'.format(
+                    name_column, tables, kind_condition
+                ))
+
+        if filter_names:
+            conditions.append('{} IN :names'.format(name_column))
+            params['names'] = list(filter_names)
+
+        query = 'SELECT {} FROM {} WHERE {}'.format(
+            ', '.join(columns), system_table, ' AND '.join(conditions)
+        )
+        if order_by:
+            query += ' ORDER BY ' + order_by
+
+        query = text(query)
+        if filter_names:
+            query = query.bindparams(bindparam('names', expanding=True))
+
+        return query, params
+
     def _get_column_info(self, name, format_type, default_type,
                          default_expression, comment):
         col_type = self._get_column_type(name, format_type)
@@ -225,169 +450,80 @@ class ClickHouseDialect(default.DefaultDialect):
         return None
 
     def _get_column_type(self, name, spec):
-        if spec.startswith('Array'):
-            inner = spec[6:-1]
-            coltype = self.ischema_names['_array']
-            return coltype(self._get_column_type(name, inner))
-
-        elif spec.startswith('FixedString'):
-            length = int(spec[12:-1])
-            return self.ischema_names['FixedString'](length)
-
-        elif spec.startswith('Nullable'):
-            inner = spec[9:-1]
-            coltype = self.ischema_names['_nullable']
-            return coltype(self._get_column_type(name, inner))
+        try:
+            type_spec = parse_type(spec)
+        except ValueError:
+            warn("Could not parse type '%s' of column '%s'" % (spec, name))
+            return sqltypes.NullType
 
-        elif spec.startswith('LowCardinality'):
-            inner = spec[15:-1]
-            coltype = self.ischema_names['_lowcardinality']
-            return coltype(self._get_column_type(name, inner))
+        return self._get_type_from_spec(name, type_spec)
 
-        elif spec.startswith('AggregateFunction'):
-            params = spec[18:-1]
+    def _get_type_from_spec(self, name, spec):
+        type_name = spec.name
+        arguments = spec.arguments
 
-            arguments = parse_arguments(params)
-            agg_func, inner = arguments[0], arguments[1:]
+        if spec.text in self.ischema_names:
+            # Types with arguments in name, e.g. Object('json').
+            return self.ischema_names[spec.text]
 
-            inner_types = [
-                self._get_column_type(name, param)
-                for param in inner
-            ]
-            coltype = self.ischema_names['_aggregatefunction']
-            return coltype(agg_func, *inner_types)
+        elif type_name in ('Array', 'Nullable', 'LowCardinality'):
+            coltype = self.ischema_names['_' + type_name.lower()]
+            return coltype(self._get_type_from_spec(name, arguments[0]))
 
-        elif spec.startswith('SimpleAggregateFunction'):
-            params = spec[24:-1]
+        elif type_name == 'FixedString':
+            return self.ischema_names['FixedString'](arguments[0])
 
-            arguments = parse_arguments(params)
-            agg_func, inner = arguments[0], arguments[1:]
+        elif type_name in ('AggregateFunction', 'SimpleAggregateFunction'):
+            agg_func = arguments[0]
+            if isinstance(agg_func, TypeSpec):
+                agg_func = agg_func.text
 
             inner_types = [
-                self._get_column_type(name, param)
-                for param in inner
+                self._get_type_from_spec(name, param)
+                for param in spec.types[1:]
             ]
-            coltype = self.ischema_names['_simpleaggregatefunction']
+            coltype = self.ischema_names['_' + type_name.lower()]
             return coltype(agg_func, *inner_types)
 
-        elif spec.startswith('Tuple'):
-            inner = spec[6:-1]
-            coltype = self.ischema_names['_tuple']
+        elif type_name in ('Tuple', 'Map'):
+            coltype = self.ischema_names['_' + type_name.lower()]
             inner_types = [
-                self._get_column_type(name, t.strip())
-                for t in inner.split(',')
+                self._get_type_from_spec(name, t) for t in spec.types
             ]
             return coltype(*inner_types)
 
-        elif spec.startswith('Map'):
-            inner = spec[4:-1]
-            coltype = self.ischema_names['_map']
-            inner_types = [
-                self._get_column_type(name, t.strip())
-                for t in inner.split(',', 1)
-            ]
-            return coltype(*inner_types)
-
-        elif spec.startswith('Enum'):
-            pos = spec.find('(')
-            type = spec[:pos]
-            coltype = self.ischema_names[type]
-
-            options = dict()
-            if pos >= 0:
-                options = self._parse_options(
-                    spec[pos + 1: spec.rfind(')')]
-                )
-            if not options:
+        elif type_name in ('Enum8', 'Enum16'):
+            coltype = self.ischema_names[type_name]
+            if not arguments:
                 return sqltypes.NullType
 
-            type_enum = enum.Enum('%s_enum' % name, options)
+            type_enum = make_enum(name, arguments)
             return lambda: coltype(type_enum)
 
-        elif spec.startswith('Decimal'):
+        elif type_name == 'Decimal':
+            coltype = self.ischema_names['Decimal']
+            return coltype(*arguments)
+
+        elif type_name in decimal_precisions:
             coltype = self.ischema_names['Decimal']
-            return coltype(*self._parse_decimal_params(spec))
-        elif spec.startswith('DateTime64'):
-            coltype = self.ischema_names['DateTime64']
-            return coltype(*self._parse_detetime64_params(spec))
-        elif spec.startswith('DateTime'):
-            coltype = self.ischema_names['DateTime']
-            return coltype(*self._parse_detetime_params(spec))
+            return coltype(decimal_precisions[type_name], *arguments)
+
+        elif type_name in ('DateTime', 'DateTime64'):
+            coltype = self.ischema_names[type_name]
+            # Timezone is kept quoted, as it's written in type.
+            return coltype(*[
+                "'{}'".format(x) if isinstance(x, str) else x
+                for x in arguments
+            ])
+
         else:
             try:
-                return self.ischema_names[spec]
+                return self.ischema_names[spec.text]
             except KeyError:
                 warn("Did not recognize type '%s' of column '%s'" %
-                     (spec, name))
+                     (spec.text, name))
                 return sqltypes.NullType
 
-    @staticmethod
-    def _parse_decimal_params(spec):
-        inner_spec = get_inner_spec(spec)
-        precision, scale = inner_spec.split(',')
-        return int(precision.strip()), int(scale.strip())
-
-    @staticmethod
-    def _parse_detetime64_params(spec):
-        inner_spec = get_inner_spec(spec)
-        if not inner_spec:
-            return []
-        params = inner_spec.split(',', 1)
-        params[0] = int(params[0])
-        if len(params) > 1:
-            params[1] = params[1].strip()
-        return params
-
-    @staticmethod
-    def _parse_detetime_params(spec):
-        inner_spec = get_inner_spec(spec)
-        if not inner_spec:
-            return []
-        return [inner_spec]
-
-    @staticmethod
-    def _parse_options(option_string):
-        options = dict()
-        after_name = False
-        escaped = False
-        quote_character = None
-        name = ''
-        value = ''
-
-        for ch in option_string:
-            if escaped:
-                name += ch
-                escaped = False  # Accepting escaped character
-
-            elif after_name:
-                if ch in (' ', '='):
-                    pass
-                elif ch == ',':
-                    options[name] = int(value)
-                    after_name = False
-                    name = ''
-                    value = ''  # Reset before collecting new option
-                else:
-                    value += ch
-
-            elif quote_character:
-                if ch == '\\':
-                    escaped = True
-                elif ch == quote_character:
-                    quote_character = None
-                    after_name = True  # Start collecting option value
-                else:
-                    name += ch
-
-            else:
-                if ch == "'":
-                    quote_character = ch
-
-        if after_name:
-            options.setdefault(name, int(value))  # Word after last comma
-
-        return options
-
     @reflection.cache
     def get_schema_names(self, connection, **kw):
         rows = self._execute(connection, 'SHOW DATABASES')
@@ -421,6 +557,100 @@ class ClickHouseDialect(default.DefaultDialect):
                 }
         return {}
 
+    def get_multi_pk_constraint(self, connection, schema=None,
+                                filter_names=None, kind=ObjectKind.TABLE,
+                                scope=ObjectScope.DEFAULT, **kw):
+        if not self.supports_engine_reflection:
+            return self._default_multi_reflect(
+                self.get_pk_constraint, connection, kind=kind, schema=schema,
+                filter_names=filter_names, scope=scope, **kw
+            )
+
+        tables = self._get_tables_info(
+            connection, schema, filter_names, kind, scope, **kw
+        )
+        rv = []
+        for key, table in tables.items():
+            primary_keys = table['primary_key']
+            if primary_keys:
+                pk = {'constrained_columns': tuple(primary_keys.split(', '))}
+            else:
+                pk = {}
+            rv.append((key, pk))
+        return rv
+
+    def get_multi_table_comment(self, connection, schema=None,
+                                filter_names=None, kind=ObjectKind.TABLE,
+                                scope=ObjectScope.DEFAULT, **kw):
+        if not self.supports_table_comment_reflection:
+            raise NotImplementedError()
+
+        tables = self._get_tables_info(
+            connection, schema, filter_names, kind, scope, **kw
+        )
+        return [
+            (key, {'text': table['comment'] or None})
+            for key, table in tables.items()
+        ]
+
+    def get_multi_engine(self, connection, schema=None, filter_names=None,
+                         kind=ObjectKind.TABLE, scope=ObjectScope.DEFAULT,
+                         **kw):
+        tables = self._get_tables_info(
+            connection, schema, filter_names, kind, scope, **kw
+        )
+        columns = ['name'] + self._engine_columns
+        return [
+            (key, {x: table[x] for x in columns})
+            for key, table in tables.items()
+        ]
+
+    _engine_columns = [
+        'engine_full', 'engine', 'partition_key', 'sorting_key',
+        'primary_key', 'sampling_key'
+    ]
+
+    def _get_tables_info(self, connection, schema, filter_names, kind,
+                         scope, info_cache=None, **kw):
+        # Reflection cache key is built from hashable keyword arguments.
+        return self._get_multi_tables(
+            connection, schema=schema,
+            filter_names=tuple(filter_names) if filter_names else None,
+            kind=kind, scope=scope, info_cache=info_cache
+        )
+
+    @reflection.cache
+    def _get_multi_tables(self, connection, schema=None, filter_names=None,
+                          kind=ObjectKind.TABLE, scope=ObjectScope.DEFAULT,
+                          **kw):
+        """
+        Reads ``system.tables`` rows of all requested tables at once.
+        Primary keys, comments and engines are taken from the same rows.
+        """
+        tables = self._get_cached_rows(
+            connection, 'tables', self._fetch_tables_rows,
+            schema, filter_names, kind, scope, **kw
+        )
+        return {(schema, name): row for name, row in tables.items()}
+
+    def _fetch_tables_rows(self, connection, schema, filter_names, kind,
+                           scope):
+        columns = ['name']
+        if self.supports_engine_reflection:
+            columns += self._engine_columns
+        if self.supports_table_comment_reflection:
+            columns.append('comment')
+
+        query, params = self._get_multi_query(
+            connection, 'system.tables', 'name', columns,
+            schema, filter_names, kind, scope
+        )
+        if query is None:
+            return {}
+
+        rows = self._execute(connection, query, **params)
+        return {r.name: {x: getattr(r, x) for x in columns} for r in rows}
+
     @reflection.cache
     def get_indexes(self, connection, table_name, schema=None, **kw):
         # No support for indexes.
@@ -525,5 +755,61 @@ class ClickHouseDialect(default.DefaultDialect):
             'server_version', self.forced_server_version_string)
         return super(ClickHouseDialect, self).connect(*cargs, **cparams)
 
+    def read_dataframe(self, connection, statement, params=None,
+                       settings=None):
+        """
+        Executes SELECT statement and returns its result as
+        ``pandas.DataFrame``. Column dtypes are chosen by ClickHouse types.
+        """
+        check_pandas()
+
+        if isinstance(statement, str):
+            statement = text(statement)
+        execution_options = dict(self.dataframe_execution_options)
+        if settings:
+            execution_options['settings'] = settings
+
+        rv = connection.execute(
+            statement, params, execution_options=execution_options
+        )
+        try:
+            cursor = rv.cursor
+            description = cursor.description
+            if hasattr(cursor, 'fetch_columns'):
+                columns = cursor.fetch_columns()
+            else:
+                columns = make_columns(
+                    [x[0] for x in description], cursor.fetchall()
+                )
+        finally:
+            rv.close()
+
+        names = [x[0] for x in description]
+        return make_dataframe(
+            self, names, [x[1] for x in description],
+            [columns[name] for name in names]
+        )
+
+    def insert_dataframe(self, connection, table, dataframe, settings=None):
+        """
+        Inserts ``pandas.DataFrame`` into table. DataFrame columns are
+        inserted into table columns of the same names.
+        """
+        query = self._get_dataframe_insert(table, dataframe) + ' VALUES'
+        execution_options = {'settings': settings} if settings else {}
+        connection.exec_driver_sql(
+            query, list(iter_dataframe_rows(dataframe)),
+            execution_options=execution_options
+        )
+
+    def _get_dataframe_insert(self, table, dataframe):
+        if not isinstance(table, str):
+            table = self.identifier_preparer.format_table(table)
+
+        columns = ', '.join(
+            self.identifier_preparer.quote(str(x)) for x in dataframe.columns
+        )
+        return 'INSERT INTO {} ({})'.format(table, columns)
+
 
 clickhouse_dialect = ClickHouseDialect()
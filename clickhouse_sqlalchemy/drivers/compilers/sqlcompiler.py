@@ -1,3 +1,5 @@
+import re
+
 from sqlalchemy import exc, literal_column
 from sqlalchemy.sql import compiler, elements, COLLECT_CARTESIAN_PRODUCTS, \
     WARN_LINTING, crud
@@ -7,9 +9,41 @@ from sqlalchemy.util import inspect_getfullargspec
 import clickhouse_sqlalchemy.sql.functions  # noqa:F401
 
 from ... import types
+from ...types.common import ClickHouseTypeEngine
+
+
+SERVER_SIDE_BIND_NAME_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
 
 
 class ClickHouseSQLCompiler(compiler.SQLCompiler):
+    def __init__(self, *args, **kwargs):
+        # Bind name -> ClickHouse type of parameters rendered as
+        # `{name:Type}` placeholders. Their values are sent separately.
+        self.server_side_binds = {}
+        super(ClickHouseSQLCompiler, self).__init__(*args, **kwargs)
+
+    def bindparam_string(self, name, post_compile=False, expanding=False,
+                         bindparam_type=None, **kw):
+        rv = super(ClickHouseSQLCompiler, self).bindparam_string(
+            name, post_compile=post_compile, expanding=expanding,
+            bindparam_type=bindparam_type, **kw
+        )
+
+        server_side = (
+            self.dialect.server_side_params and
+            not post_compile and
+            not self.isinsert and
+            isinstance(bindparam_type, ClickHouseTypeEngine) and
+            SERVER_SIDE_BIND_NAME_RE.match(name)
+        )
+        if not server_side:
+            return rv
+
+        type_ = self.dialect.type_compiler_instance.process(bindparam_type)
+        self.server_side_binds[name] = type_
+        # Placeholder must survive client side `%` formatting.
+        return '{%s:%s}' % (name, type_.replace('%', '%%'))
+
     def visit_mod_binary(self, binary, operator, **kw):
         return self.process(binary.left, **kw) + ' %% ' + \
             self.process(binary.right, **kw)
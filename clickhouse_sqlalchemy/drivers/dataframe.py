@@ -0,0 +1,99 @@
+from sqlalchemy.sql.type_api import to_instance
+
+from .. import types
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+numpy_dtypes = {
+    types.Int8: 'int8',
+    types.UInt8: 'uint8',
+    types.Int16: 'int16',
+    types.UInt16: 'uint16',
+    types.Int32: 'int32',
+    types.UInt32: 'uint32',
+    types.Int64: 'int64',
+    types.UInt64: 'uint64',
+    types.Float32: 'float32',
+    types.Float64: 'float64',
+    types.Boolean: 'bool',
+}
+
+# Pandas extension types keep integers and booleans with NULLs.
+nullable_dtypes = {
+    types.Int8: 'Int8',
+    types.UInt8: 'UInt8',
+    types.Int16: 'Int16',
+    types.UInt16: 'UInt16',
+    types.Int32: 'Int32',
+    types.UInt32: 'UInt32',
+    types.Int64: 'Int64',
+    types.UInt64: 'UInt64',
+    types.Float32: 'float32',
+    types.Float64: 'float64',
+    types.Boolean: 'boolean',
+}
+
+
+def check_pandas():
+    if pandas is None:
+        raise RuntimeError('Package pandas is required for DataFrames')
+
+
+def make_series(values, type_):
+    """
+    Converts column values into ``pandas.Series`` of dtype matching
+    ClickHouse type. Values of types without matching dtype are left as
+    Python objects.
+    """
+    type_ = to_instance(type_)
+
+    if isinstance(type_, types.LowCardinality):
+        return pandas.Series(pandas.Categorical(values))
+
+    nullable = isinstance(type_, types.Nullable)
+    if nullable:
+        type_ = to_instance(type_.nested_type)
+
+    if isinstance(type_, (types.DateTime, types.Date, types.Date32)):
+        rv = pandas.to_datetime(pandas.Series(values, dtype=object))
+        # Newer pandas infers resolution from values.
+        rv = rv.astype('datetime64[ns]')
+        timezone = getattr(type_, 'timezone', None)
+        if timezone:
+            rv = rv.dt.tz_localize(timezone.strip("'"))
+        return rv
+
+    dtypes = nullable_dtypes if nullable else numpy_dtypes
+    dtype = dtypes.get(type(type_))
+    if dtype is None:
+        return pandas.Series(values, dtype=object)
+    return pandas.Series(values, dtype=dtype)
+
+
+def make_dataframe(dialect, names, type_specs, columns):
+    """
+    Builds ``pandas.DataFrame`` from columns. ClickHouse type names are
+    resolved with dialect's `ischema_names`.
+    """
+    check_pandas()
+
+    data = {}
+    for name, spec, values in zip(names, type_specs, columns):
+        type_ = dialect._get_column_type(name, spec)
+        data[name] = make_series(values, type_)
+    return pandas.DataFrame(data, columns=names)
+
+
+def iter_dataframe_rows(dataframe):
+    """
+    Returns iterator of DataFrame rows as tuples of Python objects. Missing
+    values are ``None``.
+    """
+    check_pandas()
+
+    values = dataframe.astype(object).where(dataframe.notna(), None)
+    return values.itertuples(index=False, name=None)
@@ -0,0 +1,115 @@
+import io
+from itertools import chain
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def check_arrow():
+    if pyarrow is None:
+        raise RuntimeError('Package pyarrow is required for Arrow format')
+
+
+class ChunksReader(io.RawIOBase):
+    """
+    File-like object over iterable of bytes chunks. Lets ``pyarrow`` read
+    IPC stream directly from response body.
+    """
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        # Slicing memoryview doesn't copy the rest of the chunk.
+        self.pending = memoryview(b'')
+        super(ChunksReader, self).__init__()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = memoryview(chunk)
+
+        size = min(len(b), len(self.pending))
+        b[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def iter_record_batches(chunks):
+    """
+    Yields schema and then ``pyarrow.RecordBatch`` objects of
+    ``ArrowStream`` body. Nothing is yielded for empty body.
+    """
+    check_arrow()
+
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    while first is not None and not first:
+        first = next(chunks, None)
+    if first is None:
+        # Empty result; e.g. a DDL request.
+        return
+
+    source = io.BufferedReader(ChunksReader(chain([first], chunks)))
+    reader = pyarrow.ipc.open_stream(source)
+    yield reader.schema
+    yield from reader
+
+
+def from_pandas(dataframe):
+    check_arrow()
+    return pyarrow.Table.from_pandas(dataframe, preserve_index=False)
+
+
+def make_table(schema, batches):
+    return pyarrow.Table.from_batches(batches, schema=schema)
+
+
+def get_record_batches(data):
+    """
+    Returns schema and iterable of record batches of ``pyarrow.Table``,
+    ``pyarrow.RecordBatch`` or ``pyarrow.RecordBatchReader``.
+    """
+    check_arrow()
+
+    if isinstance(data, pyarrow.RecordBatch):
+        return data.schema, [data]
+    if isinstance(data, pyarrow.Table):
+        return data.schema, data.to_batches()
+    if isinstance(data, pyarrow.RecordBatchReader):
+        return data.schema, data
+
+    raise TypeError(
+        'Expected pyarrow Table, RecordBatch or RecordBatchReader, '
+        'got {}'.format(type(data).__name__)
+    )
+
+
+def iter_arrow_chunks(schema, batches):
+    """
+    Encodes record batches as ``ArrowStream`` and yields bytes chunk per
+    batch. Batches are encoded one by one, so reader is not materialized.
+    """
+    sink = io.BytesIO()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+
+    writer.close()
+    yield sink.getvalue()
+
+
+def iter_arrow_rows(batches):
+    """
+    Converts record batches into row tuples.
+    """
+    for batch in batches:
+        columns = [column.to_pylist() for column in batch.columns]
+        yield from zip(*columns)
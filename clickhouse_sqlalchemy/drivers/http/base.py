@@ -1,8 +1,13 @@
 import sqlalchemy as sa
 from sqlalchemy.util import asbool
 
+from ..balancer import Balancer, parse_hosts, pop_balancer_options
 from ..base import ClickHouseDialect, ClickHouseExecutionContextBase
+from ..dataframe import check_pandas
+from ..reflection import ReflectionCache
 from . import connector
+from .arrow import from_pandas
+from .session import make_session, pop_session_options
 
 
 # Export connector version
@@ -13,12 +18,36 @@ class ClickHouseExecutionContext(ClickHouseExecutionContextBase):
     def pre_exec(self):
         pass
 
+    def create_server_side_cursor(self):
+        # Cursor decides to stream rows from response by `stream_results`
+        # execution option.
+        return self.create_default_cursor()
+
+
+class DataFrameContext(object):
+    """
+    Execution options of DataFrame insert, which doesn't go through
+    SQLAlchemy execution.
+    """
+    compiled = None
+
+    def __init__(self, settings=None):
+        self.execution_options = {'settings': settings} if settings else {}
+
 
 class ClickHouseDialect_http(ClickHouseDialect):
     driver = 'http'
     execution_ctx_cls = ClickHouseExecutionContext
 
     supports_statement_cache = True
+    supports_server_side_cursors = True
+
+    # Session shared by engine connections, see ``share_session`` option.
+    _http_session = None
+
+    supports_json_columns = False
+    # Falls back to rows on servers without JSONColumnsWithMetadata format.
+    dataframe_execution_options = {'columnar': True, 'json_columns': True}
 
     @classmethod
     def import_dbapi(cls):
@@ -27,7 +56,8 @@ class ClickHouseDialect_http(ClickHouseDialect):
     def create_connect_args(self, url):
         kwargs = {}
         protocol = url.query.get('protocol', 'http')
-        port = url.port or 8123
+        default_port = 8443 if protocol == 'https' else 8123
+        port = url.port or default_port
         db_name = url.database or 'default'
         endpoint = url.query.get('endpoint', '')
 
@@ -35,16 +65,69 @@ class ClickHouseDialect_http(ClickHouseDialect):
         self.engine_reflection = asbool(
             query.pop('engine_reflection', 'true')
         )
+        cache_dir = query.pop('reflection_cache', None)
+        self.reflection_cache = ReflectionCache(cache_dir) if cache_dir \
+            else None
+        share_session = asbool(query.pop('share_session', 'false'))
+        self.server_side_params = asbool(
+            query.pop('server_side_params', 'false')
+        )
+        hosts = query.pop('hosts', None)
+        balancer_options = pop_balancer_options(query)
         url = url.set(query=query)
 
         kwargs.update(query)
+        if share_session:
+            options = pop_session_options(kwargs)
+            kwargs['http_session'] = self._get_shared_session(options)
         if kwargs.get('verify') and kwargs['verify'] in ('False', 'false'):
             kwargs['verify'] = False
 
         db_url = '%s://%s:%d/%s' % (protocol, url.host, port, endpoint)
 
+        if hosts:
+            hosts = [(url.host, port)] + parse_hosts(hosts, default_port)
+            kwargs['balancer'] = Balancer([
+                ('%s:%d' % (host, port),
+                 '%s://%s:%d/%s' % (protocol, host, port, endpoint))
+                for host, port in hosts
+            ], **balancer_options)
+
         return (db_url, db_name, url.username, url.password), kwargs
 
+    def initialize(self, connection):
+        super(ClickHouseDialect_http, self).initialize(connection)
+        self.supports_json_columns = self.server_version_info >= (22, 7)
+
+    @classmethod
+    def engine_created(cls, engine):
+        if engine.dialect._http_session is not None:
+            sa.event.listen(
+                engine, 'engine_disposed',
+                lambda engine: engine.dialect._http_session.close()
+            )
+
+    def _get_shared_session(self, options):
+        # One session (and one socket pool) for all connections
+        # of the engine.
+        if self._http_session is None:
+            self._http_session = make_session(**options)
+        return self._http_session
+
+    def insert_dataframe(self, connection, table, dataframe, settings=None):
+        # Sent as ArrowStream: categoricals and datetimes are kept.
+        check_pandas()
+
+        query = self._get_dataframe_insert(table, dataframe)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.insert_arrow(
+                query, from_pandas(dataframe),
+                context=DataFrameContext(settings)
+            )
+        finally:
+            cursor.close()
+
     def _execute(self, connection, sql, scalar=False, **kwargs):
         if isinstance(sql, str):
             # Makes sure the query will go through the
@@ -0,0 +1,163 @@
+import zlib
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+methods = ('gzip', 'deflate', 'lz4', 'zstd')
+
+
+def check_method(method):
+    if method not in methods:
+        raise ValueError(
+            "Unknown compression method '{}'. Possible choices: {}".format(
+                method, ', '.join(methods)
+            )
+        )
+
+    if method == 'lz4' and lz4 is None:
+        raise RuntimeError('Package lz4 is required for lz4 compression')
+
+    if method == 'zstd' and zstandard is None:
+        raise RuntimeError(
+            'Package zstandard is required for zstd compression'
+        )
+
+
+class GzipDecompressor(object):
+    def __init__(self, wbits=16 + zlib.MAX_WBITS):
+        self.obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data):
+        return self.obj.decompress(data)
+
+    def flush(self):
+        return self.obj.flush()
+
+
+class LZ4Decompressor(object):
+    def __init__(self):
+        self.obj = lz4.frame.LZ4FrameDecompressor()
+
+    def decompress(self, data):
+        rv = self.obj.decompress(data)
+        # Body can consist of several frames.
+        while self.obj.eof and self.obj.unused_data:
+            data = self.obj.unused_data
+            self.obj = lz4.frame.LZ4FrameDecompressor()
+            rv += self.obj.decompress(data)
+        return rv
+
+    def flush(self):
+        return b''
+
+
+class ZstdDecompressor(object):
+    def __init__(self):
+        self.obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        return self.obj.decompress(data)
+
+    def flush(self):
+        return b''
+
+
+def get_decompressor(encoding):
+    """
+    Returns streaming decompressor for response ``Content-Encoding`` or
+    ``None`` if body is not compressed.
+    """
+    if encoding == 'gzip':
+        return GzipDecompressor()
+    elif encoding == 'deflate':
+        return GzipDecompressor(zlib.MAX_WBITS)
+    elif encoding == 'lz4':
+        return LZ4Decompressor()
+    elif encoding == 'zstd':
+        return ZstdDecompressor()
+    return None
+
+
+class GzipCompressor(object):
+    def __init__(self, wbits=16 + zlib.MAX_WBITS):
+        self.obj = zlib.compressobj(wbits=wbits)
+
+    def compress(self, data):
+        return self.obj.compress(data)
+
+    def flush(self):
+        return self.obj.flush()
+
+
+class LZ4Compressor(object):
+    def __init__(self):
+        self.obj = lz4.frame.LZ4FrameCompressor()
+        self.started = False
+
+    def compress(self, data):
+        rv = b''
+        if not self.started:
+            rv = self.obj.begin()
+            self.started = True
+        return rv + self.obj.compress(data)
+
+    def flush(self):
+        rv = b'' if self.started else self.obj.begin()
+        return rv + self.obj.flush()
+
+
+class ZstdCompressor(object):
+    def __init__(self):
+        self.obj = zstandard.ZstdCompressor().compressobj()
+
+    def compress(self, data):
+        return self.obj.compress(data)
+
+    def flush(self):
+        return self.obj.flush()
+
+
+def get_compressor(method):
+    if method == 'gzip':
+        return GzipCompressor()
+    elif method == 'deflate':
+        return GzipCompressor(zlib.MAX_WBITS)
+    elif method == 'lz4':
+        return LZ4Compressor()
+    elif method == 'zstd':
+        return ZstdCompressor()
+    raise ValueError("Unknown compression method '{}'".format(method))
+
+
+def compress(method, data):
+    compressor = get_compressor(method)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_stream(decompressor, chunks):
+    for chunk in chunks:
+        chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
+
+    chunk = decompressor.flush()
+    if chunk:
+        yield chunk
+
+
+def compress_stream(method, chunks):
+    compressor = get_compressor(method)
+    for chunk in chunks:
+        chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+
+    yield compressor.flush()
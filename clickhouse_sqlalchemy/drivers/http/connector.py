@@ -1,7 +1,17 @@
+import re
+from itertools import chain, islice
+from operator import itemgetter, methodcaller
 from uuid import uuid4
 
+from ..util import RowBuffer, make_columns
+from ...types.common import ClickHouseTypeEngine
+from .arrow import (
+    get_record_batches, iter_arrow_chunks, iter_arrow_rows, make_table
+)
 from .escaper import Escaper
+from .rowbinary import make_row_writer, write_header
 from .transport import RequestsTransport
+from .utils import iter_insert_chunks, make_tsv_row_writer
 
 # PEP 249 module globals
 apilevel = '2.0'
@@ -11,6 +21,12 @@ threadsafety = 2
 paramstyle = 'pyformat'
 
 
+insert_formats = ('RowBinary', 'TabSeparated')
+DEFAULT_INSERT_CHUNK_SIZE = 1024 * 1024
+
+VALUES_BIND_RE = re.compile(r'^%\((\w+)\)s$')
+
+
 class Error(Exception):
     """
     Exception that is the base class of all other error exceptions.
@@ -19,6 +35,34 @@ class Error(Exception):
     pass
 
 
+def check_insert_format(insert_format):
+    if insert_format is not None and insert_format not in insert_formats:
+        raise ValueError(
+            "Unknown insert format '{}'. Possible choices: {}".format(
+                insert_format, ', '.join(insert_formats)
+            )
+        )
+    return insert_format
+
+
+def parse_values_template(template):
+    """
+    Returns bind names of ``(%(a)s, %(b)s)`` template or ``None`` if values
+    are not plain binds.
+    """
+    template = template.strip()
+    if not template.startswith('(') or not template.endswith(')'):
+        return None
+
+    names = []
+    for item in template[1:-1].split(','):
+        match = VALUES_BIND_RE.match(item.strip())
+        if match is None:
+            return None
+        names.append(match.group(1))
+    return names
+
+
 def connect(*args, **kwargs):
     """
     Make new connection.
@@ -34,12 +78,18 @@ class Connection(object):
         stream = bool(kwargs.pop('stream', None))
         self._prefetch = not stream
 
-        # TODO: support `stream` argument in the transport.
+        self.insert_format = check_insert_format(
+            kwargs.pop('insert_format', None) or None
+        )
+        self.insert_chunk_size = int(
+            kwargs.pop('insert_chunk_size', DEFAULT_INSERT_CHUNK_SIZE)
+        )
+
         self.transport = self.transport_cls(*args, **kwargs)
         super(Connection, self).__init__()
 
     def close(self):
-        pass
+        self.transport.close()
 
     def commit(self):
         pass
@@ -76,6 +126,10 @@ class Cursor(object):
     _response = None
     # Result data prefetch cache:
     _rows = None
+    # Record batches of Arrow result:
+    _batches = None
+    # Arrow batch rows are being fetched from:
+    _batch = None
 
     def __init__(self, connection):
         self._connection = connection
@@ -98,8 +152,34 @@ class Cursor(object):
             for name, type_code in zip(columns, types)
         ]
 
+    @property
+    def summary(self):
+        """
+        ``X-ClickHouse-Summary`` of the last query: rows and bytes read and
+        written. Not in PEP 249.
+        """
+        return self._summary or None
+
     def close(self):
-        pass
+        batches, self._batches = self._batches, None
+        if hasattr(batches, 'close'):
+            batches.close()
+
+        response, self._response = self._response, None
+        if response is None:
+            return
+
+        # Stops reading and closes HTTP response.
+        response.close()
+        if self._kill_on_close and not self._response_done:
+            self._connection.transport.kill_query(self._query_id)
+
+    def __del__(self):
+        # Result may be garbage collected without closing the cursor.
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def _prepare(self, raw_sql, context=None):
         if context:
@@ -107,6 +187,20 @@ class Cursor(object):
         else:
             execution_options = {}
 
+        self._stream_results = execution_options.get('stream_results', False)
+        self._timeout = execution_options.get('timeout')
+        self._kill_on_close = execution_options.get('kill_on_close', False)
+        self._progress_callback = execution_options.get('progress_callback')
+        self._use_numpy = execution_options.get('use_numpy', False)
+        # NumPy arrays are built by Arrow from binary columns.
+        self._arrow = execution_options.get('arrow', False) or self._use_numpy
+        # JSONColumnsWithMetadata format is supported by newer servers.
+        self._json_columns = (
+            execution_options.get('json_columns', False) and
+            not self._arrow and
+            getattr(context.dialect, 'supports_json_columns', False)
+        )
+
         settings = execution_options.get('settings')
         if settings:
             raw_settings = ", ".join(
@@ -118,17 +212,34 @@ class Cursor(object):
 
     def execute(self, operation, parameters=None, context=None):
         raw_sql = operation
+        server_params = {}
 
         if parameters is not None:
+            server_binds = self._get_server_side_binds(context)
+            if server_binds:
+                server_params = self._escape_server_params(
+                    parameters, server_binds
+                )
+                parameters = {
+                    key: value for key, value in parameters.items()
+                    if key not in server_binds
+                }
             raw_sql = raw_sql % self._params_escaper.escape(parameters)
 
+        self.close()
         self._reset_state()
         self._begin_query()
 
         transport = self._connection.transport
         params = {'query_id': self._query_id}
+        params.update(server_params)
         raw_sql = self._prepare(raw_sql, context)
-        response_gen = transport.execute(raw_sql, params=params)
+        response_gen = transport.execute(
+            raw_sql, params=params, timeout=self._timeout,
+            progress_callback=self._progress_callback,
+            summary_callback=self._summary.update, arrow=self._arrow,
+            json_columns=self._json_columns
+        )
 
         self._process_response(response_gen)
         self._end_query()
@@ -136,6 +247,16 @@ class Cursor(object):
     def executemany(self, operation, seq_of_parameters, context=None):
         index = operation.index('VALUES') + 7
         values_tpl = operation[index:]
+
+        insert_format = self._get_insert_option(context, 'insert_format')
+        if insert_format and seq_of_parameters is not None:
+            names = parse_values_template(values_tpl)
+            if names is not None:
+                self._insert(
+                    operation[:index - 7], names, seq_of_parameters,
+                    check_insert_format(insert_format), context
+                )
+                return
         params = ', '.join(
             values_tpl % self._params_escaper.escape(params)
             for params in seq_of_parameters
@@ -148,49 +269,103 @@ class Cursor(object):
 
     def fetchone(self):
         self.check_query_started()
+        self._columns_to_rows()
 
         # `self._prefetch` case:
         if self._rows is not None:
-            if not self._rows:
-                return None
-            return self._rows.pop(0)
+            return self._rows.fetchone()
 
-        return next(self._response, None)
+        row = next(self._response, None)
+        if row is None:
+            self._response_done = True
+        return row
 
     def fetchmany(self, size=1):
         self.check_query_started()
+        self._columns_to_rows()
 
         # `self._prefetch` case:
         if self._rows is not None:
-            rv = self._rows[:size]
-            self._rows = self._rows[size:]
-            return rv
-
-        rows = []
-        for _ in range(size):
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
+            return self._rows.fetchmany(size)
+
+        rows = list(islice(self._response, size))
+        if len(rows) < size:
+            self._response_done = True
         return rows
 
     def fetchall(self):
         self.check_query_started()
+        self._columns_to_rows()
 
         # `self._prefetch` case:
         if self._rows is not None:
-            rv = self._rows
-            self._rows = []
-            return rv
-
-        rows = []
-        while True:
-            row = self.fetchone()
-            if row is None:
-                break
-            rows.append(row)
+            return self._rows.fetchall()
+
+        rows = list(self._response)
+        self._response_done = True
         return rows
 
+    def fetch_arrow(self):
+        """
+        Returns remaining rows of result requested with ``arrow`` execution
+        option as ``pyarrow.Table``. Not in PEP 249.
+        """
+        self.check_query_started()
+
+        if self._batches is None:
+            raise RuntimeError(
+                'Result is not in Arrow format. Use arrow execution option'
+            )
+        if self._schema is None:
+            return None
+
+        batches = list(self._batches)
+        if self._batch is not None:
+            # Rows of the current batch not fetched yet.
+            rest = self._batch.slice(self._batch_offset)
+            if rest.num_rows:
+                batches.insert(0, rest)
+            self._batch = None
+
+        table = make_table(self._schema, batches)
+        self._response = iter(())
+        self._response_done = True
+        return table
+
+    def fetch_columns(self):
+        """
+        Returns remaining rows as dict of column name to column values:
+        NumPy arrays with ``use_numpy`` execution option, lists for Arrow
+        and ``json_columns`` results and tuples otherwise. Not in PEP 249.
+        """
+        self.check_query_started()
+
+        if self._columns_data is not None:
+            data, self._columns_data = self._columns_data, None
+            self._rows = RowBuffer()
+            return dict(zip(self._columns, data))
+
+        if self._batches is None:
+            return make_columns(self._columns or [], self.fetchall())
+
+        table = self.fetch_arrow()
+        if table is None:
+            return {}
+
+        if self._use_numpy:
+            convert = methodcaller('to_numpy')
+        else:
+            convert = methodcaller('to_pylist')
+        return {
+            name: convert(column)
+            for name, column in zip(table.column_names, table.columns)
+        }
+
+    def _columns_to_rows(self):
+        if self._columns_data is not None:
+            data, self._columns_data = self._columns_data, None
+            self._rows = RowBuffer(list(zip(*data)))
+
     @property
     def arraysize(self):
         return self._arraysize
@@ -213,28 +388,180 @@ class Cursor(object):
         if self._state == self._states.NONE or self._query_id is None:
             raise RuntimeError("No query yet")
 
-        # Try to cancel query by sending query with the same query_id.
-        transport = self._connection.transport
-        params = {'query_id': self._query_id}
-        transport.execute('SELECT 1', params=params)
+        self._connection.transport.kill_query(self._query_id)
 
         self._end_query()
         self._query_id = None
         self._rows = None
 
+    def insert_arrow(self, operation, data, context=None):
+        """
+        Inserts ``pyarrow.Table``, ``pyarrow.RecordBatch`` or
+        ``pyarrow.RecordBatchReader`` streamed in ``ArrowStream`` format.
+        Not in PEP 249.
+        :param operation: ``INSERT INTO table [(columns)]`` query.
+        """
+        chunks = iter_arrow_chunks(*get_record_batches(data))
+
+        self.close()
+        self._reset_state()
+        self._begin_query()
+
+        transport = self._connection.transport
+        params = {'query_id': self._query_id}
+        raw_sql = self._prepare(operation.rstrip(), context)
+        raw_sql += ' FORMAT ArrowStream'
+        transport.insert(
+            raw_sql, chunks, params=params, timeout=self._timeout,
+            progress_callback=self._progress_callback,
+            summary_callback=self._summary.update
+        )
+
+        self._end_query()
+
+    def _get_insert_option(self, context, name):
+        if context and name in context.execution_options:
+            return context.execution_options[name]
+        return getattr(self._connection, name)
+
+    def _get_row_writer(self, insert_format, names, context):
+        """
+        Returns actual format, row writer and settings for INSERT.
+        """
+        if insert_format == 'RowBinary' and context is not None:
+            binds = context.compiled.binds
+            type_compiler = context.dialect.type_compiler_instance
+
+            types = []
+            for name in names:
+                type_ = binds[name].type
+                if not isinstance(type_, ClickHouseTypeEngine):
+                    types = None
+                    break
+                types.append(type_compiler.process(type_))
+
+            if types is not None:
+                try:
+                    timezone = self._connection.transport.server_timezone
+                    write_row = make_row_writer(types, timezone)
+                except ValueError:
+                    pass
+                else:
+                    # Values are encoded by bind types. Types are sent in
+                    # header and server rejects data if they don't match
+                    # table columns. Columns are matched by position.
+                    header = bytearray()
+                    write_header(names, types, header)
+                    settings = {
+                        'input_format_with_names_use_header': 0,
+                        'input_format_with_types_use_header': 1
+                    }
+                    return (
+                        'RowBinaryWithNamesAndTypes', write_row,
+                        bytes(header), settings
+                    )
+
+        # Column types are unknown or not supported by RowBinary encoder.
+        return 'TabSeparated', make_tsv_row_writer(), None, {}
+
+    def _insert(self, operation, names, seq_of_parameters, insert_format,
+                context):
+        """
+        Streams rows in request body encoded in `insert_format`.
+        """
+        insert_format, write_row, header, settings = self._get_row_writer(
+            insert_format, names, context
+        )
+        chunk_size = int(self._get_insert_option(context, 'insert_chunk_size'))
+
+        getter = itemgetter(*names)
+        if len(names) == 1:
+            rows = ((getter(x), ) for x in seq_of_parameters)
+        else:
+            rows = (getter(x) for x in seq_of_parameters)
+        chunks = iter_insert_chunks(rows, write_row, chunk_size)
+        if header:
+            chunks = chain([header], chunks)
+
+        self.close()
+        self._reset_state()
+        self._begin_query()
+
+        transport = self._connection.transport
+        params = dict(settings, query_id=self._query_id)
+        raw_sql = self._prepare(operation.rstrip(), context)
+        raw_sql += ' FORMAT ' + insert_format
+        transport.insert(
+            raw_sql, chunks, params=params, timeout=self._timeout,
+            progress_callback=self._progress_callback,
+            summary_callback=self._summary.update
+        )
+
+        self._end_query()
+
+    @staticmethod
+    def _get_server_side_binds(context):
+        compiled = context.compiled if context else None
+        return getattr(compiled, 'server_side_binds', None)
+
+    def _escape_server_params(self, parameters, server_binds):
+        escape = self._params_escaper.escape_server_param
+        return {
+            'param_' + name: escape(parameters[name], type_)
+            for name, type_ in server_binds.items()
+            if name in parameters
+        }
+
     @property
     def _prefetch(self):
-        return self._connection._prefetch
+        return self._connection._prefetch and not self._stream_results
 
     def _process_response(self, response):
         response = iter(response)
 
+        if self._arrow:
+            self._process_arrow_response(response)
+            return
+
+        if self._json_columns:
+            # Columns are complete only at the end of response.
+            result = list(response)
+            if result:
+                self._columns, self._types, self._columns_data = result
+            else:
+                self._rows = RowBuffer()
+            return
+
         self._columns = next(response, None)
         self._types = next(response, None)
-        self._response = response
 
         if self._prefetch:
-            self._rows = list(response)
+            self._rows = RowBuffer(list(response))
+        else:
+            self._response = response
+
+    def _process_arrow_response(self, response):
+        self._schema = schema = next(response, None)
+        if schema is not None:
+            self._columns = schema.names
+            self._types = [str(type_) for type_ in schema.types]
+
+        if self._prefetch:
+            response = iter(list(response))
+            self._response_done = True
+
+        # Rows are converted from batches only if they are fetched.
+        self._batches = response
+        self._response = self._iter_arrow_rows(response)
+
+    def _iter_arrow_rows(self, batches):
+        # Current batch and position are kept for `fetch_arrow`.
+        for batch in batches:
+            self._batch, self._batch_offset = batch, 0
+            for row in iter_arrow_rows([batch]):
+                self._batch_offset += 1
+                yield row
+        self._batch = None
 
     def _reset_state(self):
         """
@@ -247,6 +574,24 @@ class Cursor(object):
         self._types = None
         self._rows = None
         self._response = None
+        self._response_done = False
+        self._batches = None
+        self._batch = None
+        self._batch_offset = 0
+        self._schema = None
+
+        self._stream_results = False
+        self._timeout = None
+        self._kill_on_close = False
+        self._progress_callback = None
+        self._arrow = False
+        self._use_numpy = False
+        self._json_columns = False
+        # Columnar result until rows are fetched.
+        self._columns_data = None
+        # Filled by transport. Bound method of cursor would make reference
+        # cycle with streamed response.
+        self._summary = {}
 
     def _begin_query(self):
         self._state = self._states.RUNNING
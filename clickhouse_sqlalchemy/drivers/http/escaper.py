@@ -83,3 +83,26 @@ class Escaper(object):
             return self.escape_uuid(item)
         else:
             raise Exception("Unsupported object {}".format(item))
+
+    def escape_server_param(self, item, type_=None):
+        """
+        Formats value of server side query parameter. Unlike
+        :meth:`escape_item` top level strings are not quoted.
+        """
+        if item is None:
+            return '\\N'
+        elif isinstance(item, str):
+            return ''.join(self.escape_chars.get(c, c) for c in item)
+        elif isinstance(item, bool):
+            return 'true' if item else 'false'
+        elif isinstance(item, datetime):
+            if type_ and 'DateTime64' in type_:
+                return item.strftime('%Y-%m-%d %H:%M:%S.%f')
+            return item.strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(item, date):
+            return item.strftime('%Y-%m-%d')
+        elif isinstance(item, (Decimal, uuid.UUID) + self.number_types):
+            return str(item)
+        elif isinstance(item, enum.Enum):
+            return item.name
+        return str(self.escape_item(item))
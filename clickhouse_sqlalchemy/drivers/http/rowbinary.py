@@ -0,0 +1,720 @@
+import struct
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from ipaddress import IPv4Address, IPv6Address
+from uuid import UUID
+
+import pytz
+
+from ...exceptions import DatabaseException
+from ..typeparser import TypeSpec, parse_type
+from .exceptions import HTTPException
+
+
+EPOCH_DATE = date(1970, 1, 1)
+EPOCH = datetime(1970, 1, 1)
+
+struct_formats = {
+    'Int8': 'b',
+    'UInt8': 'B',
+    'Int16': 'h',
+    'UInt16': 'H',
+    'Int32': 'i',
+    'UInt32': 'I',
+    'Int64': 'q',
+    'UInt64': 'Q',
+    'Float32': 'f',
+    'Float64': 'd',
+    'Bool': '?',
+}
+
+big_int_sizes = {
+    'Int128': (16, True),
+    'UInt128': (16, False),
+    'Int256': (32, True),
+    'UInt256': (32, False),
+}
+
+decimal_bits = {
+    'Decimal32': 9,
+    'Decimal64': 18,
+    'Decimal128': 38,
+    'Decimal256': 76,
+}
+
+
+class IncompleteRow(Exception):
+    """
+    Raised when buffer ends in the middle of a row.
+    """
+    pass
+
+
+class FixedReader(object):
+    """
+    Value stored as a single fixed-size ``struct`` field.
+    Consecutive fixed readers are merged into one ``struct`` call per row.
+    """
+    def __init__(self, fmt, converter=None):
+        self.fmt = fmt
+        self.converter = converter
+
+
+def read_varint(buf, pos):
+    shift = 0
+    result = 0
+    while True:
+        i = buf[pos]
+        pos += 1
+        result |= (i & 0x7f) << shift
+        if i < 0x80:
+            return result, pos
+        shift += 7
+
+
+def read_bytes(buf, pos):
+    size = buf[pos]
+    if size < 0x80:
+        pos += 1
+    else:
+        size, pos = read_varint(buf, pos)
+    end = pos + size
+    if end > len(buf):
+        raise IncompleteRow()
+    return buf[pos:end], end
+
+
+def make_string_reader(errors):
+    def read(buf, pos):
+        value, pos = read_bytes(buf, pos)
+        return str(value, 'utf-8', errors), pos
+    return read
+
+
+def make_fixed_string_reader(length, errors):
+    def read(buf, pos):
+        end = pos + length
+        if end > len(buf):
+            raise IncompleteRow()
+        return str(buf[pos:end], 'utf-8', errors), end
+    return read
+
+
+def make_big_int_reader(size, signed):
+    def read(buf, pos):
+        end = pos + size
+        if end > len(buf):
+            raise IncompleteRow()
+        value = int.from_bytes(buf[pos:end], 'little', signed=signed)
+        return value, end
+    return read
+
+
+def read_uuid(buf, pos):
+    high, low = struct.unpack_from('<QQ', buf, pos)
+    return UUID(int=(high << 64) | low), pos + 16
+
+
+def read_ipv6(buf, pos):
+    end = pos + 16
+    if end > len(buf):
+        raise IncompleteRow()
+    return IPv6Address(bytes(buf[pos:end])), end
+
+
+def read_nothing(buf, pos):
+    if pos >= len(buf):
+        raise IncompleteRow()
+    return None, pos + 1
+
+
+def make_nullable_reader(reader):
+    reader = as_function(reader)
+
+    def read(buf, pos):
+        if buf[pos]:
+            return None, pos + 1
+        return reader(buf, pos + 1)
+    return read
+
+
+def make_array_reader(reader):
+    reader = as_function(reader)
+
+    def read(buf, pos):
+        size, pos = read_varint(buf, pos)
+        items = []
+        for _ in range(size):
+            item, pos = reader(buf, pos)
+            items.append(item)
+        return items, pos
+    return read
+
+
+def make_tuple_reader(readers):
+    readers = [as_function(x) for x in readers]
+
+    def read(buf, pos):
+        items = []
+        for reader in readers:
+            item, pos = reader(buf, pos)
+            items.append(item)
+        return tuple(items), pos
+    return read
+
+
+def make_map_reader(key_reader, value_reader):
+    key_reader = as_function(key_reader)
+    value_reader = as_function(value_reader)
+
+    def read(buf, pos):
+        size, pos = read_varint(buf, pos)
+        items = {}
+        for _ in range(size):
+            key, pos = key_reader(buf, pos)
+            items[key], pos = value_reader(buf, pos)
+        return items, pos
+    return read
+
+
+def as_function(reader):
+    if not isinstance(reader, FixedReader):
+        return reader
+
+    unpack = struct.Struct('<' + reader.fmt).unpack_from
+    size = struct.calcsize('<' + reader.fmt)
+    converter = reader.converter
+
+    if converter is None:
+        def read(buf, pos):
+            return unpack(buf, pos)[0], pos + size
+    else:
+        def read(buf, pos):
+            return converter(unpack(buf, pos)[0]), pos + size
+    return read
+
+
+def make_datetime_converter(tz_name):
+    tz = pytz.timezone(tz_name) if tz_name else pytz.utc
+    if tz is pytz.utc:
+        def convert(value):
+            return EPOCH + timedelta(seconds=value)
+    else:
+        def convert(value):
+            return datetime.fromtimestamp(value, tz).replace(tzinfo=None)
+    return convert
+
+
+def make_datetime64_converter(scale, tz_name):
+    to_datetime = make_datetime_converter(tz_name)
+    divider = 10 ** scale
+
+    def convert(value):
+        seconds, fraction = divmod(value, divider)
+        microseconds = fraction * 1000000 // divider
+        return to_datetime(seconds).replace(microsecond=microseconds)
+    return convert
+
+
+def get_reader(spec, errors, timezone=None):
+    """
+    Returns reader for given ClickHouse type.
+
+    Reader is either :class:`FixedReader` or callable
+    ``(buf, pos) -> (value, new_pos)``.
+    """
+    if not isinstance(spec, TypeSpec):
+        spec = parse_type(spec)
+    name = spec.name
+    arguments = spec.arguments
+
+    fmt = struct_formats.get(spec.text)
+    if fmt is not None:
+        return FixedReader(fmt)
+
+    if name == 'Nullable':
+        inner = get_reader(arguments[0], errors, timezone)
+        return make_nullable_reader(inner)
+
+    elif name in ('LowCardinality', 'SimpleAggregateFunction'):
+        return get_reader(arguments[-1], errors, timezone)
+
+    elif name == 'Array':
+        inner = get_reader(arguments[0], errors, timezone)
+        return make_array_reader(inner)
+
+    elif name == 'Tuple':
+        return make_tuple_reader([
+            get_reader(x, errors, timezone) for x in spec.types
+        ])
+
+    elif name == 'Map':
+        key, value = arguments
+        return make_map_reader(
+            get_reader(key, errors, timezone),
+            get_reader(value, errors, timezone)
+        )
+
+    elif name == 'String':
+        return make_string_reader(errors)
+
+    elif name == 'FixedString':
+        return make_fixed_string_reader(arguments[0], errors)
+
+    elif name in big_int_sizes:
+        return make_big_int_reader(*big_int_sizes[name])
+
+    elif name == 'Date':
+        return FixedReader('H', lambda x: EPOCH_DATE + timedelta(days=x))
+
+    elif name == 'Date32':
+        return FixedReader('i', lambda x: EPOCH_DATE + timedelta(days=x))
+
+    elif name == 'DateTime':
+        tz_name = arguments[0] if arguments else timezone
+        return FixedReader('I', make_datetime_converter(tz_name))
+
+    elif name == 'DateTime64':
+        scale = arguments[0]
+        tz_name = arguments[1] if len(arguments) > 1 else timezone
+        return FixedReader('q', make_datetime64_converter(scale, tz_name))
+
+    elif name == 'Decimal' or name in decimal_bits:
+        if name == 'Decimal':
+            precision, scale = arguments
+        else:
+            precision, scale = decimal_bits[name], arguments[0]
+
+        def convert(value):
+            return Decimal(value).scaleb(-scale)
+
+        if precision <= 9:
+            return FixedReader('i', convert)
+        elif precision <= 18:
+            return FixedReader('q', convert)
+
+        size = 16 if precision <= 38 else 32
+        reader = make_big_int_reader(size, True)
+
+        def read(buf, pos):
+            value, pos = reader(buf, pos)
+            return convert(value), pos
+        return read
+
+    elif name in ('Enum8', 'Enum16'):
+        options = {value: option for option, value in arguments}
+        fmt = 'b' if name == 'Enum8' else 'h'
+        return FixedReader(fmt, options.__getitem__)
+
+    elif name == 'UUID':
+        return read_uuid
+
+    elif name == 'IPv4':
+        return FixedReader('I', IPv4Address)
+
+    elif name == 'IPv6':
+        return read_ipv6
+
+    elif name == 'Nothing':
+        return read_nothing
+
+    raise ValueError(
+        "Type '{}' is not supported by RowBinary decoder".format(spec.text)
+    )
+
+
+def make_row_reader(types, errors, timezone=None):
+    """
+    Builds single row reader for result schema. Runs of fixed-size columns
+    are unpacked with one ``struct`` call.
+    """
+    readers = [get_reader(x, errors, timezone) for x in types]
+    steps = []
+
+    i = 0
+    while i < len(readers):
+        if not isinstance(readers[i], FixedReader):
+            steps.append(make_step(readers[i]))
+            i += 1
+            continue
+
+        fmt = ''
+        converters = []
+        while i < len(readers) and isinstance(readers[i], FixedReader):
+            fmt += readers[i].fmt
+            converters.append(readers[i].converter)
+            i += 1
+
+        steps.append(make_fixed_step(fmt, converters))
+
+    def read_row(buf, pos):
+        row = []
+        for step in steps:
+            pos = step(buf, pos, row)
+        return row, pos
+    return read_row
+
+
+def make_step(reader):
+    def step(buf, pos, row):
+        value, pos = reader(buf, pos)
+        row.append(value)
+        return pos
+    return step
+
+
+def make_fixed_step(fmt, converters):
+    packer = struct.Struct('<' + fmt)
+    unpack = packer.unpack_from
+    size = packer.size
+    indexed = [(i, c) for i, c in enumerate(converters) if c is not None]
+
+    if not indexed:
+        def step(buf, pos, row):
+            row.extend(unpack(buf, pos))
+            return pos + size
+    else:
+        def step(buf, pos, row):
+            values = list(unpack(buf, pos))
+            for i, converter in indexed:
+                values[i] = converter(values[i])
+            row.extend(values)
+            return pos + size
+    return step
+
+
+def parse_header(buf, pos, errors):
+    count, pos = read_varint(buf, pos)
+    header = []
+    for _ in range(count * 2):
+        value, pos = read_bytes(buf, pos)
+        header.append(str(value, 'utf-8', errors))
+    return header[:count], header[count:], pos
+
+
+def parse_rowbinary(chunks, errors=None, timezone=None):
+    """
+    Parses ``RowBinaryWithNamesAndTypes`` stream.
+    Yields column names, column types and then rows.
+    """
+    if errors is None:
+        errors = 'replace'
+
+    buf = memoryview(b'')
+    pos = 0
+    read_row = None
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+
+        buf = memoryview(bytes(buf[pos:]) + chunk)
+        pos = 0
+        end = len(buf)
+
+        if read_row is None:
+            try:
+                names, types, pos = parse_header(buf, pos, errors)
+            except (IndexError, IncompleteRow):
+                pos = 0
+                continue
+
+            read_row = make_row_reader(types, errors, timezone)
+            yield names
+            yield types
+
+        while pos < end:
+            try:
+                row, pos = read_row(buf, pos)
+            except (IndexError, IncompleteRow, struct.error):
+                break
+            yield row
+
+    if pos < len(buf):
+        # Server appends exception text to the body if query fails after
+        # it started to send data.
+        orig = HTTPException(str(buf[pos:], 'utf-8', errors))
+        raise DatabaseException(orig)
+
+
+# Encoding.
+
+def write_varint(value, out):
+    while value > 0x7f:
+        out.append(0x80 | (value & 0x7f))
+        value >>= 7
+    out.append(value)
+
+
+def write_bytes(value, out):
+    write_varint(len(value), out)
+    out += value
+
+
+def write_header(names, types, out):
+    """
+    Writes ``RowBinaryWithNamesAndTypes`` header, so server checks
+    column types instead of misreading values.
+    """
+    write_varint(len(names), out)
+    for value in list(names) + list(types):
+        write_bytes(value.encode('utf-8'), out)
+
+
+def make_string_writer():
+    def write(value, out):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        write_bytes(value, out)
+    return write
+
+
+def make_fixed_string_writer(length):
+    def write(value, out):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        out += value[:length].ljust(length, b'\0')
+    return write
+
+
+def make_fixed_writer(fmt, converter=None):
+    pack = struct.Struct('<' + fmt).pack
+
+    if converter is None:
+        def write(value, out):
+            out += pack(value)
+    else:
+        def write(value, out):
+            out += pack(converter(value))
+    return write
+
+
+def make_big_int_writer(size, signed):
+    def write(value, out):
+        out += int(value).to_bytes(size, 'little', signed=signed)
+    return write
+
+
+def write_uuid(value, out):
+    if not isinstance(value, UUID):
+        value = UUID(str(value))
+    out += struct.pack('<QQ', value.int >> 64, value.int & (2 ** 64 - 1))
+
+
+def write_ipv6(value, out):
+    if not isinstance(value, IPv6Address):
+        value = IPv6Address(value)
+    out += value.packed
+
+
+def make_nullable_writer(writer):
+    def write(value, out):
+        if value is None:
+            out.append(1)
+        else:
+            out.append(0)
+            writer(value, out)
+    return write
+
+
+def make_array_writer(writer):
+    def write(value, out):
+        write_varint(len(value), out)
+        for item in value:
+            writer(item, out)
+    return write
+
+
+def make_tuple_writer(writers):
+    def write(value, out):
+        for writer, item in zip(writers, value):
+            writer(item, out)
+    return write
+
+
+def make_map_writer(key_writer, value_writer):
+    def write(value, out):
+        write_varint(len(value), out)
+        for key, item in value.items():
+            key_writer(key, out)
+            value_writer(item, out)
+    return write
+
+
+def make_epoch_converter(tz_name):
+    """
+    Naive datetimes are considered to be in `tz_name` timezone.
+    """
+    tz = pytz.timezone(tz_name) if tz_name else pytz.utc
+
+    def convert(value):
+        if value.tzinfo is None:
+            if tz is pytz.utc:
+                return (value - EPOCH) / timedelta(seconds=1)
+            value = tz.localize(value)
+        return value.timestamp()
+    return convert
+
+
+def make_datetime_writer(tz_name):
+    to_epoch = make_epoch_converter(tz_name)
+
+    def convert(value):
+        if isinstance(value, int):
+            return value
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(value)
+        return int(to_epoch(value))
+    return make_fixed_writer('I', convert)
+
+
+def make_datetime64_writer(scale, tz_name):
+    to_epoch = make_epoch_converter(tz_name)
+    multiplier = 10 ** scale
+
+    def convert(value):
+        if isinstance(value, int):
+            return value
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(value)
+        seconds = int(to_epoch(value.replace(microsecond=0)))
+        return (
+            seconds * multiplier +
+            value.microsecond * multiplier // 1000000
+        )
+    return make_fixed_writer('q', convert)
+
+
+def date_to_days(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        value = date.fromisoformat(value)
+    return (value - EPOCH_DATE).days
+
+
+def make_enum_converter(spec):
+    options = dict(spec.arguments)
+
+    def convert(value):
+        if isinstance(value, int):
+            return value
+        if not isinstance(value, str):
+            # Python enum.
+            value = value.name
+        return options[value]
+    return convert
+
+
+def get_writer(spec, timezone=None):
+    """
+    Returns writer ``(value, out: bytearray) -> None`` for given
+    ClickHouse type.
+    """
+    if not isinstance(spec, TypeSpec):
+        spec = parse_type(spec)
+    name = spec.name
+    arguments = spec.arguments
+
+    fmt = struct_formats.get(spec.text)
+    if fmt is not None:
+        return make_fixed_writer(fmt)
+
+    if name == 'Nullable':
+        inner = get_writer(arguments[0], timezone)
+        return make_nullable_writer(inner)
+
+    elif name in ('LowCardinality', 'SimpleAggregateFunction'):
+        return get_writer(arguments[-1], timezone)
+
+    elif name == 'Array':
+        inner = get_writer(arguments[0], timezone)
+        return make_array_writer(inner)
+
+    elif name == 'Tuple':
+        return make_tuple_writer([
+            get_writer(x, timezone) for x in spec.types
+        ])
+
+    elif name == 'Map':
+        key, value = arguments
+        return make_map_writer(
+            get_writer(key, timezone), get_writer(value, timezone)
+        )
+
+    elif name == 'String':
+        return make_string_writer()
+
+    elif name == 'FixedString':
+        return make_fixed_string_writer(arguments[0])
+
+    elif name in big_int_sizes:
+        return make_big_int_writer(*big_int_sizes[name])
+
+    elif name == 'Date':
+        return make_fixed_writer('H', date_to_days)
+
+    elif name == 'Date32':
+        return make_fixed_writer('i', date_to_days)
+
+    elif name == 'DateTime':
+        tz_name = arguments[0] if arguments else timezone
+        return make_datetime_writer(tz_name)
+
+    elif name == 'DateTime64':
+        scale = arguments[0]
+        tz_name = arguments[1] if len(arguments) > 1 else timezone
+        return make_datetime64_writer(scale, tz_name)
+
+    elif name == 'Decimal' or name in decimal_bits:
+        if name == 'Decimal':
+            precision, scale = arguments
+        else:
+            precision, scale = decimal_bits[name], arguments[0]
+
+        def convert(value):
+            if isinstance(value, float):
+                value = str(value)
+            return int(Decimal(value).scaleb(scale))
+
+        if precision <= 9:
+            return make_fixed_writer('i', convert)
+        elif precision <= 18:
+            return make_fixed_writer('q', convert)
+
+        size = 16 if precision <= 38 else 32
+        writer = make_big_int_writer(size, True)
+
+        def write(value, out):
+            writer(convert(value), out)
+        return write
+
+    elif name in ('Enum8', 'Enum16'):
+        fmt = 'b' if name == 'Enum8' else 'h'
+        return make_fixed_writer(fmt, make_enum_converter(spec))
+
+    elif name == 'UUID':
+        return write_uuid
+
+    elif name == 'IPv4':
+        return make_fixed_writer('I', lambda x: int(IPv4Address(x)))
+
+    elif name == 'IPv6':
+        return write_ipv6
+
+    raise ValueError(
+        "Type '{}' is not supported by RowBinary encoder".format(spec.text)
+    )
+
+
+def make_row_writer(types, timezone=None):
+    """
+    Builds single row writer ``(values, out: bytearray) -> None`` for
+    columns of given types.
+    """
+    writers = [get_writer(x, timezone) for x in types]
+
+    def write_row(values, out):
+        for writer, value in zip(writers, values):
+            writer(value, out)
+    return write_row
@@ -0,0 +1,121 @@
+import socket
+import threading
+import weakref
+from functools import partial
+
+import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from sqlalchemy.util import asbool
+from urllib3.connection import HTTPConnection
+
+
+# Options accepted by `make_session`.
+session_options = (
+    'pool_connections', 'pool_maxsize', 'pool_block', 'tcp_keepalive',
+    'session_per_thread'
+)
+
+
+class TCPKeepAliveAdapter(HTTPAdapter):
+    """
+    Enables TCP keep-alive probes on pooled sockets, so idle connections
+    are not silently dropped by load balancers and NAT.
+    """
+    keepalive_idle = 60
+    keepalive_interval = 10
+    keepalive_count = 6
+
+    def init_poolmanager(self, *args, **kwargs):
+        options = list(HTTPConnection.default_socket_options)
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+        for name, value in [
+            ('TCP_KEEPIDLE', self.keepalive_idle),
+            ('TCP_KEEPINTVL', self.keepalive_interval),
+            ('TCP_KEEPCNT', self.keepalive_count)
+        ]:
+            if hasattr(socket, name):
+                options.append((socket.IPPROTO_TCP, getattr(socket, name),
+                                value))
+
+        kwargs['socket_options'] = options
+        super(TCPKeepAliveAdapter, self).init_poolmanager(*args, **kwargs)
+
+
+class ThreadLocalSession(object):
+    """
+    Proxies requests to separate session for every thread.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.local = threading.local()
+        # Sessions of all threads, so they can be closed from any thread.
+        self.sessions = weakref.WeakSet()
+        self.lock = threading.Lock()
+        self.generation = 0
+
+    @property
+    def session(self):
+        local = self.local
+        session = getattr(local, 'session', None)
+        if session is None or local.generation != self.generation:
+            session = self.factory()
+            with self.lock:
+                self.sessions.add(session)
+                local.session = session
+                local.generation = self.generation
+        return session
+
+    def post(self, *args, **kwargs):
+        return self.session.post(*args, **kwargs)
+
+    def close(self):
+        with self.lock:
+            sessions = list(self.sessions)
+            self.sessions.clear()
+            # Threads open new sessions on next request.
+            self.generation += 1
+
+        for session in sessions:
+            session.close()
+
+
+def make_session(pool_connections=DEFAULT_POOLSIZE,
+                 pool_maxsize=DEFAULT_POOLSIZE, pool_block=DEFAULT_POOLBLOCK,
+                 tcp_keepalive=False, session_per_thread=False):
+    """
+    Creates `requests.Session` with tuned connection pool.
+
+    :param pool_connections: number of per host pools to cache.
+    :param pool_maxsize: maximum number of sockets kept open per host.
+        Should be not less than number of threads using the session.
+    :param pool_block: wait for free socket instead of opening new one when
+        pool is exhausted.
+    :param tcp_keepalive: enable TCP keep-alive on pooled sockets.
+    :param session_per_thread: use separate session for every thread.
+    """
+    if asbool(session_per_thread):
+        factory = partial(
+            make_session, pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize, pool_block=pool_block,
+            tcp_keepalive=tcp_keepalive
+        )
+        return ThreadLocalSession(factory)
+
+    adapter_cls = TCPKeepAliveAdapter if asbool(tcp_keepalive) else HTTPAdapter
+    adapter = adapter_cls(
+        pool_connections=int(pool_connections),
+        pool_maxsize=int(pool_maxsize),
+        pool_block=asbool(pool_block)
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def pop_session_options(kwargs):
+    return {
+        name: kwargs.pop(name) for name in session_options if name in kwargs
+    }
@@ -1,46 +1,83 @@
+import logging
+import random
 import re
-
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
 from decimal import Decimal
-from functools import partial
+from functools import lru_cache
+from uuid import uuid4
 
 from ipaddress import IPv4Address, IPv6Address
 
 import requests
-
-from ...exceptions import DatabaseException
+from requests.auth import HTTPBasicAuth
+from sqlalchemy.util import asbool
+from urllib3.exceptions import ReadTimeoutError
+
+from ...exceptions import DatabaseException, QueryTimeoutError
+from ..balancer import REPLICA_DELAY_QUERY
+from ..typeparser import parse_type
+from .arrow import check_arrow, iter_record_batches
+from .compression import (
+    check_method, compress, compress_stream, decompress_stream,
+    get_decompressor
+)
+from .escaper import Escaper
 from .exceptions import HTTPException
-from .utils import parse_tsv
+from .rowbinary import parse_rowbinary
+from .session import make_session, pop_session_options
+from .utils import (
+    iter_lines, parse_json_columns, parse_progress, parse_tsv
+)
 
 
 DEFAULT_DDL_TIMEOUT = None
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_COMPRESS_THRESHOLD = 64 * 1024
+DEFAULT_RETRY_STATUS = (502, 503, 504)
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_BACKOFF_MAX = 10.0
 DATE_NULL = '0000-00-00'
 DATETIME_NULL = '0000-00-00 00:00:00'
 
-EXTRACT_SUBTYPE_RE = re.compile(r'^[^\(]+\((.+)\)$')
+IDEMPOTENT_QUERY_RE = re.compile(
+    r'^\s*(SELECT|WITH|SHOW|DESCRIBE|DESC|EXISTS|EXPLAIN)\b', re.IGNORECASE
+)
+
+logger = logging.getLogger(__name__)
 
 
 def date_converter(x):
     if x != DATE_NULL:
-        return datetime.strptime(x, '%Y-%m-%d').date()
+        return date.fromisoformat(x)
     return None
 
 
 def datetime_converter(x):
     if x == DATETIME_NULL:
         return None
-    elif len(x) > 19:
-        return datetime.strptime(x, '%Y-%m-%d %H:%M:%S.%f')
-    else:
-        return datetime.strptime(x, '%Y-%m-%d %H:%M:%S')
 
+    try:
+        return datetime.fromisoformat(x)
+    except ValueError:
+        # Python < 3.11 accepts only 3 or 6 digits of fractional part.
+        if len(x) > 19:
+            return datetime.strptime(x[:26], '%Y-%m-%d %H:%M:%S.%f')
+        raise
 
-def nullable_converter(subtype_str, x):
-    if x is None:
-        return None
 
-    converter = _get_type(subtype_str)
-    return converter(x) if converter else x
+def iter_until(chunks, deadline):
+    for chunk in chunks:
+        if time.monotonic() > deadline:
+            raise QueryTimeoutError()
+        yield chunk
+
+
+def make_nullable_converter(converter):
+    def nullable_converter(x):
+        return converter(x) if x is not None else None
+    return nullable_converter
 
 
 def nothing_converter(x):
@@ -68,27 +105,86 @@ converters = {
     'DateTime64': datetime_converter,
     'IPv4': IPv4Address,
     'IPv6': IPv6Address,
-    'Nullable': nullable_converter,
     'Nothing': nothing_converter,
 }
 
 
+@lru_cache(maxsize=1024)
 def _get_type(type_str):
-    result = converters.get(type_str)
-    if result is not None:
-        return result
+    try:
+        spec = parse_type(type_str)
+    except ValueError:
+        return None
+    return _get_converter(spec)
+
+
+def _get_converter(spec):
+    name = spec.name
+    if not spec.arguments:
+        return converters.get(name)
     # sometimes type_str is DateTime64(x)
-    if type_str.startswith('DateTime64'):
+    if name == 'DateTime64':
         return converters['DateTime64']
-    if type_str.startswith('Decimal'):
+    if name.startswith('Decimal'):
         return converters['Decimal']
-    if type_str.startswith('Nullable('):
-        subtype_str = EXTRACT_SUBTYPE_RE.match(type_str).group(1)
-        return partial(converters['Nullable'], subtype_str)
+    if name == 'LowCardinality':
+        return _get_converter(spec.arguments[0])
+    if name == 'Nullable':
+        converter = _get_converter(spec.arguments[0])
+        if converter is None or converter is nothing_converter:
+            return converter
+        return make_nullable_converter(converter)
     return None
 
 
+def get_json_converter(type_str):
+    """
+    Returns function converting JSON value or ``None`` if JSON values can be
+    used as is.
+    """
+    converter = _get_type(type_str)
+    if converter is int:
+        # 64 bit integers are requested unquoted.
+        return None
+    return converter
+
+
+def make_row_parser(types, errors=None):
+    """
+    Builds row parser for result schema: only columns with converters are
+    touched after TSV line is split.
+    """
+    plan = [
+        (i, converter) for i, converter in enumerate(map(_get_type, types))
+        if converter is not None
+    ]
+    if errors is None:
+        errors = 'replace'
+
+    if not plan:
+        def parse_row(line):
+            if b'\\' in line:
+                return parse_tsv(line, errors)
+            return line.decode('utf-8', errors).split('\t')
+
+    else:
+        def parse_row(line):
+            if b'\\' in line:
+                row = parse_tsv(line, errors)
+            else:
+                # Nothing to unescape, there are no NULLs as well.
+                row = line.decode('utf-8', errors).split('\t')
+
+            for i, converter in plan:
+                row[i] = converter(row[i])
+            return row
+
+    return parse_row
+
+
 class RequestsTransport(object):
+    default_retry_exceptions = (requests.ConnectionError, )
+    timeout_exceptions = (requests.Timeout, )
 
     def __init__(
             self,
@@ -98,7 +194,7 @@ class RequestsTransport(object):
 
         self.db_url = db_url
         self.db_name = db_name
-        self.auth = (username, password)
+        self.auth = HTTPBasicAuth(username, password)
         self.timeout = float(timeout) if timeout is not None else None
         self.verify = kwargs.pop('verify', True)
         self.cert = kwargs.pop('cert', None)
@@ -109,46 +205,332 @@ class RequestsTransport(object):
         }
 
         self.unicode_errors = kwargs.pop('unicode_errors', 'replace')
+        self.rowbinary = asbool(kwargs.pop('rowbinary', False))
 
         ch_settings = dict(ch_settings or {})
         self.ch_settings = ch_settings
 
         self.ch_settings['default_format'] = 'TabSeparatedWithNamesAndTypes'
 
+        self.compress = kwargs.pop('compress', None) or None
+        self.compress_threshold = int(
+            kwargs.pop('compress_threshold', DEFAULT_COMPRESS_THRESHOLD)
+        )
+        if self.compress is not None:
+            check_method(self.compress)
+            self.ch_settings['enable_http_compression'] = 1
+            self.headers['Accept-Encoding'] = self.compress
+
         ddl_timeout = kwargs.pop('ddl_timeout', DEFAULT_DDL_TIMEOUT)
         if ddl_timeout is not None:
             self.ch_settings['distributed_ddl_task_timeout'] = int(ddl_timeout)
 
+        self.retries = int(kwargs.pop('retries', 0))
+        self.retry_backoff = float(
+            kwargs.pop('retry_backoff', DEFAULT_RETRY_BACKOFF)
+        )
+        self.retry_backoff_max = float(
+            kwargs.pop('retry_backoff_max', DEFAULT_RETRY_BACKOFF_MAX)
+        )
+        retry_status = kwargs.pop('retry_status', DEFAULT_RETRY_STATUS)
+        if isinstance(retry_status, str):
+            retry_status = retry_status.split(',')
+        self.retry_status = frozenset(int(x) for x in retry_status)
+        self.retry_exceptions = tuple(kwargs.pop(
+            'retry_exceptions', self.default_retry_exceptions
+        ))
+        self.retry_non_idempotent = asbool(
+            kwargs.pop('retry_non_idempotent', False)
+        )
+        # Total number of retried requests.
+        self.retries_count = 0
+
+        # Routes requests over several hosts, see ``hosts`` option.
+        self.balancer = kwargs.pop('balancer', None)
+
         # By default, keep connection open between queries.
-        http = kwargs.pop('http_session', requests.Session)
-        self.http = http() if callable(http) else http
+        session_options = pop_session_options(kwargs)
+        http = kwargs.pop('http_session', None)
+        if http is None:
+            http = self._create_session(**session_options)
+            self._own_session = True
+        else:
+            if callable(http):
+                http = http()
+            self._own_session = False
+        self.http = http
+
+        self._server_timezone = None
+
+        # Parameters sent with every request.
+        self.base_params = dict(self.ch_settings, database=self.db_name)
 
         super(RequestsTransport, self).__init__()
 
-    def execute(self, query, params=None):
+    def _create_session(self, **options):
+        return make_session(**options)
+
+    def close(self):
+        """
+        Closes pooled connections of the session created by transport.
+        Shared sessions passed via ``http_session`` are left intact.
+        """
+        if self._own_session:
+            self.http.close()
+
+    def execute(self, query, params=None, timeout=None,
+                progress_callback=None, summary_callback=None, arrow=False,
+                json_columns=False):
         """
         Query is returning rows and these rows should be parsed or
         there is nothing to return.
+        :param timeout: deadline in seconds for query including results
+            reading. Query is killed on server when deadline passes.
+        :param progress_callback: called with progress dict for every
+            ``X-ClickHouse-Progress`` header. Query is killed if it raises.
+        :param summary_callback: called with ``X-ClickHouse-Summary`` dict.
+        :param arrow: result is requested in ``ArrowStream`` format. Schema
+            and ``pyarrow.RecordBatch`` objects are returned instead of
+            names, types and rows.
+        :param json_columns: result is requested in
+            ``JSONColumnsWithMetadata`` format. Names, types and list of
+            columns are returned.
         """
-        r = self._send(query, params=params, stream=True)
-        lines = r.iter_lines()
+        params = dict(params or {})
+        deadline = None
+        if timeout is not None or progress_callback is not None:
+            params.setdefault('query_id', str(uuid4()))
+        if timeout is not None:
+            deadline = time.monotonic() + float(timeout)
+        if progress_callback is not None:
+            params['send_progress_in_http_headers'] = 1
+
+        callbacks = (progress_callback, summary_callback)
+        if arrow:
+            check_arrow()
+            rows = self._execute_arrow(query, params, deadline, callbacks)
+        elif json_columns:
+            rows = self._execute_json_columns(
+                query, params, deadline, callbacks
+            )
+        elif self.rowbinary:
+            rows = self._execute_rowbinary(query, params, deadline, callbacks)
+        else:
+            rows = self._execute_tsv(query, params, deadline, callbacks)
+
+        if deadline is None:
+            return rows
+        return self._iter_with_timeout(rows, params['query_id'], timeout)
+
+    def _iter_with_timeout(self, rows, query_id, timeout):
+        with self._kill_on_timeout(query_id, timeout):
+            yield from rows
+
+    def _execute_rowbinary(self, query, params=None, deadline=None,
+                           callbacks=(None, None)):
+        params = dict(params or {})
+        params['default_format'] = 'RowBinaryWithNamesAndTypes'
+
+        r = self._send(query, params=params, stream=True, deadline=deadline)
         try:
-            names = parse_tsv(next(lines), self.unicode_errors)
-            types = parse_tsv(next(lines), self.unicode_errors)
-        except StopIteration:
-            # Empty result; e.g. a DDL request.
-            return
+            self._report_progress(r, params, *callbacks)
+            chunks = self._iter_content(r)
+            if deadline is not None:
+                chunks = iter_until(chunks, deadline)
+            timezone = r.headers.get('X-ClickHouse-Timezone')
+
+            yield from parse_rowbinary(chunks, self.unicode_errors, timezone)
+
+        finally:
+            r.close()
+
+    def _execute_arrow(self, query, params=None, deadline=None,
+                       callbacks=(None, None)):
+        params = dict(params or {})
+        params['default_format'] = 'ArrowStream'
 
-        convs = [_get_type(type_) for type_ in types]
+        r = self._send(query, params=params, stream=True, deadline=deadline)
+        try:
+            self._report_progress(r, params, *callbacks)
+            chunks = self._iter_content(r)
+            if deadline is not None:
+                chunks = iter_until(chunks, deadline)
+
+            yield from iter_record_batches(chunks)
+
+        finally:
+            r.close()
+
+    def _execute_json_columns(self, query, params=None, deadline=None,
+                              callbacks=(None, None)):
+        params = dict(params or {})
+        params['default_format'] = 'JSONColumnsWithMetadata'
+        params['output_format_json_quote_64bit_integers'] = 0
+        params['output_format_json_quote_denormals'] = 1
+        params['output_format_json_quote_decimals'] = 1
+
+        r = self._send(query, params=params, stream=True, deadline=deadline)
+        try:
+            self._report_progress(r, params, *callbacks)
+            chunks = self._iter_content(r)
+            if deadline is not None:
+                chunks = iter_until(chunks, deadline)
+
+            yield from parse_json_columns(
+                chunks, get_json_converter, self.unicode_errors
+            )
+
+        finally:
+            r.close()
 
-        yield names
-        yield types
+    def _execute_tsv(self, query, params=None, deadline=None,
+                     callbacks=(None, None)):
+        r = self._send(query, params=params, stream=True, deadline=deadline)
+        try:
+            self._report_progress(r, params, *callbacks)
+            chunks = self._iter_content(r)
+            if deadline is not None:
+                chunks = iter_until(chunks, deadline)
+            lines = iter_lines(chunks)
+            try:
+                names = parse_tsv(next(lines), self.unicode_errors)
+                types = parse_tsv(next(lines), self.unicode_errors)
+            except StopIteration:
+                # Empty result; e.g. a DDL request.
+                return
+
+            parse_row = make_row_parser(types, self.unicode_errors)
+
+            yield names
+            yield types
+
+            for line in lines:
+                yield parse_row(line)
+
+        finally:
+            r.close()
+
+    def insert(self, query, chunks, params=None, timeout=None,
+               progress_callback=None, summary_callback=None):
+        """
+        Performs INSERT query with data streamed in request body.
+        :param query: ``INSERT ... FORMAT ...`` query. It is passed in URL.
+        :param chunks: iterable of encoded data chunks.
+        :param params: Additional params should be passed during query.
+        :param timeout: deadline in seconds for query.
+        :param progress_callback: see `execute`.
+        :param summary_callback: see `execute`.
+        """
+        params = dict(params or {}, query=query)
+        if progress_callback is not None:
+            params['send_progress_in_http_headers'] = 1
+        if timeout is None:
+            r = self._send(chunks, params=params)
+            try:
+                self._report_progress(r, params, progress_callback,
+                                      summary_callback)
+            finally:
+                r.close()
+            return
 
-        for line in lines:
-            yield [
-                (conv(x) if conv else x)
-                for x, conv in zip(parse_tsv(line, self.unicode_errors), convs)
-            ]
+        params.setdefault('query_id', str(uuid4()))
+        deadline = time.monotonic() + float(timeout)
+        with self._kill_on_timeout(params['query_id'], timeout):
+            r = self._send(chunks, params=params, deadline=deadline)
+            try:
+                self._report_progress(r, params, progress_callback,
+                                      summary_callback)
+            finally:
+                r.close()
+
+    def _report_progress(self, r, params, progress_callback,
+                         summary_callback):
+        """
+        Passes progress and summary headers of the response to callbacks.
+        Headers are available as soon as server starts sending body.
+        """
+        if progress_callback is not None:
+            try:
+                for value in self._get_headers(r, 'X-ClickHouse-Progress'):
+                    progress_callback(parse_progress(value))
+            except BaseException:
+                # Query may be still running, e.g. INSERT SELECT.
+                r.close()
+                if params.get('query_id') is not None:
+                    self.kill_query(params['query_id'])
+                raise
+
+        if summary_callback is not None:
+            summary = r.headers.get('X-ClickHouse-Summary')
+            if summary:
+                summary_callback(parse_progress(summary))
+
+    def _get_headers(self, r, name):
+        # Progress header is repeated, values are JSON with commas.
+        return r.raw.headers.getlist(name)
+
+    def _is_timeout(self, e):
+        if isinstance(e, self.timeout_exceptions + (QueryTimeoutError, )):
+            return True
+        # Read timeout while body is streamed is raised by `iter_content`
+        # as ConnectionError, or as is when raw stream is read.
+        if isinstance(e, requests.ConnectionError) and e.args:
+            e = e.args[0]
+        return isinstance(e, ReadTimeoutError)
+
+    @contextmanager
+    def _kill_on_timeout(self, query_id, timeout):
+        try:
+            yield
+        except Exception as e:
+            if not self._is_timeout(e):
+                raise
+            self.kill_query(query_id)
+            raise DatabaseException(QueryTimeoutError(
+                'Query {} exceeded timeout of {} sec'.format(query_id, timeout)
+            ))
+
+    def kill_query(self, query_id):
+        """
+        Kills query with separate request. When ``hosts`` option is used,
+        query is killed on every host.
+        """
+        query = 'KILL QUERY WHERE query_id = {}'.format(
+            Escaper().escape_string(str(query_id))
+        )
+        data = query.encode('utf-8')
+
+        if self.balancer is not None:
+            urls = [host.address for host in self.balancer.hosts]
+        else:
+            urls = [self.db_url]
+
+        for url in urls:
+            try:
+                r = self._post(
+                    url, self.base_params, data, self.headers, False,
+                    self.timeout
+                )
+            except self.retry_exceptions + self.timeout_exceptions as e:
+                logger.warning('Failed to kill query %s: %r', query_id, e)
+                continue
+
+            if r.status_code != 200:
+                logger.warning(
+                    'Failed to kill query %s: %s', query_id, self._read_text(r)
+                )
+            r.close()
+
+    @property
+    def server_timezone(self):
+        """
+        Server timezone. Naive datetimes are considered to be in it.
+        """
+        if self._server_timezone is None:
+            self._server_timezone = self.raw(
+                'SELECT timezone()', params={'default_format': 'TabSeparated'}
+            ).strip()
+        return self._server_timezone
 
     def raw(self, query, params=None, stream=False):
         """
@@ -159,22 +541,173 @@ class RequestsTransport(object):
             streamed.
         :return: Query execution result
         """
-        return self._send(query, params=params, stream=stream).text
+        r = self._send(query, params=params, stream=stream)
+        try:
+            return self._read_text(r)
+        finally:
+            r.close()
+
+    def _iter_content(self, r):
+        """
+        Iterates over response body chunks. Body compressed with method
+        that `requests` can't handle by itself is decompressed on the fly.
+        """
+        decompressor = None
+        if self.compress is not None:
+            encoding = r.headers.get('Content-Encoding')
+            decompressor = get_decompressor(encoding)
+
+        if decompressor is None:
+            return r.iter_content(chunk_size=DEFAULT_CHUNK_SIZE)
+
+        chunks = r.raw.stream(DEFAULT_CHUNK_SIZE, decode_content=False)
+        return decompress_stream(decompressor, chunks)
+
+    def _read_text(self, r):
+        if self.compress is None:
+            return r.text
+
+        content = b''.join(self._iter_content(r))
+        return content.decode(r.encoding or 'utf-8', errors='replace')
+
+    def _can_retry(self, query, attempt):
+        # Streamed body can't be sent twice.
+        if attempt >= self.retries or query is None:
+            return False
+        return (
+            self.retry_non_idempotent or
+            IDEMPOTENT_QUERY_RE.match(query) is not None
+        )
+
+    def _retry_delay(self, attempt):
+        # Exponential backoff with full jitter.
+        delay = min(self.retry_backoff_max, self.retry_backoff * 2 ** attempt)
+        return random.uniform(0, delay)
+
+    def _send(self, data, params=None, stream=False, deadline=None):
+        if isinstance(data, str):
+            query = data
+            data = data.encode('utf-8')
+        else:
+            # Iterable of body chunks.
+            query = None
+
+        if params:
+            params = dict(self.base_params, **params)
+        else:
+            params = self.base_params
+
+        headers = self.headers
+        if self.compress is not None:
+            # Whole body is compressed, including the query.
+            if query is None:
+                data = compress_stream(self.compress, data)
+                headers = dict(headers, **{'Content-Encoding': self.compress})
+            elif len(data) >= self.compress_threshold:
+                data = compress(self.compress, data)
+                headers = dict(headers, **{'Content-Encoding': self.compress})
+
+            # Compressed body must be read only through `_iter_content`.
+            stream = True
+
+        attempt = 0
+        while True:
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise QueryTimeoutError()
+
+            try:
+                r = self._request(params, data, headers, stream, timeout)
+            except self.retry_exceptions as e:
+                if not self._can_retry(query, attempt):
+                    raise
+                reason = repr(e)
+
+            else:
+                if r.status_code == 200:
+                    return r
+
+                retry = (
+                    r.status_code in self.retry_status and
+                    self._can_retry(query, attempt)
+                )
+                if not retry:
+                    orig = HTTPException(self._read_text(r))
+                    orig.code = r.status_code
+                    raise DatabaseException(orig)
+
+                r.close()
+                reason = 'HTTP status {}'.format(r.status_code)
+
+            delay = self._retry_delay(attempt)
+            attempt += 1
+            self.retries_count += 1
+            logger.warning(
+                'Retrying query %s (attempt %d of %d) in %.2f sec: %s',
+                params.get('query_id'), attempt, self.retries, delay, reason
+            )
+            self._sleep(delay)
+
+    def _sleep(self, delay):
+        time.sleep(delay)
+
+    def _request(self, params, data, headers, stream, timeout):
+        if self.balancer is None:
+            return self._post(
+                self.db_url, params, data, headers, stream, timeout
+            )
+
+        host = self.balancer.acquire(self._get_replica_delay)
+        try:
+            r = self._post(
+                host.address, params, data, headers, stream, timeout
+            )
+
+        except self.retry_exceptions:
+            self.balancer.release(host, failed=True)
+            raise
+
+        except Exception:
+            self.balancer.release(host)
+            raise
+
+        if stream and r.status_code == 200:
+            # Streamed result keeps request to host in progress until it's
+            # read, so host is released when response is closed.
+            self._release_on_close(r, host)
+        else:
+            failed = r.status_code in self.retry_status
+            self.balancer.release(host, failed=failed)
+        return r
 
-    def _send(self, data, params=None, stream=False):
-        data = data.encode('utf-8')
-        params = params or {}
-        params['database'] = self.db_name
-        params.update(self.ch_settings)
+    def _release_on_close(self, r, host):
+        close = r.close
+        released = []
+
+        def release_and_close():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.balancer.release(host)
+
+        r.close = release_and_close
+
+    def _get_replica_delay(self, url):
+        params = dict(self.base_params, default_format='TabSeparated')
+        data = REPLICA_DELAY_QUERY.encode('utf-8')
+        r = self._post(url, params, data, self.headers, False, self.timeout)
+        text = self._read_text(r)
+        if r.status_code != 200:
+            raise HTTPException(text)
+        return float(text.strip() or 0)
 
-        # TODO: retries, prepared requests
-        r = self.http.post(
-            self.db_url, auth=self.auth, params=params, data=data,
-            stream=stream, timeout=self.timeout, headers=self.headers,
+    def _post(self, url, params, data, headers, stream, timeout):
+        return self.http.post(
+            url, auth=self.auth, params=params, data=data,
+            stream=stream, timeout=timeout, headers=headers,
             verify=self.verify, cert=self.cert
         )
-        if r.status_code != 200:
-            orig = HTTPException(r.text)
-            orig.code = r.status_code
-            raise DatabaseException(orig)
-        return r
@@ -1,4 +1,23 @@
 import codecs
+import enum
+import json
+import re
+from datetime import date, datetime
+
+from .escaper import Escaper
+
+
+tsv_escape_table = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\b': '\\b',
+    '\f': '\\f',
+    '\0': '\\0',
+})
+
+escaper = Escaper()
 
 
 def unescape(value, errors=None):
@@ -8,7 +27,237 @@ def unescape(value, errors=None):
 
 
 def parse_tsv(line, errors=None):
+    if errors is None:
+        errors = 'replace'
     return [
-        (unescape(x, errors) if x != b'\\N' else None)
+        (
+            x.decode('utf-8', errors) if b'\\' not in x else
+            unescape(x, errors) if x != b'\\N' else None
+        )
         for x in line.split(b'\t')
     ]
+
+
+def parse_progress(value):
+    """
+    Parses ``X-ClickHouse-Progress`` or ``X-ClickHouse-Summary`` header.
+    Server sends counters as strings.
+    """
+    rv = {}
+    for key, value in json.loads(value).items():
+        try:
+            rv[key] = int(value)
+        except (TypeError, ValueError):
+            rv[key] = value
+    return rv
+
+
+def iter_lines(chunks):
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+
+    if pending:
+        yield pending
+
+
+class JSONReader(object):
+    """
+    Decodes JSON document from body chunks value by value, so neither
+    the whole body nor the whole parsed document is kept in memory.
+    """
+    json_decoder = json.JSONDecoder()
+    ws_re = re.compile(r'\s*')
+
+    def __init__(self, chunks, errors=None):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')(
+            errors or 'replace'
+        )
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Appends next chunk to the buffer. Returns ``False`` at the end of
+        body.
+        """
+        if self.eof:
+            return False
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text_decoder.decode(b'', final=True)
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Returns next non-whitespace character or ``''`` at the end of body.
+        """
+        while True:
+            self.pos = self.ws_re.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(
+                "Expected '{}' in JSON, got '{}'".format(char, self.peek())
+            )
+        self.pos += 1
+
+    def skip(self, char):
+        """
+        Consumes `char` if it is next. Returns whether it was consumed.
+        """
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # Number at the end of buffer may continue in next chunk.
+            if end == len(self.buf) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+def parse_json_columns(chunks, get_converter, errors=None):
+    """
+    Parses ``JSONColumnsWithMetadata`` body. Yields names, types and list
+    of columns. Values are converted one by one with converter returned by
+    ``get_converter(type)``, if any. Nothing is yielded for empty body.
+    """
+    reader = JSONReader(chunks, errors)
+    if reader.peek() == '':
+        # Empty result; e.g. a DDL request.
+        return
+
+    names = types = None
+    reader.expect('{')
+    while not reader.skip('}'):
+        key = reader.value()
+        reader.expect(':')
+
+        if key == 'meta':
+            meta = reader.value()
+            names = [column['name'] for column in meta]
+            types = [column['type'] for column in meta]
+
+        elif key == 'data' and names is not None:
+            data = {}
+            reader.expect('{')
+            while not reader.skip('}'):
+                name = reader.value()
+                reader.expect(':')
+                data[name] = read_json_column(
+                    reader, get_converter(types[names.index(name)])
+                )
+                reader.skip(',')
+
+            yield names
+            yield types
+            yield [data[name] for name in names]
+            # Rows count and statistics are not needed.
+            return
+
+        else:
+            reader.value()
+
+        reader.skip(',')
+
+
+def read_json_column(reader, converter):
+    column = []
+    append = column.append
+    reader.expect('[')
+    while not reader.skip(']'):
+        value = reader.value()
+        if converter is not None and value is not None:
+            value = converter(value)
+        append(value)
+        reader.skip(',')
+    return column
+
+
+def format_tsv_value(value):
+    """
+    Formats value as ``TabSeparated`` field.
+    """
+    if value is None:
+        return '\\N'
+    elif isinstance(value, str):
+        return value.translate(tsv_escape_table)
+    elif isinstance(value, (bytes, bytearray)):
+        # Non UTF-8 bytes are kept as surrogates and restored by row writer.
+        value = bytes(value).decode('utf-8', 'surrogateescape')
+        return value.translate(tsv_escape_table)
+    elif isinstance(value, bool):
+        return '1' if value else '0'
+    elif isinstance(value, datetime):
+        if value.tzinfo is not None:
+            # Like RowBinary writer, aware datetime is written as Unix
+            # timestamp, so column timezone doesn't shift it.
+            if value.microsecond:
+                return '%.6f' % value.timestamp()
+            return str(int(value.timestamp()))
+        if value.microsecond:
+            return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    elif isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    elif isinstance(value, enum.Enum):
+        return value.name.translate(tsv_escape_table)
+    elif isinstance(value, (list, tuple, dict)):
+        # Composite values are written in quoted form.
+        return escaper.escape_item(value)
+    return str(value)
+
+
+def make_tsv_row_writer():
+    """
+    Returns row writer ``(values, out: bytearray) -> None`` producing
+    ``TabSeparated`` lines.
+    """
+    def write_row(values, out):
+        line = '\t'.join([format_tsv_value(x) for x in values])
+        out += line.encode('utf-8', 'surrogateescape')
+        out.append(0x0a)
+    return write_row
+
+
+def iter_insert_chunks(rows, write_row, chunk_size):
+    """
+    Encodes rows with `write_row` and yields bytes chunks of at least
+    `chunk_size` bytes (except the last one).
+    """
+    buf = bytearray()
+    for row in rows:
+        write_row(row, buf)
+        if len(buf) >= chunk_size:
+            yield bytes(buf)
+            buf.clear()
+
+    if buf:
+        yield bytes(buf)
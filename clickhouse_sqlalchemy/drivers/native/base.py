@@ -1,12 +1,17 @@
+import logging
 from urllib.parse import quote
 
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.util import asbool
 
 from . import connector
+from ..balancer import Balancer, parse_hosts, pop_balancer_options
 from ..base import (
     ClickHouseDialect, ClickHouseExecutionContextBase, ClickHouseSQLCompiler,
 )
+from ..dataframe import check_pandas
+from ..reflection import ReflectionCache
 from sqlalchemy.engine.interfaces import ExecuteStyle
 from sqlalchemy import __version__ as sqlalchemy_version
 
@@ -17,8 +22,69 @@ sqlalchemy_version = tuple(
     (int(x) if x.isdigit() else x) for x in sqlalchemy_version.split('.')
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _is_column(value):
+    return (
+        hasattr(value, '__len__') and
+        not isinstance(value, (str, bytes, dict))
+    )
+
 
 class ClickHouseExecutionContext(ClickHouseExecutionContextBase):
+    columnar_insert = False
+
+    @classmethod
+    def _init_compiled(cls, dialect, connection, dbapi_connection,
+                       execution_options, compiled, parameters, *args, **kw):
+        columnar = (
+            execution_options.get('columnar') or
+            execution_options.get('use_numpy')
+        )
+        # Columnar option is also used for fetching. INSERT parameters are
+        # treated as columns only if they are single mapping of sequences.
+        if not (columnar and compiled.isinsert) or \
+                len(parameters) != 1 or \
+                not isinstance(parameters[0], dict) or \
+                not parameters[0] or \
+                not all(_is_column(x) for x in parameters[0].values()):
+            return super(ClickHouseExecutionContext, cls)._init_compiled(
+                dialect, connection, dbapi_connection, execution_options,
+                compiled, parameters, *args, **kw
+            )
+
+        # Columnar INSERT parameters are whole columns, but bind processors
+        # expect scalar values. Parameters are processed as NULLs and whole
+        # columns are passed to cursor as is.
+        placeholders = [dict.fromkeys(x) for x in parameters]
+        self = super(ClickHouseExecutionContext, cls)._init_compiled(
+            dialect, connection, dbapi_connection, execution_options,
+            compiled, placeholders, *args, **kw
+        )
+        self.parameters = [cls._fill_column_defaults(compiled, parameters[0])]
+        self.columnar_insert = True
+        return self
+
+    @classmethod
+    def _fill_column_defaults(cls, compiled, columns):
+        columns = dict(columns)
+        size = len(next(iter(columns.values())))
+
+        for column in compiled.insert_prefetch:
+            if column.key in columns:
+                continue
+
+            default = column.default
+            if default is None or not default.is_scalar:
+                raise ValueError(
+                    'Columnar INSERT supports only scalar Python-side '
+                    'defaults, pass column {!r} explicitly'.format(column.key)
+                )
+            columns[column.key] = [default.arg] * size
+
+        return columns
+
     def pre_exec(self):
         # Always do executemany on INSERT with VALUES clause.
         if (self.isinsert and self.compiled.statement.select is None and
@@ -52,10 +118,47 @@ class ClickHouseDialect_native(ClickHouseDialect):
 
     supports_statement_cache = True
 
+    # Number of connections opened on engine creation.
+    pool_warmup = 0
+
     @classmethod
     def import_dbapi(cls):
         return connector
 
+    @classmethod
+    def engine_created(cls, engine):
+        size = engine.dialect.pool_warmup
+        if size:
+            cls._warm_up_pool(engine.pool, size)
+
+    @staticmethod
+    def _warm_up_pool(pool, size):
+        """
+        Opens up to `size` connections and returns them to the pool. The first
+        one also runs dialect initialization.
+        """
+        if isinstance(pool, QueuePool):
+            size = min(size, pool.size())
+        else:
+            # Other pools don't keep several idle connections.
+            size = 1
+
+        connections = []
+        try:
+            for _ in range(size):
+                connections.append(pool.connect())
+        except Exception as e:
+            logger.warning(
+                'Pool warm-up stopped after %s connections: %s',
+                len(connections), e
+            )
+        finally:
+            for conn in connections:
+                conn.close()
+
+    def do_ping(self, dbapi_connection):
+        return dbapi_connection.ping()
+
     def create_connect_args(self, url):
         use_quote = sqlalchemy_version < (2, 0, 24)
 
@@ -72,9 +175,53 @@ class ClickHouseDialect_native(ClickHouseDialect):
         self.engine_reflection = asbool(
             query.pop('engine_reflection', 'true')
         )
+        cache_dir = query.pop('reflection_cache', None)
+        self.reflection_cache = ReflectionCache(cache_dir) if cache_dir \
+            else None
+        self.pool_warmup = int(query.pop('pool_warmup', 0))
+        hosts = query.pop('hosts', None)
+        balancer_options = pop_balancer_options(query)
         url = url.set(query=query)
 
-        return (url.render_as_string(hide_password=False), ), {}
+        kwargs = {}
+        if hosts:
+            hosts = [(url.host, url.port)] + parse_hosts(hosts, None)
+            kwargs['balancer'] = Balancer([
+                (
+                    host if port is None else '%s:%d' % (host, port),
+                    url.set(host=host, port=port).render_as_string(
+                        hide_password=False
+                    )
+                )
+                for host, port in hosts
+            ], **balancer_options)
+
+        return (url.render_as_string(hide_password=False), ), kwargs
+
+    def read_dataframe(self, connection, statement, params=None,
+                       settings=None):
+        # NumPy columns are read from blocks by the driver.
+        check_pandas()
+
+        if isinstance(statement, str):
+            statement = TextClause(statement)
+        compiled = statement.compile(dialect=self)
+
+        dbapi_connection = connection.connection.dbapi_connection
+        return dbapi_connection.transport.query_dataframe(
+            str(compiled), params=compiled.construct_params(params),
+            settings=dict(settings or {}, use_numpy=True),
+            replace_nonwords=False
+        )
+
+    def insert_dataframe(self, connection, table, dataframe, settings=None):
+        check_pandas()
+
+        query = self._get_dataframe_insert(table, dataframe) + ' VALUES'
+        dbapi_connection = connection.connection.dbapi_connection
+        return dbapi_connection.transport.insert_dataframe(
+            query, dataframe, settings=dict(settings or {}, use_numpy=True)
+        )
 
     def _execute(self, connection, sql, scalar=False, **kwargs):
         if isinstance(sql, str):
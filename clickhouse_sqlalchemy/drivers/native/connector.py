@@ -1,9 +1,17 @@
+import socket
+import threading
 from itertools import islice
+from uuid import uuid4
 
 from clickhouse_driver.client import Client as DriverClient
 from clickhouse_driver.errors import Error as DriverError
+from clickhouse_driver.errors import NetworkError, SocketTimeoutError
+from clickhouse_driver.protocol import ServerPacketTypes
+from clickhouse_driver.result import QueryResult
 
-from ...exceptions import DatabaseException
+from ...exceptions import DatabaseException, QueryTimeoutError
+from ..balancer import REPLICA_DELAY_QUERY
+from ..util import RowBuffer, make_columns
 
 # PEP 249 module globals
 apilevel = '2.0'
@@ -12,6 +20,8 @@ threadsafety = 2
 # Python extended format codes, e.g. ...WHERE name=%(name)s
 paramstyle = 'pyformat'
 
+KILL_QUERY = 'KILL QUERY WHERE query_id = %(query_id)s'
+
 
 class Error(Exception):
     """
@@ -21,6 +31,20 @@ class Error(Exception):
     pass
 
 
+def make_progress(progress):
+    """
+    Converts driver progress to dict with ``X-ClickHouse-Progress`` keys.
+    """
+    return {
+        'read_rows': progress.rows,
+        'read_bytes': progress.bytes,
+        'total_rows_to_read': progress.total_rows,
+        'written_rows': progress.written_rows,
+        'written_bytes': progress.written_bytes,
+        'elapsed_ns': progress.elapsed_ns
+    }
+
+
 def connect(*args, **kwargs):
     """
     Make new connection.
@@ -28,16 +52,121 @@ def connect(*args, **kwargs):
     return Connection(*args, **kwargs)
 
 
+class Client(DriverClient):
+    """
+    Driver client passing accumulated progress of the query to
+    `progress_callback` on every progress packet.
+    """
+    progress_callback = None
+
+    def receive_packet(self):
+        packet = super(Client, self).receive_packet()
+
+        callback = self.progress_callback
+        if callback is not None and packet and packet is not True and \
+                packet.type == ServerPacketTypes.PROGRESS:
+            callback(make_progress(self.last_query.progress))
+        return packet
+
+    def receive_result(self, with_column_types=False, progress=False,
+                       columnar=False):
+        # Result classes are chosen on client creation. Per query
+        # ``use_numpy`` setting needs NumPy result as well.
+        use_numpy = self.connection.context.client_settings['use_numpy']
+        if not use_numpy or progress or \
+                self.query_result_cls is not QueryResult:
+            return super(Client, self).receive_result(
+                with_column_types=with_column_types, progress=progress,
+                columnar=columnar
+            )
+
+        try:
+            from clickhouse_driver.numpy.result import NumpyQueryResult
+        except ImportError:
+            raise RuntimeError('Extras for NumPy must be installed')
+
+        result = NumpyQueryResult(
+            self.packet_generator(), with_column_types=with_column_types,
+            columnar=columnar
+        )
+        return result.get_result()
+
+
 class Connection(object):
-    transport_cls = DriverClient
+    transport_cls = Client
 
     def __init__(self, *args, **kwargs):
-        url = args[0]
-        self.transport = self.transport_cls.from_url(url)
+        self.url = args[0]
+        # Chooses host for connection, see ``hosts`` option.
+        self.balancer = kwargs.pop('balancer', None)
+        self.host = None
+        self.transport = self._create_transport()
         super(Connection, self).__init__()
 
+    def _create_transport(self):
+        url = self.url
+        if self.balancer is not None:
+            self.host = self.balancer.acquire(self._get_replica_delay)
+            url = self.host.address
+        return self.transport_cls.from_url(url)
+
+    def _execute_side(self, url, query, params=None):
+        # Separate short-lived connection to the same host.
+        client = self.transport_cls.from_url(url)
+        try:
+            return client.execute(query, params)
+        finally:
+            client.disconnect()
+
+    def _get_replica_delay(self, url):
+        return self._execute_side(url, REPLICA_DELAY_QUERY)[0][0]
+
+    def kill_query(self, query_id):
+        """
+        Kills query on separate connection. Not in PEP 249.
+        """
+        url = self.host.address if self.host is not None else self.url
+        self._execute_side(url, KILL_QUERY, {'query_id': query_id})
+
+    def abort(self):
+        """
+        Shuts down socket, so blocked reads fail. Can be called from
+        any thread. Not in PEP 249.
+        """
+        sock = getattr(self.transport.connection, 'socket', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _handle_network_error(self):
+        """
+        Ejects current host and moves connection to another one.
+        """
+        self.transport.disconnect()
+        if self.host is not None:
+            self.balancer.release(self.host, failed=True)
+            self.transport = self._create_transport()
+
     def close(self):
-        pass
+        # Socket belongs to connection and outlives its cursors.
+        self.transport.disconnect()
+        if self.host is not None:
+            self.balancer.release(self.host)
+            self.host = None
+
+    def ping(self):
+        """
+        Checks connection with ping packet and reconnects if socket was
+        closed. Not in PEP 249.
+        """
+        try:
+            self.transport.connection.force_connect()
+        except (DriverError, socket.error, EOFError):
+            self._handle_network_error()
+            return False
+        return True
 
     def commit(self):
         pass
@@ -68,6 +197,8 @@ class Cursor(object):
 
     def __init__(self, connection):
         self._connection = connection
+        self._watchdog_lock = threading.Lock()
+        self._watchdog = None
         self._reset_state()
         self._arraysize = 1
         super(Cursor, self).__init__()
@@ -86,8 +217,62 @@ class Cursor(object):
             for name, type_code in zip(columns, types)
         ]
 
+    @property
+    def summary(self):
+        """
+        Progress and profile info of the last query: rows and bytes read,
+        written and returned. Not in PEP 249.
+        """
+        last_query = self._last_query
+        if last_query is None:
+            return None
+
+        rv = make_progress(last_query.progress)
+        rv['result_rows'] = last_query.profile_info.rows
+        rv['result_bytes'] = last_query.profile_info.bytes
+        return rv
+
     def close(self):
-        self._connection.transport.disconnect()
+        self._stop_watchdog()
+        if self._stream_results and self._rows is not None:
+            self._finish_stream()
+        self._rows = None
+
+    def __del__(self):
+        # Result may be garbage collected without closing the cursor.
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _finish_stream(self):
+        """
+        Stops partially consumed streaming query, so the connection can
+        be used for the next query.
+        """
+        rows, self._rows = self._rows, None
+        if hasattr(rows, 'close'):
+            rows.close()
+
+        if self._response_done:
+            return
+
+        transport = self._connection.transport
+        connection = getattr(transport, 'connection', None)
+        if getattr(connection, 'is_query_executing', False):
+            try:
+                # Server stops query on cancel packet, remaining packets
+                # are drained.
+                transport.cancel()
+                return
+            except Exception:
+                # Connection state is unknown, next query will reconnect.
+                transport.disconnect()
+
+        # Reading was interrupted and socket is closed. Server notices it
+        # only when it sends next block.
+        if self._kill_on_close:
+            self._connection.kill_query(self._query_id)
 
     def make_external_tables(self, dialect, execution_options):
         external_tables = execution_options.get('external_tables')
@@ -127,7 +312,23 @@ class Cursor(object):
         execute_iter = getattr(transport, 'execute_iter', None)
 
         self._stream_results = execution_options.get('stream_results', False)
+        self._timeout = execution_options.get('timeout')
+        self._kill_on_close = execution_options.get('kill_on_close', False)
+        use_numpy = execution_options.get('use_numpy', False)
+        self._columnar = execution_options.get('columnar', False) or use_numpy
+        # Query id is known in advance, so query can be killed.
+        self._query_id = execution_options.get('query_id') or str(uuid4())
+        # Client belongs to connection, so callback is set for every query.
+        transport.progress_callback = execution_options.get(
+            'progress_callback'
+        )
         settings = execution_options.get('settings')
+        if use_numpy:
+            settings = dict(settings or {}, use_numpy=True)
+
+        if self._columnar:
+            # Blocks are merged into columns, so result is not streamed.
+            self._stream_results = False
 
         if self._stream_results and execute_iter:
             execute = execute_iter
@@ -139,45 +340,159 @@ class Cursor(object):
             'settings': settings,
             'external_tables': external_tables,
             'types_check': execution_options.get('types_check', False),
-            'query_id': execution_options.get('query_id', None)
+            'query_id': self._query_id
         }
 
         return execute, execute_kwargs
 
     def execute(self, operation, parameters=None, context=None):
+        self.close()
         self._reset_state()
         self._begin_query()
 
         try:
             execute, execute_kwargs = self._prepare(context)
+            if self._columnar:
+                execute_kwargs['columnar'] = True
+            self._start_watchdog()
             response = execute(
                 operation, params=parameters, with_column_types=True,
                 **execute_kwargs
             )
 
-        except DriverError as orig:
-            raise DatabaseException(orig)
+        except Exception as orig:
+            raise self._wrap_error(orig)
 
         self._process_response(response)
+        if not self._stream_results:
+            self._stop_watchdog()
         self._end_query()
 
     def executemany(self, operation, seq_of_parameters, context=None):
+        self.close()
         self._reset_state()
         self._begin_query()
 
         try:
             execute, execute_kwargs = self._prepare(context)
-
+            if self._columnar and getattr(context, 'columnar_insert', False):
+                seq_of_parameters = self._make_insert_columns(
+                    seq_of_parameters, context
+                )
+                execute_kwargs['columnar'] = True
+            self._start_watchdog()
             response = execute(
                 operation, params=seq_of_parameters, **execute_kwargs
             )
 
-        except DriverError as orig:
-            raise DatabaseException(orig)
+        except Exception as orig:
+            raise self._wrap_error(orig)
 
+        self._stop_watchdog()
         self._process_response(response, executemany=True)
         self._end_query()
 
+    def _make_insert_columns(self, seq_of_parameters, context=None):
+        """
+        Turns columnar INSERT parameters into list of columns in statement
+        order. Parameters are single mapping of column name to sequence or
+        NumPy array of values.
+        """
+        if len(seq_of_parameters) != 1:
+            raise ValueError(
+                'Columnar INSERT expects single mapping of columns'
+            )
+
+        params = seq_of_parameters[0]
+        if not isinstance(params, dict):
+            # Columns are already ordered.
+            return params
+
+        if context is not None and context.compiled is not None:
+            names = context.compiled.bind_names.values()
+        else:
+            names = params.keys()
+
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise ValueError(
+                'Columnar INSERT misses columns: {}'.format(', '.join(missing))
+            )
+
+        return [params[name] for name in names]
+
+    def _wrap_error(self, orig):
+        self._stop_watchdog()
+
+        if self._timed_out:
+            self._connection.transport.disconnect()
+            return DatabaseException(QueryTimeoutError(
+                'Query {} exceeded timeout of {} sec'.format(
+                    self._query_id, self._timeout
+                )
+            ))
+
+        if isinstance(orig, DriverError):
+            if isinstance(orig, (NetworkError, SocketTimeoutError)):
+                self._connection._handle_network_error()
+            return DatabaseException(orig)
+
+        return orig
+
+    def _start_watchdog(self):
+        if self._timeout is None:
+            return
+
+        watchdog = threading.Timer(float(self._timeout), self._on_timeout)
+        watchdog.daemon = True
+        self._watchdog = watchdog
+        watchdog.start()
+
+    def _stop_watchdog(self):
+        with self._watchdog_lock:
+            watchdog, self._watchdog = self._watchdog, None
+            timed_out = self._timed_out
+        if watchdog is not None:
+            watchdog.cancel()
+        elif timed_out:
+            # Watchdog fired while the last packet was being received:
+            # socket is shut down, next query reconnects.
+            self._connection.transport.disconnect()
+
+    def _is_query_executing(self):
+        connection = getattr(self._connection.transport, 'connection', None)
+        return getattr(connection, 'is_query_executing', False)
+
+    def _on_timeout(self):
+        """
+        Runs in watchdog thread: unblocks query reading and kills query on
+        server.
+        """
+        with self._watchdog_lock:
+            if self._watchdog is None or not self._is_query_executing():
+                # Query is already finished.
+                return
+            self._watchdog = None
+            self._timed_out = True
+            # Under the lock, so cursor doesn't stop the watchdog and
+            # start next query meanwhile.
+            self._connection.abort()
+
+        try:
+            self._connection.kill_query(self._query_id)
+        except Exception:
+            # Server will stop the query on its own once it notices closed
+            # connection.
+            pass
+
+    def _iter_rows(self, rows):
+        try:
+            yield from rows
+        except Exception as orig:
+            raise self._wrap_error(orig)
+        finally:
+            self._stop_watchdog()
+
     def check_query_started(self):
         if self._state == self._states.NONE:
             raise RuntimeError("No query yet")
@@ -186,33 +501,58 @@ class Cursor(object):
         self.check_query_started()
 
         if self._stream_results:
-            return next(self._rows, None)
-
-        else:
-            if not self._rows:
-                return None
+            row = next(self._rows, None)
+            if row is None:
+                self._response_done = True
+            return row
 
-            return self._rows.pop(0)
+        return self._get_row_buffer().fetchone()
 
     def fetchmany(self, size=1):
         self.check_query_started()
 
         if self._stream_results:
-            return list(islice(self._rows, size))
+            rows = list(islice(self._rows, size))
+            if len(rows) < size:
+                self._response_done = True
+            return rows
 
-        rv = self._rows[:size]
-        self._rows = self._rows[size:]
-        return rv
+        return self._get_row_buffer().fetchmany(size)
 
     def fetchall(self):
         self.check_query_started()
 
         if self._stream_results:
-            return list(self._rows)
+            rows = list(self._rows)
+            self._response_done = True
+            return rows
 
-        rv = self._rows
-        self._rows = []
-        return rv
+        return self._get_row_buffer().fetchall()
+
+    def fetch_columns(self):
+        """
+        Returns remaining rows as dict of column name to column values.
+        Columns are taken from driver as is with ``columnar`` or
+        ``use_numpy`` execution option and transposed from rows otherwise.
+        Not in PEP 249.
+        """
+        self.check_query_started()
+
+        if self._columns_data is None:
+            return make_columns(self._columns, self.fetchall())
+
+        data, self._columns_data = self._columns_data, None
+        self._rows = RowBuffer()
+        if not data:
+            data = [()] * len(self._columns)
+        return dict(zip(self._columns, data))
+
+    def _get_row_buffer(self):
+        if self._columns_data is not None:
+            # Rows are needed after all.
+            data, self._columns_data = self._columns_data, None
+            self._rows = RowBuffer(list(zip(*data)))
+        return self._rows
 
     @property
     def arraysize(self):
@@ -228,13 +568,30 @@ class Cursor(object):
     def setoutputsize(self, size, column=None):
         pass
 
+    # Private and non-standard methods.
+    def cancel(self):
+        """
+        Kills current query on separate connection. Can be called from other
+        thread. Not in PEP 249 standard.
+        """
+        if self._state == self._states.NONE or self._query_id is None:
+            raise RuntimeError("No query yet")
+
+        self._connection.kill_query(self._query_id)
+
     def _process_response(self, response, executemany=False):
+        self._last_query = getattr(
+            self._connection.transport, 'last_query', None
+        )
+
         if executemany:
             self._rowcount = response
             response = None
 
         if not response:
-            self._columns = self._types = self._rows = []
+            self._columns = self._types = []
+            self._rows = iter(()) if self._stream_results else RowBuffer()
+            self._response_done = True
             return
 
         if self._stream_results:
@@ -249,7 +606,14 @@ class Cursor(object):
         else:
             self._columns = self._types = []
 
-        self._rows = rows
+        if self._stream_results:
+            if self._timeout is not None:
+                rows = self._iter_rows(rows)
+            self._rows = rows
+        elif self._columnar:
+            self._columns_data = rows
+        else:
+            self._rows = RowBuffer(rows)
 
     def _reset_state(self):
         """
@@ -263,6 +627,15 @@ class Cursor(object):
         self._rowcount = -1
 
         self._stream_results = False
+        self._timeout = None
+        self._timed_out = False
+        self._query_id = None
+        self._response_done = False
+        self._kill_on_close = False
+        self._last_query = None
+        self._columnar = False
+        # Columnar result until rows are fetched.
+        self._columns_data = None
 
     def _begin_query(self):
         self._state = self._states.RUNNING
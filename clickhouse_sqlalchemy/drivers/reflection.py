@@ -1,7 +1,19 @@
-from sqlalchemy.engine import reflection
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from sqlalchemy.engine import reflection, ObjectKind, ObjectScope
 
 from clickhouse_sqlalchemy import Table, engines
 
+# Info cache key of engines read with other reflection info.
+_engines_key = ('clickhouse', 'engines')
+
+logger = logging.getLogger(__name__)
+
 
 class ClickHouseInspector(reflection.Inspector):
     def reflect_table(self, table, *args, **kwargs):
@@ -24,17 +36,39 @@ class ClickHouseInspector(reflection.Inspector):
 
             self._reflect_engine(ch_table.name, schema, ch_table)
 
-    def _reflect_engine(self, table_name, schema, table):
-        should_reflect = (
+    def _get_reflection_info(self, schema=None, filter_names=None,
+                             available=None, _reflect_info=None, **kw):
+        rv = super(ClickHouseInspector, self)._get_reflection_info(
+            schema=schema, filter_names=filter_names, available=available,
+            _reflect_info=_reflect_info, **kw
+        )
+
+        # Engines of all reflected tables are read at once as well.
+        if self._should_reflect_engine():
+            engines = self.info_cache.setdefault(_engines_key, {})
+            engines.update(self.get_multi_engine(
+                schema=schema, filter_names=filter_names,
+                kind=kw.get('kind', ObjectKind.TABLE),
+                scope=kw.get('scope', ObjectScope.DEFAULT)
+            ))
+
+        return rv
+
+    def _should_reflect_engine(self):
+        return (
             self.dialect.supports_engine_reflection and
             self.dialect.engine_reflection
         )
-        if not should_reflect:
+
+    def _reflect_engine(self, table_name, schema, table):
+        if not self._should_reflect_engine():
             return
 
         engine_cls_by_name = {e.__name__: e for e in engines.__all__}
 
-        e = self.get_engine(table_name, schema=table.schema)
+        e = self.info_cache.get(_engines_key, {}).get((schema, table_name))
+        if e is None:
+            e = self.get_engine(table_name, schema=table.schema)
         if not e:
             raise ValueError("Cannot find engine for table '%s'" % table_name)
 
@@ -45,9 +79,68 @@ class ClickHouseInspector(reflection.Inspector):
         else:
             table.engine = None
 
+    def get_multi_engine(self, schema=None, filter_names=None,
+                         kind=ObjectKind.TABLE, scope=ObjectScope.DEFAULT,
+                         **kw):
+        with self._operation_context() as conn:
+            return dict(self.dialect.get_multi_engine(
+                conn, schema=schema, filter_names=filter_names, kind=kind,
+                scope=scope, info_cache=self.info_cache, **kw
+            ))
+
     def get_engine(self, table_name, schema=None, **kw):
         with self._operation_context() as conn:
             return self.dialect.get_engine(
                 conn, table_name, schema=schema, info_cache=self.info_cache,
                 **kw
             )
+
+
+class ReflectionCache(object):
+    """
+    On-disk storage of reflected ``system.columns`` and ``system.tables``
+    rows. Entries are kept per table with table's modification stamp, one
+    JSON file per server and database.
+    Files are replaced atomically, so processes can share the directory.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get_path(self, key):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.json')
+
+    def load(self, key):
+        """
+        Returns dict of table name to entry. Must be called with `lock`.
+        """
+        entries = self.entries.get(key)
+        if entries is None:
+            try:
+                with open(self.get_path(key)) as f:
+                    entries = json.load(f)
+            except FileNotFoundError:
+                entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning('Reflection cache is not read: %s', e)
+                entries = {}
+            self.entries[key] = entries
+        return entries
+
+    def save(self, key):
+        """
+        Writes entries of `key` to disk. Must be called with `lock`.
+        """
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.entries[key], f)
+            os.replace(tmp_path, self.get_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning('Reflection cache is not saved: %s', e)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,186 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+class TypeSpec(namedtuple('TypeSpec', 'name arguments text')):
+    """
+    Parsed ClickHouse type, e.g. ``Array(Nullable(String))``.
+
+    `arguments` items are nested ``TypeSpec`` objects, strings for quoted
+    literals, numbers, ``(name, value)`` pairs for Enum options and
+    ``(element_name, TypeSpec)`` pairs for named Tuple elements. Arguments
+    the parser doesn't understand, e.g. ``AggregateFunction`` combinator
+    expressions, are kept as source text.
+    """
+    __slots__ = ()
+
+    @property
+    def types(self):
+        """
+        Nested types. Names of Tuple elements are dropped.
+        """
+        rv = []
+        for x in self.arguments:
+            if isinstance(x, tuple) and isinstance(x[1], TypeSpec):
+                x = x[1]
+            if isinstance(x, TypeSpec):
+                rv.append(x)
+        return rv
+
+
+token_re = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*') |
+        (?P<ident>`(?:[^`\\]|\\.)*`|[A-Za-z_][A-Za-z0-9_.]*) |
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?) |
+        (?P<punct>[(),=])
+    )
+""", re.VERBOSE)
+
+escapes = {
+    'b': '\b', 'f': '\f', 'r': '\r', 'n': '\n', 't': '\t', '0': '\0',
+}
+
+
+def unescape(value):
+    return re.sub(
+        r'\\(.)', lambda m: escapes.get(m.group(1), m.group(1)), value[1:-1]
+    )
+
+
+def to_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+class Parser(object):
+    def __init__(self, text):
+        self.text = text
+        self.tokens = self.tokenize(text)
+        self.pos = 0
+
+    @staticmethod
+    def tokenize(text):
+        tokens = []
+        pos = 0
+        end = len(text.rstrip())
+        while pos < end:
+            match = token_re.match(text, pos)
+            if match is None:
+                raise ValueError(
+                    "Unexpected character at {} in type '{}'".format(
+                        pos, text
+                    )
+                )
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind), match.start(kind)))
+            pos = match.end()
+        return tokens
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None, None, len(self.text)
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of type '{}'".format(self.text))
+        self.pos += 1
+        return token
+
+    def end_of(self):
+        # Source offset after the last consumed token.
+        kind, value, start = self.tokens[self.pos - 1]
+        return start + len(value)
+
+    def parse(self):
+        rv = self.parse_node()
+        if self.peek()[0] is not None:
+            raise ValueError("Unexpected tail in type '{}'".format(self.text))
+        return rv
+
+    def parse_node(self):
+        kind, value, start = self.next()
+
+        if kind == 'string':
+            value = unescape(value)
+            if self.peek()[1] == '=':
+                # Enum option: 'name' = value.
+                self.next()
+                return value, to_number(self.next()[1])
+            return value
+
+        elif kind == 'number':
+            return to_number(value)
+
+        elif kind == 'ident':
+            if value.startswith('`'):
+                value = value[1:-1]
+
+            if self.peek()[0] == 'ident':
+                # Named Tuple element: name Type.
+                return value, self.parse_node()
+
+            arguments = ()
+            if self.peek()[1] == '(':
+                self.next()
+                arguments = self.parse_arguments()
+
+            return TypeSpec(value, arguments, self.text[start:self.end_of()])
+
+        raise ValueError(
+            "Unexpected '{}' in type '{}'".format(value, self.text)
+        )
+
+    def parse_arguments(self):
+        arguments = []
+        if self.peek()[1] == ')':
+            self.next()
+            return tuple(arguments)
+
+        while True:
+            arguments.append(self.parse_argument())
+            value = self.next()[1]
+            if value == ')':
+                return tuple(arguments)
+            elif value != ',':
+                raise ValueError(
+                    "Unexpected '{}' in type '{}'".format(value, self.text)
+                )
+
+    def parse_argument(self):
+        start_pos = self.pos
+        start = self.peek()[2]
+        try:
+            rv = self.parse_node()
+            if self.peek()[1] in (',', ')'):
+                return rv
+        except ValueError:
+            pass
+
+        # Expression: skip to the end of argument, keep the text.
+        self.pos = start_pos
+        depth = 0
+        while True:
+            kind, value, _ = self.peek()
+            if kind is None or depth == 0 and value in (',', ')'):
+                break
+            if value == '(':
+                depth += 1
+            elif value == ')':
+                depth -= 1
+            self.next()
+        return self.text[start:self.end_of()].strip()
+
+
+@lru_cache(maxsize=4096)
+def parse_type(spec):
+    """
+    Parses ClickHouse type string into ``TypeSpec``. Results are cached:
+    the same types come with every result and reflected table.
+    """
+    return Parser(spec.strip()).parse()
@@ -43,3 +43,73 @@ def parse_arguments(param_string):
         params.append(current_param.strip())
 
     return tuple(params)
+
+
+def make_columns(names, rows):
+    """
+    Transposes rows into dict of column name to tuple of values.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    return dict(zip(names, columns))
+
+
+class RowBuffer(object):
+    """
+    Prefetched rows storage for DBAPI cursors.
+
+    Rows are read by moving position over the list, so ``fetchone`` and
+    ``fetchmany`` don't shift remaining rows. Consumed head is dropped once
+    it takes more than a half of the list.
+    """
+    __slots__ = ('_rows', '_pos')
+
+    def __init__(self, rows=None):
+        self._rows = rows if rows is not None else []
+        self._pos = 0
+
+    def __len__(self):
+        return len(self._rows) - self._pos
+
+    def __bool__(self):
+        return self._pos < len(self._rows)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def _advance(self, pos):
+        rows = self._rows
+        if pos * 2 > len(rows) and pos > 1024:
+            del rows[:pos]
+            pos = 0
+        self._pos = pos
+
+    def fetchone(self):
+        pos = self._pos
+        if pos >= len(self._rows):
+            return None
+
+        row = self._rows[pos]
+        self._advance(pos + 1)
+        return row
+
+    def fetchmany(self, size):
+        pos = self._pos
+        rv = self._rows[pos:pos + size]
+        self._advance(pos + len(rv))
+        return rv
+
+    def fetchall(self):
+        rv = self._rows[self._pos:] if self._pos else self._rows
+        self.clear()
+        return rv
+
+    def extend(self, rows):
+        self._rows.extend(rows)
+
+    def clear(self):
+        self._rows = []
+        self._pos = 0
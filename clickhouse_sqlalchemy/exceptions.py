@@ -7,3 +7,10 @@ class DatabaseException(Exception):
 
     def __str__(self):
         return 'Orig exception: {}'.format(self.orig)
+
+
+class QueryTimeoutError(Exception):
+    """
+    Query exceeded ``timeout`` execution option and was killed.
+    """
+    pass
@@ -0,0 +1,50 @@
+import asyncio
+
+from sqlalchemy import text
+
+
+async def _execute(engine, statement, params, semaphore):
+    if isinstance(statement, str):
+        statement = text(statement)
+
+    async with semaphore:
+        async with engine.connect() as conn:
+            result = await conn.execute(statement, params)
+            if result.returns_rows:
+                # Rows are detached from connection returned to the pool.
+                return result.freeze()()
+            return result
+
+
+async def gather_queries(engine, statements, max_concurrency=None):
+    """
+    Runs statements concurrently on ``AsyncEngine`` connections and returns
+    results in order of statements.
+
+    Each statement is checked out its own pooled connection, at most
+    `max_concurrency` statements are run at once (unlimited by default).
+    Statement is either an executable, a string or ``(statement, params)``
+    tuple. Execution options of statements, e.g. ``settings``, are kept.
+
+    If any statement fails, the rest are cancelled and the error is raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or len(statements) or 1)
+
+    tasks = []
+    for statement in statements:
+        params = None
+        if isinstance(statement, tuple):
+            statement, params = statement
+
+        tasks.append(asyncio.ensure_future(
+            _execute(engine, statement, params, semaphore)
+        ))
+
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        # Cancelled queries are stopped before connections are returned.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
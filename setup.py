@@ -33,6 +33,7 @@ dialects = [
         ('.http', 'http.base:ClickHouseDialect_http'),
         ('.native', 'native.base:ClickHouseDialect_native'),
         ('.asynch', 'asynch.base:ClickHouseDialect_asynch'),
+        ('.aiohttp', 'aiohttp.base:ClickHouseDialect_aiohttp'),
     ]
 ]
 
@@ -101,6 +102,13 @@ setup(
         'clickhouse-driver>=0.1.2',
         'asynch>=0.2.2,<=0.2.4',
     ],
+    extras_require={
+        'aiohttp': ['aiohttp'],
+        'arrow': ['pyarrow'],
+        'lz4': ['lz4'],
+        'zstd': ['zstandard'],
+        'pandas': ['pandas', 'pyarrow'],
+    },
     # Registering `clickhouse` as dialect.
     entry_points={
         'sqlalchemy.dialects': dialects
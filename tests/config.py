@@ -14,6 +14,10 @@ registry.register(
 registry.register(
     "clickhouse.asynch", "clickhouse_sqlalchemy.drivers.asynch.base", "dialect"
 )
+registry.register(
+    "clickhouse.aiohttp", "clickhouse_sqlalchemy.drivers.aiohttp.base",
+    "dialect"
+)
 
 file_config = configparser.ConfigParser()
 file_config.read(['setup.cfg'])
@@ -38,6 +42,9 @@ native_uri = uri_template.format(
 asynch_uri = uri_template.format(
     schema='clickhouse+asynch', user=user, password=password, host=host,
     port=port, database=database)
+aiohttp_uri = uri_template.format(
+    schema='clickhouse+aiohttp', user=user, password=password, host=host,
+    port=http_port, database=database)
 
 system_http_uri = uri_template.format(
     schema='clickhouse+http', user=user, password=password, host=host,
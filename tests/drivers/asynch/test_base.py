@@ -46,3 +46,23 @@ class TestConnectArgs(BaseTestCase):
         self.assertEqual(
             str(connect_args[0][0]), 'clickhouse://localhost:9001/default'
         )
+
+    def test_pool_warmup_not_supported(self):
+        url = URL.create(
+            drivername='clickhouse+asynch',
+            host='localhost',
+            database='default',
+            query={'pool_warmup': '4'}
+        )
+        with self.assertRaises(ValueError):
+            self.dialect.create_connect_args(url)
+
+    def test_hosts_not_supported(self):
+        url = URL.create(
+            drivername='clickhouse+asynch',
+            host='localhost',
+            database='default',
+            query={'hosts': 'h2'}
+        )
+        with self.assertRaises(ValueError):
+            self.dialect.create_connect_args(url)
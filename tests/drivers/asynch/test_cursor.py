@@ -1,6 +1,9 @@
 from sqlalchemy import text
 from sqlalchemy.util.concurrency import greenlet_spawn
 
+from clickhouse_sqlalchemy.exceptions import (
+    DatabaseException, QueryTimeoutError
+)
 from tests.testcase import AsynchSessionTestCase
 
 
@@ -43,3 +46,41 @@ class CursorTestCase(AsynchSessionTestCase):
                 idx += 1
 
         self.assertEqual(idx, 10)
+
+    async def test_stream_partitions(self):
+        async with self.connection.stream(
+            text('SELECT number FROM numbers(10000)'),
+            execution_options={'max_row_buffer': 1000}
+        ) as result:
+            cursor = result._real_result.cursor
+            self.assertIsNotNone(cursor._packets)
+
+            count = 0
+            async for partition in result.partitions(1000):
+                self.assertEqual(partition[0][0], count)
+                self.assertLessEqual(len(cursor._rows), 1000)
+                count += len(partition)
+
+        self.assertEqual(count, 10000)
+
+    async def test_partially_consumed_stream(self):
+        async with self.connection.stream(
+            text('SELECT number FROM system.numbers'),
+            execution_options={'max_row_buffer': 10}
+        ) as result:
+            rv = await result.fetchmany(5)
+            self.assertEqual(rv, [(x, ) for x in range(5)])
+
+        rv = await self.connection.execute(text('SELECT 1'))
+        self.assertEqual(rv.scalar(), 1)
+
+    async def test_timeout(self):
+        with self.assertRaises(DatabaseException) as ex:
+            await self.session.execute(
+                text(
+                    'SELECT count() FROM system.numbers_mt '
+                    'SETTINGS max_execution_time = 30'
+                ),
+                execution_options={'timeout': 0.5}
+            )
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
@@ -1,5 +1,19 @@
+import json
+import math
+from datetime import date
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pyarrow as pa
+from responses import mock
 from sqlalchemy import text
 
+from clickhouse_sqlalchemy.drivers.http.connector import connect
+from clickhouse_sqlalchemy.exceptions import (
+    DatabaseException, QueryTimeoutError
+)
+
 from tests.testcase import HttpSessionTestCase, HttpEngineTestCase
 from tests.util import require_server_version
 
@@ -28,3 +42,351 @@ class CursorTestCase(HttpSessionTestCase, HttpEngineTestCase):
             dict(rv.context.execution_options), {"settings": {"final": 1}}
         )
         self.assertListEqual(list(rv), [(x,) for x in range(5)])
+
+    def test_timeout(self):
+        with self.assertRaises(DatabaseException) as ex:
+            self.session.execute(
+                text(
+                    'SELECT count() FROM system.numbers_mt '
+                    'SETTINGS max_execution_time = 30'
+                ),
+                execution_options={'timeout': 0.5}
+            )
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+
+        rv = self.session.execute(text('SELECT 1')).scalar()
+        self.assertEqual(rv, 1)
+
+    def test_progress_callback(self):
+        progress = []
+        rv = self.session.execute(
+            text('SELECT count() FROM numbers_mt(100000000)'),
+            execution_options={
+                'progress_callback': progress.append,
+                'settings': {'http_headers_progress_interval_ms': 10}
+            }
+        )
+        self.assertEqual(rv.scalar(), 100000000)
+
+        self.assertTrue(progress)
+        self.assertEqual(progress[0]['total_rows_to_read'], 100000000)
+        self.assertEqual(
+            rv.context.cursor.summary['total_rows_to_read'], 100000000
+        )
+
+    def test_fetch_arrow(self):
+        rv = self.session.execute(
+            text('SELECT number, toString(number) AS s FROM numbers(10000)'),
+            execution_options={'arrow': True}
+        )
+        table = rv.cursor.fetch_arrow()
+        self.assertEqual(table.num_rows, 10000)
+        self.assertEqual(table.column_names, ['number', 's'])
+
+
+class Context(object):
+    compiled = None
+    dialect = Mock(supports_json_columns=True)
+
+    def __init__(self, **execution_options):
+        self.execution_options = execution_options
+
+
+class AbandonedStreamTestCase(TestCase):
+    url = 'http://localhost:8123/'
+    # Several response chunks.
+    body = 'x\nUInt64\n' + '1\n' * 100000
+
+    def setUp(self):
+        self.connection = connect(self.url, 'default', 'default', '')
+
+    def execute(self, **execution_options):
+        cursor = self.connection.cursor()
+        cursor.execute(
+            'SELECT x',
+            context=Context(stream_results=True, **execution_options)
+        )
+        return cursor
+
+    def kill_calls(self):
+        return [
+            call for call in mock.calls
+            if call.request.body.startswith(b'KILL QUERY')
+        ]
+
+    @mock.activate
+    def test_close_partially_consumed(self):
+        mock.add(mock.POST, self.url, status=200, body=self.body)
+
+        cursor = self.execute(kill_on_close=True)
+        cursor.fetchmany(5)
+        response = mock.calls[0].response
+        cursor.close()
+
+        self.assertTrue(response.raw.closed)
+        kill_calls = self.kill_calls()
+        self.assertEqual(len(kill_calls), 1)
+        self.assertIn(
+            str(cursor._query_id).encode(), kill_calls[0].request.body
+        )
+
+    @mock.activate
+    def test_no_kill_by_default(self):
+        mock.add(mock.POST, self.url, status=200, body=self.body)
+
+        cursor = self.execute()
+        cursor.fetchmany(5)
+        cursor.close()
+
+        self.assertEqual(self.kill_calls(), [])
+
+    @mock.activate
+    def test_no_kill_after_consumed(self):
+        mock.add(mock.POST, self.url, status=200, body=self.body)
+
+        cursor = self.execute(kill_on_close=True)
+        self.assertEqual(len(cursor.fetchall()), 100000)
+        cursor.close()
+
+        self.assertEqual(self.kill_calls(), [])
+
+    @mock.activate
+    def test_garbage_collected(self):
+        mock.add(mock.POST, self.url, status=200, body=self.body)
+
+        cursor = self.execute(kill_on_close=True)
+        cursor.fetchone()
+        del cursor
+
+        self.assertEqual(len(self.kill_calls()), 1)
+
+
+class ArrowTestCase(TestCase):
+    url = 'http://localhost:8123/'
+
+    def setUp(self):
+        self.connection = connect(self.url, 'default', 'default', '')
+        self.table = pa.table({
+            'x': pa.array(range(1000), pa.uint64()),
+            's': pa.array([str(i) for i in range(1000)])
+        })
+
+    def make_body(self):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, self.table.schema) as writer:
+            for batch in self.table.to_batches(max_chunksize=100):
+                writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    @mock.activate
+    def test_fetch_arrow(self):
+        mock.add(mock.POST, self.url, status=200, body=self.make_body())
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, s', context=Context(arrow=True))
+
+        self.assertIn(
+            'default_format=ArrowStream', mock.calls[0].request.url
+        )
+        self.assertEqual(
+            [x[:2] for x in cursor.description],
+            [('x', 'uint64'), ('s', 'string')]
+        )
+        self.assertTrue(cursor.fetch_arrow().equals(self.table))
+
+    @mock.activate
+    def test_fetch_arrow_stream(self):
+        mock.add(mock.POST, self.url, status=200, body=self.make_body())
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            'SELECT x, s', context=Context(arrow=True, stream_results=True)
+        )
+        # Rows are fetched from the first batch, the rest is fetched as table.
+        self.assertEqual(cursor.fetchone(), (0, '0'))
+        table = cursor.fetch_arrow()
+        self.assertEqual(table.num_rows, 999)
+        self.assertEqual(table.column('x')[0].as_py(), 1)
+        self.assertIsNone(cursor.fetchone())
+
+    @mock.activate
+    def test_fetch_rows(self):
+        mock.add(mock.POST, self.url, status=200, body=self.make_body())
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, s', context=Context(arrow=True))
+        rows = cursor.fetchall()
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows[999], (999, '999'))
+
+    @mock.activate
+    def test_empty_result(self):
+        mock.add(mock.POST, self.url, status=200, body='')
+
+        cursor = self.connection.cursor()
+        cursor.execute('CREATE TABLE t', context=Context(arrow=True))
+        self.assertIsNone(cursor.fetch_arrow())
+        self.assertEqual(cursor.description, [])
+
+    @mock.activate
+    def test_fetch_arrow_without_option(self):
+        mock.add(mock.POST, self.url, status=200, body='x\nUInt8\n1\n')
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT 1')
+        with self.assertRaises(RuntimeError):
+            cursor.fetch_arrow()
+
+    @mock.activate
+    def test_insert_arrow(self):
+        mock.add(mock.POST, self.url, status=200, body='')
+
+        cursor = self.connection.cursor()
+        reader = pa.RecordBatchReader.from_batches(
+            self.table.schema, self.table.to_batches(max_chunksize=100)
+        )
+        cursor.insert_arrow('INSERT INTO t (x, s)', reader)
+
+        request = mock.calls[0].request
+        self.assertIn(
+            'INSERT+INTO+t+%28x%2C+s%29+FORMAT+ArrowStream', request.url
+        )
+        body = b''.join(request.body)
+        self.assertTrue(
+            pa.ipc.open_stream(body).read_all().equals(self.table)
+        )
+
+    def test_insert_wrong_type(self):
+        cursor = self.connection.cursor()
+        with self.assertRaises(TypeError):
+            cursor.insert_arrow('INSERT INTO t', [(1, '1')])
+
+
+class FetchColumnsTestCase(TestCase):
+    url = 'http://localhost:8123/'
+
+    def setUp(self):
+        self.connection = connect(self.url, 'default', 'default', '')
+
+    @mock.activate
+    def test_fetch_columns(self):
+        mock.add(
+            mock.POST, self.url, status=200,
+            body='x\ty\nUInt8\tString\n1\ta\n2\tb\n3\tc\n'
+        )
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, y')
+        self.assertEqual(cursor.fetchone(), [1, 'a'])
+        self.assertEqual(
+            cursor.fetch_columns(), {'x': (2, 3), 'y': ('b', 'c')}
+        )
+
+    @mock.activate
+    def test_fetch_columns_empty(self):
+        mock.add(
+            mock.POST, self.url, status=200, body='x\ty\nUInt8\tString\n'
+        )
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, y')
+        self.assertEqual(cursor.fetch_columns(), {'x': (), 'y': ()})
+
+    @mock.activate
+    def test_use_numpy(self):
+        table = pa.table({
+            'x': pa.array(range(1000), pa.uint64()),
+            'y': pa.array([float(i) for i in range(1000)])
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=100)
+        mock.add(
+            mock.POST, self.url, status=200,
+            body=sink.getvalue().to_pybytes()
+        )
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, y', context=Context(use_numpy=True))
+        self.assertIn(
+            'default_format=ArrowStream', mock.calls[0].request.url
+        )
+
+        columns = cursor.fetch_columns()
+        self.assertEqual(columns['x'].dtype, np.uint64)
+        self.assertEqual(columns['x'].sum(), 499500)
+        self.assertEqual(columns['y'].dtype, np.float64)
+
+    @mock.activate
+    def test_json_columns(self):
+        mock.add(
+            mock.POST, self.url, status=200, body=json.dumps({
+                'meta': [
+                    {'name': 'x', 'type': 'UInt64'},
+                    {'name': 'd', 'type': 'Nullable(Date)'},
+                    {'name': 'f', 'type': 'Float64'}
+                ],
+                'data': {
+                    'x': [1, 18446744073709551615],
+                    'd': ['2020-01-01', None],
+                    'f': [0.5, 'nan']
+                },
+                'rows': 2
+            })
+        )
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x, d, f', context=Context(json_columns=True))
+        self.assertIn(
+            'default_format=JSONColumnsWithMetadata',
+            mock.calls[0].request.url
+        )
+        self.assertEqual(
+            [x[:2] for x in cursor.description],
+            [('x', 'UInt64'), ('d', 'Nullable(Date)'), ('f', 'Float64')]
+        )
+
+        columns = cursor.fetch_columns()
+        self.assertEqual(columns['x'], [1, 18446744073709551615])
+        self.assertEqual(columns['d'], [date(2020, 1, 1), None])
+        self.assertEqual(columns['f'][0], 0.5)
+        self.assertTrue(math.isnan(columns['f'][1]))
+
+    @mock.activate
+    def test_json_columns_rows(self):
+        mock.add(
+            mock.POST, self.url, status=200, body=json.dumps({
+                'meta': [{'name': 'x', 'type': 'String'}],
+                'data': {'x': ['a', 'b']}
+            })
+        )
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x', context=Context(json_columns=True))
+        self.assertEqual(cursor.fetchall(), [('a', ), ('b', )])
+        self.assertEqual(cursor.fetch_columns(), {'x': ()})
+
+    @mock.activate
+    def test_json_columns_unsupported(self):
+        mock.add(mock.POST, self.url, status=200, body='x\nString\na\nb\n')
+
+        context = Context(json_columns=True)
+        context.dialect = Mock(supports_json_columns=False)
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x', context=context)
+        self.assertNotIn(
+            'JSONColumnsWithMetadata', mock.calls[0].request.url
+        )
+        self.assertEqual(cursor.fetch_columns(), {'x': ('a', 'b')})
+
+    @mock.activate
+    def test_columnar_keeps_default_format(self):
+        mock.add(mock.POST, self.url, status=200, body='x\nString\na\n')
+
+        cursor = self.connection.cursor()
+        cursor.execute('SELECT x', context=Context(columnar=True))
+        self.assertIn(
+            'default_format=TabSeparatedWithNamesAndTypes',
+            mock.calls[0].request.url
+        )
+        self.assertEqual(cursor.fetch_columns(), {'x': ('a', )})
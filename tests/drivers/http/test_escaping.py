@@ -1,5 +1,5 @@
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 import uuid
 
 from sqlalchemy import Column, literal
@@ -44,6 +44,25 @@ class EscapingTestCase(HttpSessionTestCase):
 
         self.assertIn('Unsupported param format', str(ex.exception))
 
+    def test_server_param_escaper(self):
+        e = Escaper()
+        escape = e.escape_server_param
+        self.assertEqual(escape(None), '\\N')
+        self.assertEqual(escape("a'\t%"), "a\\'\\t%")
+        self.assertEqual(escape(True), 'true')
+        self.assertEqual(escape(10), '10')
+        self.assertEqual(escape(Decimal('10.10')), '10.10')
+        self.assertEqual(escape(date(2017, 1, 2)), '2017-01-02')
+        self.assertEqual(
+            escape(datetime(2017, 1, 2, 3, 4, 5, 6000), 'DateTime64(3)'),
+            '2017-01-02 03:04:05.006000'
+        )
+        self.assertEqual(
+            escape(datetime(2017, 1, 2, 3, 4, 5, 6000), 'DateTime'),
+            '2017-01-02 03:04:05'
+        )
+        self.assertEqual(escape(['a', None]), "['a', NULL]")
+
     def test_escape_binary_mod(self):
         query = self.session.query(literal(1) % literal(2))
         self.assertEqual(
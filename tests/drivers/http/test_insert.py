@@ -0,0 +1,95 @@
+from datetime import date, datetime
+
+import pyarrow as pa
+from parameterized import parameterized
+from sqlalchemy import Column, func, select
+
+from clickhouse_sqlalchemy import engines, types, Table
+from tests.testcase import HttpSessionTestCase
+
+
+class HttpInsertTestCase(HttpSessionTestCase):
+    def make_table(self):
+        return Table(
+            'test', self.metadata(),
+            Column('x', types.Int32, primary_key=True),
+            Column('y', types.Nullable(types.String)),
+            Column('z', types.Array(types.Date)),
+            Column('t', types.DateTime),
+            engines.Memory()
+        )
+
+    @parameterized.expand([
+        (None, ), ('TabSeparated', ), ('RowBinary', )
+    ])
+    def test_insert_format(self, insert_format):
+        table = self.make_table()
+        rows = [
+            {
+                'x': x,
+                'y': None if x % 2 else "a'\t\\%d" % x,
+                'z': [date(2020, 1, x + 1)],
+                't': datetime(2020, 1, 1, 12, 0, x)
+            }
+            for x in range(5)
+        ]
+
+        with self.create_table(table):
+            statement = table.insert().execution_options(
+                insert_format=insert_format, insert_chunk_size=16
+            )
+            self.session.execute(statement, rows)
+
+            rv = self.session.execute(
+                select(table.c.x, table.c.y, table.c.t).order_by(table.c.x)
+            ).fetchall()
+            days = self.session.execute(
+                select(func.arraySum(func.groupArray(
+                    func.toDayOfMonth(func.arrayJoin(table.c.z))
+                )))
+            ).scalar()
+
+        self.assertEqual(rv, [(r['x'], r['y'], r['t']) for r in rows])
+        self.assertEqual(days, 15)
+
+    def test_insert_format_with_sql_values(self):
+        table = self.make_table()
+
+        with self.create_table(table):
+            statement = table.insert().values(
+                x=1, y=func.concat('a', 'b'), z=[], t=func.now()
+            ).execution_options(insert_format='RowBinary')
+            self.session.execute(statement)
+
+            rv = self.session.execute(select(table.c.y)).scalar()
+
+        self.assertEqual(rv, 'ab')
+
+    def test_unknown_insert_format(self):
+        table = self.make_table()
+
+        with self.create_table(table):
+            statement = table.insert().execution_options(
+                insert_format='Native'
+            )
+            with self.assertRaises(ValueError):
+                self.session.execute(statement, [{'x': 1, 'z': []}])
+
+    def test_insert_arrow(self):
+        table = self.make_table()
+        data = pa.table({
+            'x': pa.array(range(5), pa.int32()),
+            'y': pa.array(['a', None, 'c', None, 'e']),
+            'z': pa.array([[]] * 5, pa.list_(pa.date32())),
+            't': pa.array([datetime(2020, 1, 1)] * 5, pa.timestamp('s'))
+        })
+
+        with self.create_table(table):
+            raw = self.session.connection().connection
+            raw.cursor().insert_arrow('INSERT INTO test (x, y, z, t)', data)
+
+            rv = self.session.execute(
+                select(table.c.x, table.c.y).order_by(table.c.x)
+            ).fetchall()
+
+        self.assertEqual(rv, list(zip(range(5), ['a', None, 'c', None, 'e'])))
@@ -0,0 +1,222 @@
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+from ipaddress import IPv4Address
+from unittest import TestCase
+from uuid import UUID
+
+from clickhouse_sqlalchemy.drivers.http.rowbinary import (
+    make_row_writer, parse_rowbinary, write_header
+)
+from clickhouse_sqlalchemy.exceptions import DatabaseException
+
+
+def varint(value):
+    rv = b''
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            rv += bytes([byte | 0x80])
+        else:
+            return rv + bytes([byte])
+
+
+def string(value):
+    value = value.encode('utf-8') if isinstance(value, str) else value
+    return varint(len(value)) + value
+
+
+def header(names, types):
+    return (
+        varint(len(names)) +
+        b''.join(string(x) for x in names) +
+        b''.join(string(x) for x in types)
+    )
+
+
+class RowBinaryTestCase(TestCase):
+    def parse(self, data, chunk_size=None, **kwargs):
+        if chunk_size:
+            chunks = [
+                data[i:i + chunk_size]
+                for i in range(0, len(data), chunk_size)
+            ]
+        else:
+            chunks = [data]
+        return list(parse_rowbinary(chunks, **kwargs))
+
+    def test_empty(self):
+        self.assertEqual(self.parse(b''), [])
+
+    def test_numbers(self):
+        data = header(['a', 'b', 'c'], ['UInt8', 'Int64', 'Float64'])
+        data += struct.pack('<Bqd', 1, -2, 0.1)
+        data += struct.pack('<Bqd', 3, 4, 1e300)
+
+        self.assertEqual(self.parse(data), [
+            ['a', 'b', 'c'],
+            ['UInt8', 'Int64', 'Float64'],
+            [1, -2, 0.1],
+            [3, 4, 1e300]
+        ])
+
+    def test_strings(self):
+        data = header(['a', 'b'], ['String', 'FixedString(3)'])
+        data += string('a\tb\n\\') + b'xyz'
+        data += string(b'\xff') + b'ab\0'
+
+        rv = self.parse(data, errors='surrogateescape')
+        self.assertEqual(rv[2:], [['a\tb\n\\', 'xyz'], ['\udcff', 'ab\0']])
+
+    def test_nullable(self):
+        data = header(['a'], ['Nullable(Int32)'])
+        data += b'\x01' + b'\x00' + struct.pack('<i', 42)
+
+        self.assertEqual(self.parse(data)[2:], [[None], [42]])
+
+    def test_dates(self):
+        types = ["Date", "DateTime", "DateTime64(3)", "DateTime('Etc/GMT-3')"]
+        data = header(['a', 'b', 'c', 'd'], types)
+        data += struct.pack('<HIqI', 15638, 1351123200, 1351123200123, 0)
+
+        self.assertEqual(self.parse(data)[2], [
+            date(2012, 10, 25),
+            datetime(2012, 10, 25),
+            datetime(2012, 10, 25, 0, 0, 0, 123000),
+            datetime(1970, 1, 1, 3)
+        ])
+
+    def test_server_timezone(self):
+        data = header(['a'], ['DateTime']) + struct.pack('<I', 0)
+        rv = self.parse(data, timezone='Etc/GMT-1')
+        self.assertEqual(rv[2], [datetime(1970, 1, 1, 1)])
+
+    def test_decimal(self):
+        data = header(['a', 'b'], ['Decimal(9, 2)', 'Decimal128(3)'])
+        data += struct.pack('<i', 110) + (-1500).to_bytes(16, 'little',
+                                                          signed=True)
+
+        self.assertEqual(
+            self.parse(data)[2], [Decimal('1.10'), Decimal('-1.500')]
+        )
+
+    def test_misc_types(self):
+        uuid = UUID('12345678-1234-5678-1234-567812345678')
+        data = header(
+            ['a', 'b', 'c', 'd'],
+            ['UUID', 'IPv4', "Enum8('a' = 1, 'b' = 2)", 'UInt128']
+        )
+        data += struct.pack('<QQ', uuid.int >> 64, uuid.int & (2 ** 64 - 1))
+        data += struct.pack('<Ib', 0x7f000001, 2)
+        data += (2 ** 100).to_bytes(16, 'little')
+
+        self.assertEqual(
+            self.parse(data)[2],
+            [uuid, IPv4Address('127.0.0.1'), 'b', 2 ** 100]
+        )
+
+    def test_composite_types(self):
+        types = [
+            'Array(Nullable(String))',
+            'Tuple(a UInt8, b String)',
+            'Map(String, Array(UInt16))'
+        ]
+        data = header(['a', 'b', 'c'], types)
+        data += varint(2) + b'\x00' + string('x') + b'\x01'
+        data += b'\x07' + string('y')
+        data += varint(1) + string('k') + varint(2) + struct.pack('<HH', 1, 2)
+
+        self.assertEqual(
+            self.parse(data)[2],
+            [['x', None], (7, 'y'), {'k': [1, 2]}]
+        )
+
+    def test_chunked(self):
+        data = header(['a', 'b'], ['String', 'UInt32'])
+        rows = []
+        for i in range(100):
+            data += string('x' * i) + struct.pack('<I', i)
+            rows.append(['x' * i, i])
+
+        for chunk_size in (1, 3, 7, 64):
+            self.assertEqual(self.parse(data, chunk_size=chunk_size)[2:], rows)
+
+    def test_truncated_stream(self):
+        data = header(['a'], ['UInt32']) + struct.pack('<I', 1) + b'Cod'
+
+        with self.assertRaises(DatabaseException) as ex:
+            self.parse(data)
+
+        self.assertIn('Cod', str(ex.exception))
+
+
+class RowBinaryWriterTestCase(TestCase):
+    def roundtrip(self, types, rows, timezone=None):
+        write_row = make_row_writer(types, timezone)
+        data = bytearray(header(['c%d' % i for i in range(len(types))], types))
+        for row in rows:
+            write_row(row, data)
+        return list(parse_rowbinary([bytes(data)], timezone=timezone))[2:]
+
+    def test_simple_types(self):
+        types = [
+            'UInt8', 'Int64', 'Float64', 'String', 'FixedString(3)',
+            'Nullable(String)', 'LowCardinality(String)', 'Bool'
+        ]
+        rows = [
+            [1, -2, 0.5, 'a\tb', 'xy', None, 'lc', True],
+            [255, 2 ** 62, -1.5, '', 'xyz', 'n', '', False]
+        ]
+        expected = [list(rows[0]), list(rows[1])]
+        expected[0][4] = 'xy\0'
+
+        self.assertEqual(self.roundtrip(types, rows), expected)
+
+    def test_dates(self):
+        types = ['Date', 'Date32', 'DateTime', 'DateTime64(3)']
+        row = [
+            date(2012, 10, 25), date(1960, 1, 1),
+            datetime(2012, 10, 25, 1, 2, 3),
+            datetime(2012, 10, 25, 1, 2, 3, 456000)
+        ]
+
+        self.assertEqual(self.roundtrip(types, [row]), [row])
+        self.assertEqual(
+            self.roundtrip(types, [row], timezone='Europe/Moscow'), [row]
+        )
+
+    def test_misc_types(self):
+        uuid = UUID('12345678-1234-5678-1234-567812345678')
+        types = [
+            'UUID', 'IPv4', "Enum8('a' = 1, 'b' = 2)", 'UInt128',
+            'Decimal(9, 2)', 'Decimal128(3)'
+        ]
+        row = [
+            uuid, IPv4Address('127.0.0.1'), 'b', 2 ** 100,
+            Decimal('1.10'), Decimal('-1.500')
+        ]
+
+        self.assertEqual(self.roundtrip(types, [row]), [row])
+
+    def test_composite_types(self):
+        types = [
+            'Array(Nullable(String))',
+            'Tuple(a UInt8, b String)',
+            'Map(String, Array(UInt16))'
+        ]
+        row = [['x', None], (7, 'y'), {'k': [1, 2]}]
+
+        self.assertEqual(self.roundtrip(types, [row]), [row])
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            make_row_writer(['Object(\'json\')'])
+
+    def test_header(self):
+        out = bytearray()
+        write_header(['x', 'y'], ['UInt8', 'Array(String)'], out)
+
+        self.assertEqual(
+            bytes(out), header(['x', 'y'], ['UInt8', 'Array(String)'])
+        )
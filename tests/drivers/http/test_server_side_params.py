@@ -0,0 +1,62 @@
+from sqlalchemy import Column, create_engine, literal, select, text
+
+from clickhouse_sqlalchemy import engines, get_declarative_base, make_session
+from clickhouse_sqlalchemy import types
+from tests.config import http_uri
+from tests.testcase import HttpSessionTestCase
+
+
+class ServerSideParamsTestCase(HttpSessionTestCase):
+    session = make_session(
+        create_engine(http_uri + '?server_side_params=true')
+    )
+
+    def setUp(self):
+        super(ServerSideParamsTestCase, self).setUp()
+
+        base = get_declarative_base()
+
+        class TestTable(base):
+            __tablename__ = 'test'
+            __table_args__ = (engines.Memory(), )
+
+            x = Column(types.Int32, primary_key=True)
+            y = Column(types.String)
+            z = Column(types.Nullable(types.String))
+
+        self.table = TestTable.__table__
+
+    def test_compile(self):
+        query = select(self.table.c.x).where(
+            self.table.c.y == 'a',
+            self.table.c.x.in_([1, 2]),
+            self.table.c.x > literal(1)
+        )
+        self.assertEqual(
+            self.compile(query),
+            'SELECT test.x FROM test '
+            'WHERE test.y = {y_1:String} '
+            'AND test.x IN (__[POSTCOMPILE_x_1]) AND test.x > %(param_1)s'
+        )
+
+    def test_insert_is_not_parametrized(self):
+        self.assertEqual(
+            self.compile(self.table.insert().values(x=1, y='a')),
+            'INSERT INTO test (x, y) VALUES (%(x)s, %(y)s)'
+        )
+
+    def test_select(self):
+        with self.create_table(self.table):
+            self.session.execute(self.table.insert(), [
+                {'x': 1, 'y': "a'\t\\%", 'z': None},
+                {'x': 2, 'y': 'b', 'z': 'c'}
+            ])
+
+            rv = self.session.execute(
+                select(self.table.c.x).where(
+                    self.table.c.y == "a'\t\\%",
+                    self.table.c.z.is_distinct_from('c'),
+                    text("y LIKE '%'")
+                )
+            ).fetchall()
+            self.assertEqual(rv, [(1, )])
@@ -1,12 +1,13 @@
 from sqlalchemy import text
 
 from tests.testcase import HttpSessionTestCase
-from tests.session import http_stream_session
+from tests.session import http_session, http_stream_session
 
 
 class StreamingHttpTestCase(HttpSessionTestCase):
 
     session = http_stream_session
+    execution_options = {}
     power = 4
 
     def make_query(self, power=None):
@@ -26,14 +27,18 @@ class StreamingHttpTestCase(HttpSessionTestCase):
     def test_streaming(self):
         power = self.power
         query = self.make_query(power=power)
-        res = self.session.execute(text(query))
+        res = self.session.execute(
+            text(query), execution_options=self.execution_options
+        )
         count = sum(1 for _ in res)
         self.assertEqual(count, 10 ** power)
 
     def test_fetchmany(self):
         power = self.power - 1
         query = self.make_query(power=power)
-        res = self.session.execute(text(query))
+        res = self.session.execute(
+            text(query), execution_options=self.execution_options
+        )
 
         count = 0
         while True:
@@ -51,7 +56,9 @@ class StreamingHttpTestCase(HttpSessionTestCase):
                 "Misconfigured test case:"
                 " `power` should be at least 3.")
         query = self.make_query(power=power)
-        res = self.session.execute(text(query))
+        res = self.session.execute(
+            text(query), execution_options=self.execution_options
+        )
 
         count = 0
 
@@ -62,3 +69,19 @@ class StreamingHttpTestCase(HttpSessionTestCase):
         count += sum(1 for _ in block)
 
         self.assertEqual(count, 10 ** power)
+
+
+class StreamResultsHttpTestCase(StreamingHttpTestCase):
+    session = http_session
+    execution_options = {'stream_results': True}
+
+    def test_rows_are_not_prefetched(self):
+        res = self.session.execute(
+            text(self.make_query(power=2)),
+            execution_options=self.execution_options
+        )
+        self.assertIsNone(res.cursor._rows)
+
+        rows = res.fetchmany(10)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(len(res.fetchall()), 90)
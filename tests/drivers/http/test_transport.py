@@ -1,12 +1,28 @@
+import gzip
+import io
+import threading
 from datetime import date, datetime
 from decimal import Decimal
+from unittest import TestCase
 from unittest.mock import patch
 
-from responses import mock
+import lz4.frame
+import requests
+from requests.exceptions import ConnectionError, ReadTimeout
+from responses import matchers, mock
 from sqlalchemy import Column, func
+from urllib3.exceptions import ReadTimeoutError
 
 from clickhouse_sqlalchemy import types, Table
+from clickhouse_sqlalchemy.drivers.balancer import (
+    Balancer, REPLICA_DELAY_QUERY
+)
 from clickhouse_sqlalchemy.drivers.http.base import ClickHouseDialect_http
+from clickhouse_sqlalchemy.drivers.http.session import TCPKeepAliveAdapter
+from clickhouse_sqlalchemy.drivers.http.transport import RequestsTransport
+from clickhouse_sqlalchemy.exceptions import (
+    DatabaseException, QueryTimeoutError
+)
 from tests.testcase import HttpSessionTestCase
 
 
@@ -215,3 +231,589 @@ class TransportCase(HttpSessionTestCase):
 
         rv = self.session.query(*table.c).all()
         self.assertEqual(rv, [(None, )])
+
+    @mock.activate
+    def test_parse_low_cardinality_nullable(self):
+        mock.add(
+            mock.POST, self.url, status=200,
+            body=(
+                'a\n' +
+                'LowCardinality(Nullable(Int32))\n' +
+                '\\N\n' +
+                '42\n'
+            )
+        )
+
+        table = Table(
+            't1', self.metadata(),
+            Column('a', types.Int32)
+        )
+
+        rv = self.session.query(*table.c).all()
+        self.assertEqual(rv, [(None, ), (42, )])
+
+    @patch.object(ClickHouseDialect_http, '_get_server_version_info')
+    @mock.activate
+    def test_parse_date_time64_nanoseconds(self, patched_server_info):
+        mock.add(
+            mock.POST, self.url, status=200,
+            body=(
+                'a\tb\n' +
+                'DateTime64(9)\tString\n' +
+                '2012-10-25 01:02:03.123456789\ta\\tb\n'
+            )
+        )
+
+        table = Table(
+            't1', self.metadata(),
+            Column('a', types.DateTime),
+            Column('b', types.String)
+        )
+
+        rv = self.session.query(*table.c).first()
+        self.assertEqual(
+            rv, (datetime(2012, 10, 25, 1, 2, 3, 123456), 'a\tb')
+        )
+
+    @mock.activate
+    def test_insert_rowbinary_with_types(self):
+        mock.add(mock.POST, self.url, status=200, body=b'')
+
+        table = Table(
+            't1', self.metadata(),
+            Column('x', types.Int32, primary_key=True),
+            Column('y', types.String)
+        )
+        self.session.execute(
+            table.insert().execution_options(insert_format='RowBinary'),
+            [{'x': 1, 'y': 'a'}, {'x': 2, 'y': 'b'}]
+        )
+
+        request = mock.calls[-1].request
+        self.assertIn('FORMAT+RowBinaryWithNamesAndTypes', request.url)
+        self.assertIn('input_format_with_types_use_header=1', request.url)
+        self.assertEqual(
+            b''.join(request.body),
+            b'\x02\x01x\x01y\x05Int32\x06String'
+            b'\x01\x00\x00\x00\x01a\x02\x00\x00\x00\x01b'
+        )
+
+
+class CompressionTransportCase(TestCase):
+    url = 'http://localhost:8123/'
+    body = b'a\tb\nUInt8\tString\n' + b'1\tx\n' * 1000
+
+    def make_transport(self, **kwargs):
+        return RequestsTransport(self.url, 'default', 'default', '', **kwargs)
+
+    @mock.activate
+    def test_gzip_response(self):
+        mock.add(
+            mock.POST, self.url, status=200, body=gzip.compress(self.body),
+            headers={'Content-Encoding': 'gzip'}
+        )
+
+        transport = self.make_transport(compress='gzip')
+        rv = list(transport.execute('SELECT 1'))
+        self.assertEqual(rv[:3], [['a', 'b'], ['UInt8', 'String'], [1, 'x']])
+        self.assertEqual(len(rv), 1002)
+
+        request = mock.calls[0].request
+        self.assertEqual(request.headers['Accept-Encoding'], 'gzip')
+        self.assertIn('enable_http_compression=1', request.url)
+        self.assertNotIn('Content-Encoding', request.headers)
+
+    @mock.activate
+    def test_lz4_response(self):
+        mock.add(
+            mock.POST, self.url, status=200,
+            body=lz4.frame.compress(self.body),
+            headers={'Content-Encoding': 'lz4'}
+        )
+
+        transport = self.make_transport(compress='lz4')
+        rv = list(transport.execute('SELECT 1'))
+        self.assertEqual(len(rv), 1002)
+
+    @mock.activate
+    def test_compressed_error(self):
+        mock.add(
+            mock.POST, self.url, status=500,
+            body=lz4.frame.compress(b'Code: 62. DB::Exception: Syntax error'),
+            headers={'Content-Encoding': 'lz4'}
+        )
+
+        transport = self.make_transport(compress='lz4')
+        with self.assertRaises(DatabaseException) as ex:
+            list(transport.execute('SELECT'))
+
+        self.assertIn('Syntax error', str(ex.exception))
+
+    @mock.activate
+    def test_request_compression(self):
+        mock.add(mock.POST, self.url, status=200, body=b'')
+
+        transport = self.make_transport(compress='gzip', compress_threshold=10)
+        transport.raw('SELECT 1')
+        transport.raw('SELECT 1 FROM system.numbers')
+
+        short, long = [x.request for x in mock.calls]
+        self.assertEqual(short.body, b'SELECT 1')
+        self.assertEqual(long.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(long.body), b'SELECT 1 FROM system.numbers'
+        )
+
+    @mock.activate
+    def test_insert_compression(self):
+        mock.add(mock.POST, self.url, status=200, body=b'')
+
+        transport = self.make_transport(compress='gzip')
+        transport.insert(
+            'INSERT INTO t FORMAT TabSeparated', iter([b'1\n', b'2\n'])
+        )
+
+        request = mock.calls[0].request
+        self.assertIn('query=INSERT', request.url)
+        self.assertEqual(request.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(request.body)), b'1\n2\n')
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            self.make_transport(compress='snappy')
+
+
+class RetryTransportCase(TestCase):
+    url = 'http://localhost:8123/'
+
+    def make_transport(self, **kwargs):
+        kwargs.setdefault('retry_backoff', 0)
+        return RequestsTransport(self.url, 'default', 'default', '', **kwargs)
+
+    @mock.activate
+    def test_retry_status(self):
+        mock.add(mock.POST, self.url, status=503, body='Unavailable')
+        mock.add(mock.POST, self.url, status=200, body='1\n')
+
+        transport = self.make_transport(retries='2')
+        rv = transport.raw('SELECT 1', params={'query_id': 'q1'})
+
+        self.assertEqual(rv, '1\n')
+        self.assertEqual(transport.retries_count, 1)
+        self.assertEqual(len(mock.calls), 2)
+        for call in mock.calls:
+            self.assertIn('query_id=q1', call.request.url)
+
+    @mock.activate
+    def test_retry_connection_error(self):
+        mock.add(mock.POST, self.url, body=ConnectionError('reset'))
+        mock.add(mock.POST, self.url, status=200, body='1\n')
+
+        transport = self.make_transport(retries=1)
+        self.assertEqual(transport.raw('SELECT 1'), '1\n')
+
+    @mock.activate
+    def test_retries_exhausted(self):
+        mock.add(mock.POST, self.url, status=503, body='Unavailable')
+
+        transport = self.make_transport(retries=2)
+        with self.assertRaises(DatabaseException) as ex:
+            transport.raw('SELECT 1')
+
+        self.assertEqual(ex.exception.orig.code, 503)
+        self.assertEqual(len(mock.calls), 3)
+
+    @mock.activate
+    def test_no_retry_for_non_retryable_status(self):
+        mock.add(mock.POST, self.url, status=500, body='Syntax error')
+
+        transport = self.make_transport(retries=2)
+        with self.assertRaises(DatabaseException):
+            transport.raw('SELECT')
+
+        self.assertEqual(len(mock.calls), 1)
+
+    @mock.activate
+    def test_no_retry_for_non_idempotent(self):
+        mock.add(mock.POST, self.url, status=503, body='Unavailable')
+
+        transport = self.make_transport(retries=2, retry_status='502,503')
+        with self.assertRaises(DatabaseException):
+            transport.raw('INSERT INTO t VALUES (1)')
+        self.assertEqual(len(mock.calls), 1)
+
+        transport = self.make_transport(retries=2, retry_non_idempotent=True)
+        with self.assertRaises(DatabaseException):
+            transport.raw('INSERT INTO t VALUES (1)')
+        self.assertEqual(len(mock.calls), 4)
+
+    @mock.activate
+    def test_no_retry_for_streamed_body(self):
+        mock.add(mock.POST, self.url, status=503, body='Unavailable')
+
+        transport = self.make_transport(retries=2, retry_non_idempotent=True)
+        with self.assertRaises(DatabaseException):
+            transport.insert(
+                'INSERT INTO t FORMAT TabSeparated', iter([b'1\n'])
+            )
+        self.assertEqual(len(mock.calls), 1)
+
+
+class SessionTransportCase(TestCase):
+    url = 'http://localhost:8123/'
+
+    def make_transport(self, **kwargs):
+        return RequestsTransport(self.url, 'default', 'default', '', **kwargs)
+
+    def test_pool_options(self):
+        transport = self.make_transport(
+            pool_maxsize='64', pool_block='true', tcp_keepalive='true'
+        )
+        adapter = transport.http.get_adapter(self.url)
+        self.assertIsInstance(adapter, TCPKeepAliveAdapter)
+        self.assertEqual(adapter._pool_maxsize, 64)
+        self.assertTrue(adapter._pool_block)
+
+    def test_session_per_thread(self):
+        transport = self.make_transport(session_per_thread='true')
+        sessions = []
+
+        def worker():
+            sessions.append(transport.http.session)
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(transport.http.session, transport.http.session)
+
+    def test_close(self):
+        transport = self.make_transport()
+        with patch.object(transport.http, 'close') as close:
+            transport.close()
+        close.assert_called_once()
+
+        session = requests.Session()
+        transport = self.make_transport(http_session=session)
+        with patch.object(session, 'close') as close:
+            transport.close()
+        close.assert_not_called()
+
+    @mock.activate
+    def test_base_params_not_modified(self):
+        mock.add(mock.POST, self.url, status=200, body='1\n')
+        mock.add(mock.POST, self.url, status=200, body='1\n')
+
+        transport = self.make_transport()
+        transport.raw('SELECT 1', params={'query_id': 'q1'})
+        transport.raw('SELECT 1')
+
+        self.assertIn('query_id=q1', mock.calls[0].request.url)
+        self.assertNotIn('query_id', mock.calls[1].request.url)
+        self.assertIn('database=default', mock.calls[1].request.url)
+
+
+class BalancerTransportCase(TestCase):
+    urls = ['http://h1:8123/', 'http://h2:8123/']
+
+    def make_transport(self, **kwargs):
+        kwargs.setdefault('retry_backoff', 0)
+        balancer = Balancer(
+            [(url, url) for url in self.urls],
+            strategy=kwargs.pop('balancing', 'round_robin')
+        )
+        return RequestsTransport(
+            self.urls[0], 'default', 'default', '', balancer=balancer,
+            **kwargs
+        )
+
+    @mock.activate
+    def test_round_robin(self):
+        for url in self.urls:
+            mock.add(mock.POST, url, status=200, body='1\n')
+
+        transport = self.make_transport()
+        for _ in range(4):
+            transport.raw('SELECT 1')
+
+        hosts = [call.request.url.split('?')[0] for call in mock.calls]
+        self.assertEqual(hosts, self.urls * 2)
+        self.assertEqual(
+            [x.outstanding for x in transport.balancer.hosts], [0, 0]
+        )
+
+    @mock.activate
+    def test_host_released_when_result_closed(self):
+        for url in self.urls:
+            mock.add(
+                mock.POST, url, status=200, body='a\nUInt8\n1\n2\n'
+            )
+
+        transport = self.make_transport(balancing='least_outstanding')
+        hosts = transport.balancer.hosts
+
+        rv = transport.execute('SELECT a')
+        self.assertEqual(next(rv), ['a'])
+        self.assertEqual([x.outstanding for x in hosts], [1, 0])
+
+        # Next query goes to another host while result is still read.
+        rv2 = transport.execute('SELECT a')
+        self.assertEqual(next(rv2), ['a'])
+        self.assertEqual([x.outstanding for x in hosts], [1, 1])
+        rv2.close()
+        self.assertEqual([x.outstanding for x in hosts], [1, 0])
+
+        self.assertEqual(list(rv), [['UInt8'], [1], [2]])
+        self.assertEqual([x.outstanding for x in hosts], [0, 0])
+
+        transport.raw('SELECT 1', stream=True)
+        self.assertEqual([x.outstanding for x in hosts], [0, 0])
+
+    @mock.activate
+    def test_failed_host_ejected(self):
+        mock.add(mock.POST, self.urls[0], body=ConnectionError('refused'))
+        mock.add(mock.POST, self.urls[1], status=200, body='1\n')
+
+        transport = self.make_transport(retries=1)
+        for _ in range(3):
+            self.assertEqual(transport.raw('SELECT 1'), '1\n')
+
+        hosts = [call.request.url.split('?')[0] for call in mock.calls]
+        self.assertEqual(hosts, [self.urls[0]] + [self.urls[1]] * 3)
+
+    @mock.activate
+    def test_replica_lag(self):
+        for url, delay in zip(self.urls, ['600\n', '0\n']):
+            mock.add(
+                mock.POST, url, status=200, body=delay,
+                match=[matchers.body_matcher(REPLICA_DELAY_QUERY)]
+            )
+            mock.add(mock.POST, url, status=200, body='1\n')
+
+        transport = self.make_transport(balancing='replica_lag')
+        for _ in range(2):
+            transport.raw('SELECT 1')
+
+        hosts = [
+            call.request.url.split('?')[0] for call in mock.calls
+            if call.request.body == b'SELECT 1'
+        ]
+        self.assertEqual(hosts, [self.urls[1]] * 2)
+
+
+class TimeoutTransportCase(TestCase):
+    url = 'http://localhost:8123/'
+
+    def make_transport(self, **kwargs):
+        return RequestsTransport(self.url, 'default', 'default', '', **kwargs)
+
+    def add_kill_response(self):
+        mock.add(
+            mock.POST, self.url, status=200, body='',
+            match=[matchers.body_matcher(
+                "KILL QUERY WHERE query_id = 'q1'"
+            )]
+        )
+
+    @mock.activate
+    def test_read_timeout(self):
+        self.add_kill_response()
+        mock.add(mock.POST, self.url, body=ReadTimeout('timeout'))
+
+        transport = self.make_transport()
+        with self.assertRaises(DatabaseException) as ex:
+            list(transport.execute(
+                'SELECT 1', params={'query_id': 'q1'}, timeout=1
+            ))
+
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+        self.assertEqual(len(mock.calls), 2)
+        self.assertEqual(
+            mock.calls[1].request.body, b"KILL QUERY WHERE query_id = 'q1'"
+        )
+
+    @mock.activate
+    def test_deadline_passed_while_reading(self):
+        self.add_kill_response()
+        mock.add(
+            mock.POST, self.url, status=200,
+            # Several response chunks.
+            body='x\nUInt8\n' + '1\n' * 100000
+        )
+
+        transport = self.make_transport()
+        rows = transport.execute(
+            'SELECT 1', params={'query_id': 'q1'}, timeout=10
+        )
+        self.assertEqual(next(rows), ['x'])
+        with patch('time.monotonic', return_value=float('inf')):
+            with self.assertRaises(DatabaseException) as ex:
+                list(rows)
+
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+        self.assertEqual(len(mock.calls), 2)
+
+    @mock.activate
+    def test_read_timeout_while_streaming(self):
+        self.add_kill_response()
+
+        class Body(io.RawIOBase):
+            chunks = [b'x\nUInt8\n1\n']
+
+            def readable(self):
+                return True
+
+            def readinto(self, b):
+                if not self.chunks:
+                    raise ReadTimeoutError(None, None, 'Read timed out.')
+                chunk = self.chunks.pop()
+                b[:len(chunk)] = chunk
+                return len(chunk)
+
+        mock.add(
+            mock.POST, self.url, status=200, body=io.BufferedReader(Body())
+        )
+
+        transport = self.make_transport()
+        rows = transport.execute(
+            'SELECT 1', params={'query_id': 'q1'}, timeout=10
+        )
+        with self.assertRaises(DatabaseException) as ex:
+            list(rows)
+
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+        self.assertEqual(len(mock.calls), 2)
+        self.assertEqual(
+            mock.calls[1].request.body, b"KILL QUERY WHERE query_id = 'q1'"
+        )
+
+    @mock.activate
+    def test_insert_timeout(self):
+        self.add_kill_response()
+        mock.add(mock.POST, self.url, body=ReadTimeout('timeout'))
+
+        transport = self.make_transport()
+        with self.assertRaises(DatabaseException) as ex:
+            transport.insert(
+                'INSERT INTO t FORMAT TabSeparated', iter([b'1\n']),
+                params={'query_id': 'q1'}, timeout=1
+            )
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+
+    @mock.activate
+    def test_no_timeout(self):
+        mock.add(mock.POST, self.url, body=ReadTimeout('timeout'))
+
+        transport = self.make_transport()
+        with self.assertRaises(ReadTimeout):
+            list(transport.execute('SELECT 1'))
+        self.assertEqual(len(mock.calls), 1)
+
+    @mock.activate
+    def test_kill_query_on_every_host(self):
+        urls = ['http://h1:8123/', 'http://h2:8123/']
+        for url in urls:
+            mock.add(mock.POST, url, status=200, body='')
+
+        balancer = Balancer([(url, url) for url in urls])
+        transport = self.make_transport(balancer=balancer)
+        transport.kill_query('q1')
+
+        self.assertEqual(
+            [call.request.url.split('?')[0] for call in mock.calls], urls
+        )
+
+
+class ProgressTransportCase(TestCase):
+    url = 'http://localhost:8123/'
+    headers = [
+        ('X-ClickHouse-Progress',
+         '{"read_rows":"10","read_bytes":"80","total_rows_to_read":"20"}'),
+        ('X-ClickHouse-Progress',
+         '{"read_rows":"20","read_bytes":"160","total_rows_to_read":"20"}'),
+        ('X-ClickHouse-Summary',
+         '{"read_rows":"20","read_bytes":"160","written_rows":"0"}')
+    ]
+
+    def make_transport(self, **kwargs):
+        return RequestsTransport(self.url, 'default', 'default', '', **kwargs)
+
+    @mock.activate
+    def test_progress(self):
+        mock.add(
+            mock.POST, self.url, status=200, body='x\nUInt8\n1\n',
+            headers=self.headers
+        )
+
+        progress = []
+        summary = {}
+        transport = self.make_transport()
+        rv = list(transport.execute(
+            'SELECT 1', progress_callback=progress.append,
+            summary_callback=summary.update
+        ))
+
+        self.assertEqual(rv, [['x'], ['UInt8'], [1]])
+        self.assertEqual(progress, [
+            {'read_rows': 10, 'read_bytes': 80, 'total_rows_to_read': 20},
+            {'read_rows': 20, 'read_bytes': 160, 'total_rows_to_read': 20}
+        ])
+        self.assertEqual(
+            summary, {'read_rows': 20, 'read_bytes': 160, 'written_rows': 0}
+        )
+        self.assertIn(
+            'send_progress_in_http_headers=1', mock.calls[0].request.url
+        )
+
+    @mock.activate
+    def test_no_progress_setting_without_callback(self):
+        mock.add(mock.POST, self.url, status=200, body='x\nUInt8\n1\n')
+
+        list(self.make_transport().execute('SELECT 1'))
+        self.assertNotIn(
+            'send_progress_in_http_headers', mock.calls[0].request.url
+        )
+
+    @mock.activate
+    def test_callback_error_kills_query(self):
+        mock.add(
+            mock.POST, self.url, status=200, body='x\nUInt8\n1\n',
+            headers=self.headers
+        )
+        mock.add(
+            mock.POST, self.url, status=200, body='',
+            match=[matchers.body_matcher(
+                "KILL QUERY WHERE query_id = 'q1'"
+            )]
+        )
+
+        def reject(progress):
+            if progress['total_rows_to_read'] > 10:
+                raise ValueError('Query is too heavy')
+
+        transport = self.make_transport()
+        with self.assertRaises(ValueError):
+            list(transport.execute(
+                'SELECT 1', params={'query_id': 'q1'},
+                progress_callback=reject
+            ))
+        self.assertEqual(len(mock.calls), 2)
+
+    @mock.activate
+    def test_insert_summary(self):
+        mock.add(
+            mock.POST, self.url, status=200, body='', headers=[(
+                'X-ClickHouse-Summary',
+                '{"written_rows":"2","written_bytes":"16"}'
+            )]
+        )
+
+        summary = {}
+        self.make_transport().insert(
+            'INSERT INTO t FORMAT TabSeparated', iter([b'1\n2\n']),
+            summary_callback=summary.update
+        )
+        self.assertEqual(summary, {'written_rows': 2, 'written_bytes': 16})
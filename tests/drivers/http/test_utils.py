@@ -1,6 +1,11 @@
 # coding: utf-8
 
-from clickhouse_sqlalchemy.drivers.http.utils import unescape, parse_tsv
+from datetime import date, datetime, timedelta, timezone
+
+from clickhouse_sqlalchemy.drivers.http.utils import (
+    unescape, parse_tsv, format_tsv_value, iter_insert_chunks,
+    make_tsv_row_writer, parse_json_columns
+)
 from tests.testcase import BaseTestCase
 
 
@@ -38,3 +43,65 @@ class HttpUtilsTestCase(BaseTestCase):
             self.fail('"parse_tsv" raised TypeError exception!')
 
         self.assertListEqual(actual, expected)
+
+    def test_format_tsv_value(self):
+        test_values = [
+            None, 'a\tb\n\\', True, 10, date(2017, 1, 2),
+            datetime(2017, 1, 2, 3, 4, 5), datetime(2017, 1, 2, 3, 4, 5, 6),
+            ['a', None]
+        ]
+        expected = [
+            '\\N', 'a\\tb\\n\\\\', '1', '10', '2017-01-02',
+            '2017-01-02 03:04:05', '2017-01-02 03:04:05.000006',
+            "['a', NULL]"
+        ]
+        actual = [format_tsv_value(value) for value in test_values]
+        self.assertListEqual(actual, expected)
+
+    def test_format_tsv_aware_datetime(self):
+        tz = timezone(timedelta(hours=3))
+        self.assertEqual(
+            format_tsv_value(datetime(2017, 1, 2, 3, 4, 5, tzinfo=tz)),
+            '1483315445'
+        )
+        self.assertEqual(
+            format_tsv_value(datetime(2017, 1, 2, 3, 4, 5, 6, tzinfo=tz)),
+            '1483315445.000006'
+        )
+
+    def test_format_tsv_bytes(self):
+        self.assertEqual(format_tsv_value(b'ab\tc\\'), 'ab\\tc\\\\')
+
+        out = bytearray()
+        make_tsv_row_writer()([b'\xff\n', 'x'], out)
+        self.assertEqual(bytes(out), b'\xff\\n\tx\n')
+
+    def test_iter_insert_chunks(self):
+        rows = ([x, 'a'] for x in range(10))
+        chunks = list(iter_insert_chunks(rows, make_tsv_row_writer(), 8))
+
+        self.assertEqual(b''.join(chunks).count(b'\n'), 10)
+        self.assertTrue(all(len(x) >= 8 for x in chunks[:-1]))
+        self.assertEqual(chunks[0], b'0\ta\n1\ta\n')
+
+    def test_parse_json_columns(self):
+        body = (
+            '{"meta": [{"name": "x", "type": "UInt64"}, '
+            '{"name": "s", "type": "Nullable(Date)"}], '
+            '"data": {"x": [1, 23, 456], '
+            '"s": ["2020-01-01", null, "\\u0444"]}, '
+            '"rows": 3}'
+        ).encode('utf-8')
+        # Values and numbers are split between chunks.
+        chunks = [body[i:i + 1] for i in range(len(body))]
+
+        def get_converter(type_):
+            return str.upper if type_ == 'Nullable(Date)' else None
+
+        names, types, columns = parse_json_columns(chunks, get_converter)
+        self.assertEqual(names, ['x', 's'])
+        self.assertEqual(types, ['UInt64', 'Nullable(Date)'])
+        self.assertEqual(columns, [[1, 23, 456], ['2020-01-01', None, 'Ф']])
+
+    def test_parse_json_columns_empty(self):
+        self.assertEqual(list(parse_json_columns([b''], None)), [])
@@ -1,8 +1,12 @@
+from unittest import TestCase
 from urllib.parse import quote
 
 from sqlalchemy.engine.url import URL, make_url
 
+from clickhouse_sqlalchemy.drivers.balancer import Balancer
 from clickhouse_sqlalchemy.drivers.native.base import ClickHouseDialect_native
+from clickhouse_sqlalchemy.drivers.native.connector import Connection
+from clickhouse_sqlalchemy.exceptions import DatabaseException
 from tests.testcase import BaseTestCase
 
 
@@ -70,3 +74,55 @@ class TestConnectArgs(BaseTestCase):
         self.assertEqual(
             str(connect_args[0][0]), 'clickhouse://' + quote_part
         )
+
+    def test_pool_warmup(self):
+        url = make_url('clickhouse+native://localhost/default?pool_warmup=4')
+        connect_args = self.dialect.create_connect_args(url)
+        self.assertEqual(
+            str(connect_args[0][0]), 'clickhouse://localhost/default'
+        )
+        self.assertEqual(self.dialect.pool_warmup, 4)
+
+    def test_hosts(self):
+        url = make_url(
+            'clickhouse+native://localhost/default'
+            '?hosts=h2:9001,h3&balancing=replica_lag&secure=True'
+        )
+        args, kwargs = self.dialect.create_connect_args(url)
+        self.assertEqual(
+            str(args[0]), 'clickhouse://localhost/default?secure=True'
+        )
+        balancer = kwargs['balancer']
+        self.assertEqual(
+            [host.address for host in balancer.hosts],
+            [
+                'clickhouse://localhost/default?secure=True',
+                'clickhouse://h2:9001/default?secure=True',
+                'clickhouse://h3/default?secure=True'
+            ]
+        )
+        self.assertEqual(balancer.strategy, 'replica_lag')
+
+
+class BalancerConnectionTestCase(TestCase):
+    # Nothing listens on these ports.
+    urls = [
+        'clickhouse://localhost:1/default', 'clickhouse://localhost:2/default'
+    ]
+
+    def test_switch_host_on_network_error(self):
+        balancer = Balancer([(url, url) for url in self.urls])
+        conn = Connection(self.urls[0], balancer=balancer)
+        first, second = balancer.hosts
+        self.assertIs(conn.host, first)
+
+        with self.assertRaises(DatabaseException):
+            conn.cursor().execute('SELECT 1')
+
+        self.assertIs(conn.host, second)
+        self.assertGreater(first.failed_until, 0)
+        self.assertEqual([first.outstanding, second.outstanding], [0, 1])
+
+        conn.close()
+        conn.close()
+        self.assertEqual([first.outstanding, second.outstanding], [0, 0])
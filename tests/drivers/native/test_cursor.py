@@ -1,7 +1,16 @@
+import threading
 import uuid
+from unittest import TestCase
+from unittest.mock import Mock, patch
 
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import create_engine, text
 
+from clickhouse_sqlalchemy.drivers.native.connector import Cursor
+from clickhouse_sqlalchemy.exceptions import (
+    DatabaseException, QueryTimeoutError
+)
+from tests.config import native_uri
 from tests.testcase import NativeSessionTestCase
 from tests.util import require_server_version
 
@@ -60,3 +69,230 @@ class CursorTestCase(NativeSessionTestCase):
             ), execution_options={'query_id': query_id}
         )
         self.assertEqual(rv.fetchall()[0][0], query_id)
+
+    def test_connection_survives_cursor_close(self):
+        raw = self.session.bind.raw_connection()
+        client = raw.driver_connection.transport
+
+        cur = raw.cursor()
+        cur.execute('SELECT 1')
+        cur.fetchall()
+        cur.close()
+        self.assertTrue(client.connection.connected)
+
+        raw.driver_connection.close()
+        self.assertFalse(client.connection.connected)
+        raw.invalidate()
+
+    def test_partially_consumed_stream(self):
+        rv = self.session.execute(
+            text('SELECT number FROM system.numbers LIMIT 1000000'),
+            execution_options={'stream_results': True, 'max_row_buffer': 10}
+        )
+        self.assertEqual(len(rv.fetchmany(5)), 5)
+        rv.close()
+
+        rv = self.session.execute(text('SELECT 1'))
+        self.assertEqual(rv.scalar(), 1)
+
+    def test_abandoned_stream(self):
+        raw = self.session.bind.raw_connection()
+
+        def consume_some():
+            cur = raw.cursor()
+            cur.execute(
+                'SELECT number FROM system.numbers',
+                context=Context(stream_results=True, max_row_buffer=10)
+            )
+            for row in iter(cur.fetchone, None):
+                if row[0] == 5:
+                    break
+            # Cursor is garbage collected without closing.
+
+        consume_some()
+
+        cur = raw.cursor()
+        cur.execute('SELECT 1')
+        self.assertEqual(cur.fetchall(), [(1, )])
+        raw.close()
+
+    def test_interrupted_stream_killed(self):
+        raw = self.session.bind.raw_connection()
+        cur = raw.cursor()
+        cur.execute(
+            'SELECT number FROM system.numbers_mt',
+            context=Context(stream_results=True, kill_on_close=True)
+        )
+        cur.fetchmany(5)
+        # Reading is interrupted, e.g. with KeyboardInterrupt.
+        raw.dbapi_connection.transport.disconnect()
+
+        with patch.object(raw.dbapi_connection, 'kill_query') as kill_query:
+            cur.close()
+        kill_query.assert_called_once_with(cur._query_id)
+        raw.close()
+
+    def test_ping(self):
+        raw = self.session.bind.raw_connection()
+        self.assertTrue(raw.dbapi_connection.ping())
+
+        # Closed socket is reopened by ping.
+        raw.dbapi_connection.transport.disconnect()
+        self.assertTrue(raw.dbapi_connection.ping())
+        self.assertTrue(raw.dbapi_connection.transport.connection.connected)
+        raw.close()
+
+    def test_pool_warmup(self):
+        engine = create_engine(
+            native_uri + '?pool_warmup=3', pool_size=2, pool_pre_ping=True
+        )
+        try:
+            self.assertEqual(engine.pool.checkedin(), 2)
+            self.assertIsNotNone(engine.dialect.server_version_info)
+
+            with engine.connect() as conn:
+                rv = conn.execute(text('SELECT 1')).scalar()
+                self.assertEqual(rv, 1)
+        finally:
+            engine.dispose()
+
+    def test_timeout(self):
+        with self.assertRaises(DatabaseException) as ex:
+            self.session.execute(
+                text(
+                    'SELECT count() FROM system.numbers_mt '
+                    'SETTINGS max_execution_time = 30'
+                ),
+                execution_options={'timeout': 0.5}
+            )
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+
+        rv = self.session.execute(text('SELECT 1')).scalar()
+        self.assertEqual(rv, 1)
+
+    def test_timeout_stream(self):
+        rv = self.session.execute(
+            text('SELECT number FROM system.numbers_mt'),
+            execution_options={'timeout': 0.5, 'stream_results': True}
+        )
+        with self.assertRaises(DatabaseException) as ex:
+            for _ in rv:
+                pass
+        self.assertIsInstance(ex.exception.orig, QueryTimeoutError)
+
+    def test_cancel_from_other_thread(self):
+        raw = self.session.bind.raw_connection()
+        cur = raw.cursor()
+
+        timer = threading.Timer(0.5, cur.cancel)
+        timer.start()
+        with self.assertRaises(DatabaseException) as ex:
+            cur.execute(
+                'SELECT count() FROM system.numbers_mt '
+                'SETTINGS max_execution_time = 30'
+            )
+        timer.join()
+        self.assertIn('QUERY_WAS_CANCELLED', str(ex.exception))
+        raw.close()
+
+    def test_progress_callback(self):
+        progress = []
+        rv = self.session.execute(
+            text(
+                'SELECT count() FROM numbers_mt(10000000) '
+                'SETTINGS max_block_size = 65536'
+            ),
+            execution_options={'progress_callback': progress.append}
+        )
+        self.assertEqual(rv.scalar(), 10000000)
+
+        self.assertTrue(progress)
+        self.assertEqual(progress[-1]['read_rows'], 10000000)
+        self.assertEqual(progress[-1]['total_rows_to_read'], 10000000)
+
+        summary = rv.context.cursor.summary
+        self.assertEqual(summary['read_rows'], 10000000)
+        self.assertEqual(summary['result_rows'], 1)
+
+    def test_progress_callback_rejects_query(self):
+        def reject(progress):
+            if progress['total_rows_to_read'] > 1000:
+                raise ValueError('Query is too heavy')
+
+        with self.assertRaises(ValueError):
+            self.session.execute(
+                text('SELECT count() FROM numbers_mt(10000000000)'),
+                execution_options={'progress_callback': reject}
+            )
+
+        rv = self.session.execute(text('SELECT 1')).scalar()
+        self.assertEqual(rv, 1)
+
+    def test_fetch_columns(self):
+        rv = self.session.execute(
+            text('SELECT number AS x, toString(number) AS y FROM numbers(3)'),
+            execution_options={'columnar': True}
+        )
+        self.assertEqual(
+            rv.cursor.fetch_columns(),
+            {'x': (0, 1, 2), 'y': ('0', '1', '2')}
+        )
+
+    def test_fetch_columns_rows_fallback(self):
+        rv = self.session.execute(
+            text('SELECT number AS x FROM numbers(3)'),
+            execution_options={'columnar': True}
+        )
+        self.assertEqual(rv.fetchall(), [(0, ), (1, ), (2, )])
+
+    def test_fetch_columns_use_numpy(self):
+        rv = self.session.execute(
+            text('SELECT number AS x FROM numbers(100000)'),
+            execution_options={'use_numpy': True}
+        )
+        columns = rv.cursor.fetch_columns()
+        self.assertIsInstance(columns['x'], np.ndarray)
+        self.assertEqual(columns['x'].sum(), 4999950000)
+
+        # Next query on the same connection is not affected.
+        rv = self.session.execute(text('SELECT 1')).fetchall()
+        self.assertEqual(rv, [(1, )])
+
+
+class Context(object):
+    dialect = None
+
+    def __init__(self, **execution_options):
+        self.execution_options = execution_options
+
+
+class WatchdogTestCase(TestCase):
+    def make_cursor(self, is_query_executing):
+        connection = Mock()
+        connection.transport.connection.is_query_executing = \
+            is_query_executing
+        cursor = Cursor(connection)
+        cursor._timeout = 10
+        cursor._query_id = 'q1'
+        cursor._watchdog = Mock()
+        return cursor
+
+    def test_timeout(self):
+        cursor = self.make_cursor(True)
+        cursor._on_timeout()
+
+        self.assertTrue(cursor._timed_out)
+        cursor._connection.abort.assert_called_once_with()
+        cursor._connection.kill_query.assert_called_once_with('q1')
+
+    def test_timeout_after_query_finished(self):
+        # Watchdog fires before cursor stops it.
+        cursor = self.make_cursor(False)
+        cursor._on_timeout()
+
+        self.assertFalse(cursor._timed_out)
+        cursor._connection.abort.assert_not_called()
+        cursor._connection.kill_query.assert_not_called()
+
+        cursor._stop_watchdog()
+        cursor._connection.transport.disconnect.assert_not_called()
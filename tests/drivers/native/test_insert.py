@@ -1,6 +1,16 @@
-from sqlalchemy import Column, func, text
+import enum
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import (
+    Column, ColumnDefault, MetaData, create_engine, func, select, text
+)
+from sqlalchemy.exc import StatementError
 
 from clickhouse_sqlalchemy import engines, types, Table
+from clickhouse_sqlalchemy.drivers.native.base import ClickHouseDialect_native
+from clickhouse_sqlalchemy.drivers.native.connector import Connection
 from clickhouse_sqlalchemy.exceptions import DatabaseException
 from tests.testcase import NativeSessionTestCase
 
@@ -48,3 +58,115 @@ class NativeInsertTestCase(NativeSessionTestCase):
             'Repeat query with types_check=True for detailed info',
             str(ex.exception.orig)
         )
+
+    def test_columnar_insert(self):
+        class TestEnum(enum.Enum):
+            foo = 1
+            bar = 2
+
+        table = Table(
+            'test', self.metadata(),
+            Column('x', types.Int32, primary_key=True),
+            Column('e', types.Enum8(TestEnum)),
+            Column('y', types.Array(types.Int32)),
+            engines.Memory()
+        )
+        table.drop(bind=self.session.bind, if_exists=True)
+        table.create(bind=self.session.bind)
+
+        rv = self.session.execute(
+            table.insert().execution_options(columnar=True),
+            {
+                'x': [1, 2],
+                'e': [TestEnum.foo, 'bar'],
+                'y': [[1], [2, 3]]
+            }
+        )
+        self.assertEqual(rv.rowcount, 2)
+        self.assertEqual(
+            self.session.execute(select(table).order_by(table.c.x)).fetchall(),
+            [(1, TestEnum.foo, [1]), (2, TestEnum.bar, [2, 3])]
+        )
+
+    def test_numpy_insert(self):
+        table = Table(
+            'test', self.metadata(),
+            Column('x', types.UInt64, primary_key=True),
+            Column('y', types.Float64),
+            engines.Memory()
+        )
+        table.drop(bind=self.session.bind, if_exists=True)
+        table.create(bind=self.session.bind)
+
+        self.session.execute(
+            table.insert().execution_options(use_numpy=True),
+            {
+                'y': np.arange(10000, dtype='float64') / 2,
+                'x': np.arange(10000, dtype='uint64')
+            }
+        )
+        rv = self.session.execute(
+            select(func.sum(table.c.x), func.sum(table.c.y))
+        ).fetchall()
+        self.assertEqual(rv, [(49995000, 24997500.0)])
+
+
+class ColumnarInsertParametersTestCase(TestCase):
+    def setUp(self):
+        patches = [
+            patch.object(Connection, '_create_transport'),
+            patch.object(ClickHouseDialect_native, 'initialize'),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.engine = create_engine('clickhouse+native://localhost/default')
+        self.table = Table(
+            'test', MetaData(),
+            Column('x', types.Int32, primary_key=True),
+            Column('y', types.String, default='d'),
+            engines.Memory()
+        )
+
+    def execute(self, parameters, **execution_options):
+        with self.engine.connect() as conn:
+            transport = conn.connection.dbapi_connection.transport
+            transport.execute.return_value = 2
+            conn.execute(
+                self.table.insert().execution_options(**execution_options),
+                parameters
+            )
+            return transport.execute.call_args
+
+    def test_scalar_default(self):
+        args, kwargs = self.execute({'x': np.array([1, 2])}, columnar=True)
+
+        self.assertTrue(kwargs['columnar'])
+        x, y = kwargs['params']
+        self.assertEqual(list(x), [1, 2])
+        self.assertEqual(y, ['d', 'd'])
+
+    def test_callable_default(self):
+        self.table.c.y.default = ColumnDefault(lambda: 'd')
+
+        with self.assertRaises(StatementError) as ex:
+            self.execute({'x': [1, 2]}, columnar=True)
+
+        self.assertIn("'y'", str(ex.exception))
+
+    def test_rows_with_columnar_option(self):
+        args, kwargs = self.execute(
+            [{'x': 1, 'y': 'a'}, {'x': 2, 'y': 'b'}], columnar=True
+        )
+
+        self.assertNotIn('columnar', kwargs)
+        self.assertEqual(
+            kwargs['params'], [{'x': 1, 'y': 'a'}, {'x': 2, 'y': 'b'}]
+        )
+
+    def test_single_row_with_columnar_option(self):
+        args, kwargs = self.execute({'x': 1, 'y': 'a'}, use_numpy=True)
+
+        self.assertNotIn('columnar', kwargs)
+        self.assertEqual(kwargs['params'], [{'x': 1, 'y': 'a'}])
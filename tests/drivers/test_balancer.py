@@ -0,0 +1,112 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from clickhouse_sqlalchemy.drivers.balancer import (
+    Balancer, parse_hosts, pop_balancer_options
+)
+
+
+class ParseHostsTestCase(TestCase):
+    def test_parse_hosts(self):
+        self.assertEqual(
+            parse_hosts('h1, h2:8124,[::1]:8125,[::2]', 8123),
+            [('h1', 8123), ('h2', 8124), ('::1', 8125), ('::2', 8123)]
+        )
+
+    def test_pop_options(self):
+        query = {'balancing': 'replica_lag', 'host_cooldown': '5', 'a': '1'}
+        self.assertEqual(
+            pop_balancer_options(query),
+            {'strategy': 'replica_lag', 'cooldown': '5'}
+        )
+        self.assertEqual(query, {'a': '1'})
+
+
+class BalancerTestCase(TestCase):
+    def make_balancer(self, **kwargs):
+        return Balancer([(x, x) for x in ('h1', 'h2', 'h3')], **kwargs)
+
+    def names(self, balancer, count):
+        rv = []
+        for _ in range(count):
+            host = balancer.acquire()
+            balancer.release(host)
+            rv.append(host.name)
+        return rv
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            self.make_balancer(strategy='random')
+
+    def test_round_robin(self):
+        balancer = self.make_balancer()
+        self.assertEqual(
+            self.names(balancer, 4), ['h1', 'h2', 'h3', 'h1']
+        )
+
+    def test_least_outstanding(self):
+        balancer = self.make_balancer(strategy='least_outstanding')
+        hosts = [balancer.acquire() for _ in range(3)]
+        self.assertEqual({x.name for x in hosts}, {'h1', 'h2', 'h3'})
+
+        balancer.release(hosts[1])
+        self.assertIs(balancer.acquire(), hosts[1])
+
+    def test_ejection(self):
+        balancer = self.make_balancer(cooldown=30)
+        host = balancer.acquire()
+        balancer.release(host, failed=True)
+
+        names = self.names(balancer, 4)
+        self.assertEqual(sorted(names), ['h2', 'h2', 'h3', 'h3'])
+
+        with patch('time.monotonic', return_value=host.failed_until):
+            self.assertIn('h1', self.names(balancer, 3))
+
+    def test_all_hosts_ejected(self):
+        balancer = self.make_balancer(cooldown=30)
+        for host in balancer.hosts:
+            balancer.eject(host)
+
+        self.assertEqual(balancer.acquire().name, 'h1')
+
+    def test_replica_lag(self):
+        balancer = self.make_balancer(
+            strategy='replica_lag', max_replica_delay=60,
+            replica_delay_interval=100
+        )
+        delays = {'h1': 0, 'h2': 500, 'h3': 10}
+        checked = []
+
+        def check_delay(address):
+            checked.append(address)
+            return delays[address]
+
+        names = []
+        for _ in range(4):
+            host = balancer.acquire(check_delay)
+            balancer.release(host)
+            names.append(host.name)
+
+        self.assertNotIn('h2', names)
+        # Delays are checked once per interval.
+        self.assertEqual(checked, ['h1', 'h2', 'h3'])
+
+    def test_replica_lag_all_lagging(self):
+        balancer = self.make_balancer(
+            strategy='replica_lag', max_replica_delay=60
+        )
+        delays = {'h1': 500, 'h2': 100, 'h3': 300}
+        host = balancer.acquire(delays.get)
+        self.assertEqual(host.name, 'h2')
+
+    def test_replica_lag_check_failed(self):
+        balancer = self.make_balancer(strategy='replica_lag')
+
+        def check_delay(address):
+            if address == 'h1':
+                raise ConnectionError()
+            return 0
+
+        self.assertEqual(balancer.acquire(check_delay).name, 'h2')
+        self.assertGreater(balancer.hosts[0].failed_until, 0)
@@ -1,3 +1,4 @@
+import pandas as pd
 from sqlalchemy import Column, create_engine, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine
 
@@ -141,6 +142,48 @@ class ClickHouseDialectTestCase(BaseTestCase):
 
         self.assertEqual(len(rv), 0)
 
+    def test_read_dataframe(self):
+        df = self.dialect.read_dataframe(
+            self.connection,
+            text(
+                "SELECT number AS x, "
+                "toLowCardinality(toString(number % 2)) AS s, "
+                "toDateTime64('2020-01-01 00:00:00', 3) AS t "
+                "FROM numbers(:n)"
+            ),
+            {'n': 4}
+        )
+
+        self.assertEqual(list(df.columns), ['x', 's', 't'])
+        self.assertEqual(df['x'].dtype, 'uint64')
+        self.assertEqual(df['s'].dtype, 'category')
+        self.assertEqual(df['t'].dtype, 'datetime64[ns]')
+        self.assertEqual(list(df['x']), [0, 1, 2, 3])
+
+    def test_insert_dataframe(self):
+        table = Table(
+            'test_dataframe', self.metadata(),
+            Column('x', types.Int32, primary_key=True),
+            Column('s', types.LowCardinality(types.String)),
+            Column('t', types.DateTime64(3)),
+            engines.Memory()
+        )
+        df = pd.DataFrame({
+            'x': pd.Series([1, 2, 3], dtype='int32'),
+            's': pd.Categorical(['a', 'b', 'a']),
+            't': pd.to_datetime(['2020-01-01'] * 3)
+        })
+
+        with self.create_table(table):
+            self.dialect.insert_dataframe(self.connection, table, df)
+            rv = self.dialect.read_dataframe(
+                self.connection, table.select().order_by(table.c.x)
+            )
+
+        self.assertEqual(list(rv['x']), [1, 2, 3])
+        self.assertEqual(list(rv['s']), ['a', 'b', 'a'])
+        self.assertEqual(rv['t'][0], pd.Timestamp('2020-01-01'))
+
 
 class ClickHouseAsynchDialectTestCase(BaseAsynchTestCase):
 
@@ -195,6 +238,21 @@ class ClickHouseAsynchDialectTestCase(BaseAsynchTestCase):
             )
         )
 
+    async def test_insert_and_read_dataframe(self):
+        await self.run_sync(self.test_metadata.create_all)
+        df = pd.DataFrame({'x': pd.Series([1, 2, 3], dtype='int32')})
+
+        def _run(conn):
+            dialect = conn.dialect
+            dialect.insert_dataframe(conn, self.table, df)
+            return dialect.read_dataframe(
+                conn, self.table.select().order_by(self.table.c.x)
+            )
+
+        rv = await self.run_sync(_run)
+        self.assertEqual(list(rv['x']), [1, 2, 3])
+        self.assertEqual(rv['x'].dtype, 'int32')
+
     async def test_get_table_names(self):
         await self.run_sync(self.test_metadata.create_all)
 
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from unittest import TestCase
+
+import pandas as pd
+
+from clickhouse_sqlalchemy.drivers.base import ClickHouseDialect
+from clickhouse_sqlalchemy.drivers.dataframe import make_dataframe
+
+
+class MakeDataFrameTestCase(TestCase):
+    dialect = ClickHouseDialect()
+
+    def make_dataframe(self, specs, columns):
+        names = ['c{}'.format(i) for i in range(len(specs))]
+        return make_dataframe(self.dialect, names, specs, columns)
+
+    def test_numbers(self):
+        df = self.make_dataframe(
+            ['UInt8', 'Int64', 'Float32', 'Bool'],
+            [[1, 2], [-1, 2 ** 62], [0.5, 1.5], [True, False]]
+        )
+        self.assertEqual(
+            list(df.dtypes), ['uint8', 'int64', 'float32', 'bool']
+        )
+
+    def test_nullable(self):
+        df = self.make_dataframe(
+            ['Nullable(Int32)', 'Nullable(Float64)', 'Nullable(String)'],
+            [[1, None], [0.5, None], ['a', None]]
+        )
+        self.assertEqual(df['c0'].dtype, 'Int32')
+        self.assertTrue(df['c0'].isna()[1])
+        self.assertEqual(df['c1'].dtype, 'float64')
+        self.assertEqual(df['c2'].dtype, object)
+        self.assertIsNone(df['c2'][1])
+
+    def test_low_cardinality(self):
+        df = self.make_dataframe(
+            ['LowCardinality(String)'], [['a', 'b', 'a']]
+        )
+        self.assertEqual(df['c0'].dtype, 'category')
+        self.assertEqual(list(df['c0'].cat.categories), ['a', 'b'])
+
+    def test_datetime(self):
+        df = self.make_dataframe(
+            ['DateTime64(3)', 'Date', "DateTime('Europe/Moscow')"],
+            [
+                [datetime(2020, 1, 1, 0, 0, 0, 123000)],
+                [date(2020, 1, 1)],
+                [datetime(2020, 1, 1)]
+            ]
+        )
+        self.assertEqual(df['c0'].dtype, 'datetime64[ns]')
+        self.assertEqual(df['c0'][0], pd.Timestamp('2020-01-01 00:00:00.123'))
+        self.assertEqual(df['c1'].dtype, 'datetime64[ns]')
+        self.assertEqual(str(df['c2'].dt.tz), 'Europe/Moscow')
+
+    def test_other_types(self):
+        df = self.make_dataframe(
+            ['Array(UInt8)', 'Decimal(10, 2)'], [[[1, 2], []], [1, 2]]
+        )
+        self.assertEqual(df['c0'][0], [1, 2])
+        self.assertEqual(df['c1'].dtype, object)
+
+    def test_empty(self):
+        df = self.make_dataframe(['UInt8', 'DateTime'], [[], []])
+        self.assertEqual(len(df), 0)
+        self.assertEqual(list(df.columns), ['c0', 'c1'])
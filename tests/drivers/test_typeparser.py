@@ -0,0 +1,98 @@
+from unittest import TestCase
+
+from clickhouse_sqlalchemy import types
+from clickhouse_sqlalchemy.drivers.http.base import ClickHouseDialect_http
+from clickhouse_sqlalchemy.drivers.typeparser import TypeSpec, parse_type
+
+
+class ParseTypeTestCase(TestCase):
+    def test_simple(self):
+        self.assertEqual(parse_type('UInt8'), TypeSpec('UInt8', (), 'UInt8'))
+        self.assertEqual(
+            parse_type(' String '), TypeSpec('String', (), 'String')
+        )
+
+    def test_nested(self):
+        spec = parse_type('Array(Tuple(UInt8, Map(String, Decimal(18, 2))))')
+
+        self.assertEqual(spec.name, 'Array')
+        tuple_spec = spec.arguments[0]
+        self.assertEqual(tuple_spec.name, 'Tuple')
+        self.assertEqual(
+            [x.text for x in tuple_spec.types],
+            ['UInt8', 'Map(String, Decimal(18, 2))']
+        )
+        decimal = tuple_spec.types[1].arguments[1]
+        self.assertEqual(decimal.arguments, (18, 2))
+
+    def test_named_tuple(self):
+        spec = parse_type('Tuple(a Nullable(String), `b c` UInt8)')
+
+        self.assertEqual(spec.arguments[0][0], 'a')
+        self.assertEqual(spec.arguments[1][0], 'b c')
+        self.assertEqual(
+            [x.text for x in spec.types], ['Nullable(String)', 'UInt8']
+        )
+
+    def test_enum(self):
+        spec = parse_type("Enum8('a, b' = 1, 'it\\'s (x)' = -2)")
+
+        self.assertEqual(spec.arguments, (('a, b', 1), ("it's (x)", -2)))
+
+    def test_literals(self):
+        self.assertEqual(
+            parse_type("DateTime64(3, 'Europe/Moscow')").arguments,
+            (3, 'Europe/Moscow')
+        )
+        self.assertEqual(parse_type("Object('json')").arguments, ('json', ))
+
+    def test_aggregate_function(self):
+        spec = parse_type(
+            "AggregateFunction(sumIf(total, status = 'accepted'), Float32)"
+        )
+
+        self.assertEqual(
+            spec.arguments[0].text, "sumIf(total, status = 'accepted')"
+        )
+        self.assertEqual(spec.arguments[0].arguments[1], "status = 'accepted'")
+        self.assertEqual(spec.arguments[1].text, 'Float32')
+
+    def test_cached(self):
+        self.assertIs(parse_type('Array(UInt8)'), parse_type('Array(UInt8)'))
+
+    def test_invalid(self):
+        for spec in ('Array(', 'Array(UInt8))', 'UInt8 ?'):
+            with self.assertRaises(ValueError):
+                parse_type(spec)
+
+
+class GetColumnTypeTestCase(TestCase):
+    dialect = ClickHouseDialect_http()
+
+    def test_nested_tuple(self):
+        coltype = self.dialect._get_column_type(
+            'x', 'Array(Tuple(a Array(Tuple(UInt8, String)), b Decimal(9, 2)))'
+        )
+
+        self.assertIsInstance(coltype, types.Array)
+        tuple_type = coltype.item_type
+        self.assertIsInstance(tuple_type, types.Tuple)
+        self.assertEqual(len(tuple_type.nested_types), 2)
+        self.assertIsInstance(tuple_type.nested_types[0], types.Array)
+        self.assertIsInstance(tuple_type.nested_types[1], types.Decimal)
+
+    def test_decimal_bits(self):
+        coltype = self.dialect._get_column_type('x', 'Decimal64(4)')
+
+        self.assertIsInstance(coltype, types.Decimal)
+        self.assertEqual((coltype.precision, coltype.scale), (18, 4))
+
+    def test_enum_class_reused(self):
+        spec = "Enum8('a' = 1, 'b' = 2)"
+        first = self.dialect._get_column_type('x', spec)()
+        second = self.dialect._get_column_type('x', spec)()
+
+        self.assertIs(first.enum_class, second.enum_class)
+        self.assertEqual(
+            {o.name: o.value for o in first.enum_class}, {'a': 1, 'b': 2}
+        )
@@ -1,6 +1,8 @@
 from unittest import TestCase
 
-from clickhouse_sqlalchemy.drivers.util import get_inner_spec, parse_arguments
+from clickhouse_sqlalchemy.drivers.util import (
+    get_inner_spec, parse_arguments, RowBuffer
+)
 
 
 class GetInnerSpecTestCase(TestCase):
@@ -48,3 +50,43 @@ class ParseArgumentsTestCase(TestCase):
             parse_arguments("sumIf(total, status = 'accepted'), Float32"),
             ("sumIf(total, status = 'accepted')", "Float32")
         )
+
+
+class RowBufferTestCase(TestCase):
+    def test_fetch(self):
+        buffer = RowBuffer([(x, ) for x in range(10)])
+
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.fetchone(), (0, ))
+        self.assertEqual(buffer.fetchmany(3), [(1, ), (2, ), (3, )])
+        self.assertEqual(len(buffer), 6)
+        self.assertEqual(list(buffer), [(x, ) for x in range(4, 10)])
+        self.assertFalse(buffer)
+        self.assertIsNone(buffer.fetchone())
+        self.assertEqual(buffer.fetchmany(3), [])
+
+    def test_fetchall(self):
+        buffer = RowBuffer([(x, ) for x in range(5)])
+        buffer.fetchmany(2)
+
+        self.assertEqual(buffer.fetchall(), [(2, ), (3, ), (4, )])
+        self.assertEqual(buffer.fetchall(), [])
+
+    def test_consumed_rows_are_dropped(self):
+        buffer = RowBuffer([(x, ) for x in range(10000)])
+
+        rows = []
+        for _ in range(6):
+            rows.extend(buffer.fetchmany(1000))
+
+        self.assertEqual(len(buffer._rows), 4000)
+        rows.extend(buffer.fetchall())
+        self.assertEqual(rows, [(x, ) for x in range(10000)])
+
+    def test_extend(self):
+        buffer = RowBuffer([(0, ), (1, )])
+        buffer.fetchone()
+        buffer.extend([(2, ), (3, )])
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.fetchall(), [(1, ), (2, ), (3, )])
@@ -1,11 +1,13 @@
+import shutil
+import tempfile
 from contextlib import contextmanager
 from unittest.mock import Mock
 
-from sqlalchemy import Column, text, create_engine, inspect
+from sqlalchemy import Column, MetaData, event, text, create_engine, inspect
 
 from clickhouse_sqlalchemy import types, engines, Table, make_session
 from tests.testcase import BaseTestCase
-from tests.util import with_native_and_http_sessions
+from tests.util import require_server_version, with_native_and_http_sessions
 
 
 @with_native_and_http_sessions
@@ -479,3 +481,142 @@ class EngineClassReflectionTestCase(BaseTestCase):
             primary_key=['x'],
             ttl=['x'],
         )
+
+    @require_server_version(21, 6)
+    def test_reflect_metadata_batched(self):
+        metadata = self.metadata()
+        tables = [
+            Table(
+                'test_reflect_{}'.format(i), metadata,
+                Column('x', types.UInt32, primary_key=True),
+                Column('y', types.String, comment='y column'),
+                engines.MergeTree(order_by='x'),
+                comment='table {}'.format(i)
+            )
+            for i in range(5)
+        ]
+        metadata.create_all(self.session.bind)
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = self.session.bind
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            reflected = MetaData()
+            reflected.reflect(bind=self.session.connection())
+        finally:
+            event.remove(
+                engine, 'before_cursor_execute', before_cursor_execute
+            )
+            metadata.drop_all(self.session.bind)
+
+        # Table names, columns and tables info, not a query per table.
+        self.assertLessEqual(len(statements), 3)
+
+        for table in tables:
+            rv = reflected.tables[table.name]
+            self.assertEqual([c.name for c in rv.columns], ['x', 'y'])
+            self.assertEqual(rv.c.y.comment, 'y column')
+            self.assertEqual(rv.comment, table.comment)
+            self.assertEqual(
+                [c.name for c in rv.primary_key.columns], ['x']
+            )
+            self.assertIsInstance(rv.engine, engines.MergeTree)
+
+    def test_reflect_metadata_columns_order(self):
+        metadata = self.metadata()
+        table = Table(
+            'test_reflect', metadata,
+            *[Column(name, types.UInt32) for name in 'zyxabc'],
+            engines.Memory()
+        )
+
+        with self.create_table(table):
+            reflected = MetaData()
+            reflected.reflect(
+                bind=self.session.connection(), only=[table.name]
+            )
+
+        self.assertEqual(
+            [c.name for c in reflected.tables[table.name].columns],
+            list('zyxabc')
+        )
+
+    def make_cached_engine(self):
+        engine = self.session.connection().engine
+        url = engine.url.render_as_string(hide_password=False)
+        prefix = 'clickhouse+{}://'.format(engine.driver)
+        if not url.startswith(prefix):
+            url = prefix + url.split('://')[1]
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        return create_engine(url + '?reflection_cache=' + cache_dir)
+
+    @require_server_version(21, 6)
+    def test_reflection_cache(self):
+        engine = self.make_cached_engine()
+
+        metadata = self.metadata()
+        table = Table(
+            'test_reflect', metadata,
+            Column('x', types.UInt32, primary_key=True),
+            engines.MergeTree(order_by='x')
+        )
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        def reflect():
+            statements.clear()
+            reflected = MetaData()
+            with engine.connect() as conn:
+                reflected.reflect(bind=conn, only=[table.name])
+            return reflected.tables[table.name]
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        with self.create_table(table):
+            reflect()
+            self.assertTrue(any('system.columns' in x for x in statements))
+
+            # Unchanged table is taken from cache.
+            rv = reflect()
+            self.assertFalse(any('system.columns' in x for x in statements))
+            self.assertEqual([c.name for c in rv.columns], ['x'])
+            self.assertIsInstance(rv.engine, engines.MergeTree)
+
+            # Change within the same second is detected by CREATE query.
+            self.session.execute(
+                text('ALTER TABLE test_reflect ADD COLUMN y String')
+            )
+            rv = reflect()
+            self.assertEqual([c.name for c in rv.columns], ['x', 'y'])
+
+    @require_server_version(21, 6)
+    def test_reflection_cache_lazy_database(self):
+        engine = self.make_cached_engine()
+        self.session.execute(
+            text('CREATE DATABASE IF NOT EXISTS test_lazy ENGINE = Lazy(10)')
+        )
+        self.addCleanup(
+            self.session.execute, text('DROP DATABASE IF EXISTS test_lazy')
+        )
+        self.session.execute(
+            text('CREATE TABLE test_lazy.t (x UInt32) ENGINE = Log')
+        )
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        for _ in range(2):
+            statements.clear()
+            with engine.connect() as conn:
+                MetaData().reflect(bind=conn, schema='test_lazy')
+            # Modification time of Lazy database tables is unreliable.
+            self.assertTrue(any('system.columns' in x for x in statements))
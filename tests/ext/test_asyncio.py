@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from clickhouse_sqlalchemy.exceptions import DatabaseException
+from clickhouse_sqlalchemy.ext.asyncio import gather_queries
+from tests.session import asynch_engine
+from tests.testcase import AsynchSessionTestCase
+
+
+class GatherQueriesTestCase(AsynchSessionTestCase):
+    async def test_results_order(self):
+        statements = [
+            text('SELECT {} WHERE sleep(0.{})'.format(x, 5 - x))
+            for x in range(5)
+        ]
+        rv = await gather_queries(asynch_engine, statements, max_concurrency=2)
+
+        self.assertEqual([r.scalar() for r in rv], list(range(5)))
+
+    async def test_params_and_settings(self):
+        rv = await gather_queries(asynch_engine, [
+            (text('SELECT %(x)s'), {'x': 42}),
+            text("SELECT getSetting('max_threads')").execution_options(
+                settings={'max_threads': 3}
+            )
+        ])
+
+        self.assertEqual(rv[0].scalar(), 42)
+        self.assertEqual(rv[1].scalar(), 3)
+
+    async def test_failure_cancels_siblings(self):
+        with self.assertRaises(DatabaseException):
+            await gather_queries(asynch_engine, [
+                text(
+                    "SELECT count() FROM system.numbers_mt "
+                    "SETTINGS max_execution_time = 30"
+                ).execution_options(query_id='gather-long'),
+                text('SELECT unknown_column FROM system.one')
+            ])
+
+        # KILL QUERY is asynchronous: query may be listed for a while. Poll
+        # well within the test timeout.
+        query = text(
+            "SELECT count() FROM system.processes "
+            "WHERE query_id = 'gather-long'"
+        )
+        deadline = time.monotonic() + 3
+        while True:
+            rv = await self.session.execute(query)
+            count = rv.scalar()
+            if count == 0 or time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.1)
+
+        self.assertEqual(count, 0)
@@ -7,7 +7,8 @@ from sqlalchemy.orm import Query
 
 from tests.config import database, host, port, http_port, user, password
 from tests.session import http_session, native_session, \
-    system_native_session, http_engine, asynch_session, system_asynch_session
+    system_native_session, http_engine, asynch_session, \
+    system_asynch_session, aiohttp_session
 from tests.util import skip_by_server_version, run_async
 
 
@@ -149,6 +150,13 @@ class AsynchSessionTestCase(BaseAsynchTestCase):
     session = asynch_session
 
 
+class AiohttpSessionTestCase(BaseAsynchTestCase):
+    """ Explicitly HTTP-based async session Test Case """
+
+    port = http_port
+    session = aiohttp_session
+
+
 class CompilationTestCase(BaseTestCase):
     """ Test Case that should be used only for SQL generation """
 
@@ -6,7 +6,11 @@ tests_require = [
     'greenlet>=2.0.1',
     'alembic',
     'requests',
+    'aiohttp',
     'responses',
+    'pyarrow',
+    'numpy',
+    'pandas',
     'parameterized'
 ]
 